@@ -0,0 +1,70 @@
+-- Incrementally maintained doctor statistics
+-- Migration: adds the running rating sum/count behind average_rating and rebuilds
+-- every doctor's counters once from doctor_reviews; from then on save_reviews,
+-- cleanup and the sentiment worker apply deltas in the same statement as the change
+
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS rated_reviews INTEGER DEFAULT 0;
+ALTER TABLE doctors ADD COLUMN IF NOT EXISTS rating_total DECIMAL(10,1) DEFAULT 0;
+
+UPDATE doctors d
+SET
+    total_reviews = s.total,
+    positive_reviews = s.positive,
+    negative_reviews = s.negative,
+    neutral_reviews = s.neutral,
+    rated_reviews = s.rated,
+    rating_total = s.rating_total,
+    average_rating = ROUND(s.rating_total / NULLIF(s.rated, 0), 1)
+FROM (
+    SELECT
+        doc.doctor_id,
+        COUNT(r.id) AS total,
+        COUNT(r.id) FILTER (WHERE r.sentiment = 'positive') AS positive,
+        COUNT(r.id) FILTER (WHERE r.sentiment = 'negative') AS negative,
+        COUNT(r.id) FILTER (WHERE r.sentiment = 'neutral') AS neutral,
+        COUNT(r.id) FILTER (WHERE r.rating > 0) AS rated,
+        COALESCE(SUM(r.rating) FILTER (WHERE r.rating > 0), 0) AS rating_total
+    FROM doctors doc
+    LEFT JOIN doctor_reviews r ON r.doctor_id = doc.doctor_id
+    GROUP BY doc.doctor_id
+) s
+WHERE d.doctor_id = s.doctor_id;
+
+-- cleanup_expired_reviews() now also subtracts the deleted rows from the counters
+CREATE OR REPLACE FUNCTION cleanup_expired_reviews()
+RETURNS void AS $$
+BEGIN
+    WITH changed AS (
+        DELETE FROM doctor_reviews
+        WHERE valid_until < NOW() - INTERVAL '30 days'
+        RETURNING doctor_id, sentiment, rating
+    ),
+    deltas AS (
+        SELECT
+            doctor_id,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative,
+            COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE rating > 0) AS rated,
+            COALESCE(SUM(rating) FILTER (WHERE rating > 0), 0) AS rating_total
+        FROM changed
+        GROUP BY doctor_id
+    )
+    UPDATE doctors d
+    SET
+        total_reviews = GREATEST(COALESCE(d.total_reviews, 0) - c.total, 0),
+        positive_reviews = GREATEST(COALESCE(d.positive_reviews, 0) - c.positive, 0),
+        negative_reviews = GREATEST(COALESCE(d.negative_reviews, 0) - c.negative, 0),
+        neutral_reviews = GREATEST(COALESCE(d.neutral_reviews, 0) - c.neutral, 0),
+        rated_reviews = GREATEST(COALESCE(d.rated_reviews, 0) - c.rated, 0),
+        rating_total = GREATEST(COALESCE(d.rating_total, 0) - c.rating_total, 0),
+        average_rating = ROUND(
+            (COALESCE(d.rating_total, 0) - c.rating_total)
+            / NULLIF(COALESCE(d.rated_reviews, 0) - c.rated, 0),
+            1
+        )
+    FROM deltas c
+    WHERE d.doctor_id = c.doctor_id;
+END;
+$$ LANGUAGE plpgsql;
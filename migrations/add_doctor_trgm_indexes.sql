@@ -0,0 +1,7 @@
+-- Trigram indexes for fuzzy doctor lookup
+-- Migration: DoctorLookup.search matches partial/misspelled names with pg_trgm (% and <% operators)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+CREATE INDEX IF NOT EXISTS idx_doctor_name_trgm ON doctors USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_hospital_trgm ON doctors USING GIN (hospital_name gin_trgm_ops);
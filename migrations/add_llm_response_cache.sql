@@ -0,0 +1,20 @@
+-- LLM response cache
+-- Migration: ChatGPT web_search and summary-parsing responses are stored by request hash,
+-- so an identical request returns the saved response without calling OpenAI
+
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    key VARCHAR(64) PRIMARY KEY,  -- sha256 of the full request (model, tools, prompt, input)
+    kind VARCHAR(20) NOT NULL,  -- responses, chat
+    model VARCHAR(100),
+    response JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_response_cache(last_used_at);
+
+COMMENT ON TABLE llm_response_cache IS 'LLM 响应缓存，相同请求直接返回保存的响应';
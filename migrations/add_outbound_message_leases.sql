@@ -0,0 +1,8 @@
+-- Outbound message claim leases
+-- Migration: OutboundMessageQueue records which worker is sending a message and until when,
+-- so a restart only recovers its own sends and other replicas retry expired ones
+
+ALTER TABLE outbound_messages ADD COLUMN IF NOT EXISTS worker_id VARCHAR(255);
+ALTER TABLE outbound_messages ADD COLUMN IF NOT EXISTS lease_expires_at TIMESTAMP;
+
+CREATE INDEX IF NOT EXISTS idx_om_sending_lease ON outbound_messages(lease_expires_at) WHERE status = 'sending';
@@ -0,0 +1,17 @@
+-- Durable outbound WhatsApp message queue
+-- Migration: MessageHandler queues messages here, OutboundMessageQueue workers deliver them
+
+CREATE TABLE IF NOT EXISTS outbound_messages (
+    id BIGSERIAL PRIMARY KEY,
+    recipient VARCHAR(100) NOT NULL,
+    body TEXT NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, sending, sent, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    last_error TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    sent_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_om_due ON outbound_messages(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_om_recipient_open ON outbound_messages(recipient, id) WHERE status IN ('pending', 'sending');
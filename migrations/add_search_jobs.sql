@@ -0,0 +1,18 @@
+-- Persistent, resumable search jobs
+-- Migration: SearchJobRunner records each paid search here and re-runs unfinished jobs after restarts
+
+CREATE TABLE IF NOT EXISTS search_jobs (
+    id BIGSERIAL PRIMARY KEY,
+    user_id VARCHAR(100) NOT NULL,
+    doctor_name VARCHAR(255) NOT NULL,
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',  -- pending, running, done, failed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id VARCHAR(255),
+    lease_expires_at TIMESTAMP,
+    error_message TEXT,
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_sj_unfinished ON search_jobs(id) WHERE status IN ('pending', 'running');
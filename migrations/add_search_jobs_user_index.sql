@@ -0,0 +1,4 @@
+-- Per-user ordering of search jobs
+-- Migration: SearchJobRunner only claims the oldest unfinished job of each user
+
+CREATE INDEX IF NOT EXISTS idx_sj_user_unfinished ON search_jobs(user_id, id) WHERE status IN ('pending', 'running');
@@ -0,0 +1,4 @@
+-- Index for per-doctor search frequency (popularity-based cache TTL)
+-- Migration: CacheManager.choose_ttl_days / extend_hot_ttl count recent searches by doctor_id
+
+CREATE INDEX IF NOT EXISTS idx_sl_doctor_id_created ON search_logs(doctor_id, created_at);
@@ -0,0 +1,9 @@
+-- Per-search OpenAI token usage
+-- Migration: search_logs records the real tokens, web_search calls and cost of each
+-- search (src/utils/llm_usage.py) instead of estimates based on response time
+
+ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS input_tokens INTEGER DEFAULT 0;
+ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS output_tokens INTEGER DEFAULT 0;
+ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS reasoning_tokens INTEGER DEFAULT 0;
+ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS web_search_calls INTEGER DEFAULT 0;
+ALTER TABLE search_logs ADD COLUMN IF NOT EXISTS llm_time_ms INTEGER DEFAULT 0;
@@ -0,0 +1,9 @@
+-- Sentiment analysis cache
+-- Migration: SentimentAnalyzer only sends review texts whose hash isn't cached here to the model
+
+CREATE TABLE IF NOT EXISTS sentiment_cache (
+    hash VARCHAR(64) PRIMARY KEY,  -- sentiment_hash(text): SHA256 of the stripped review text only
+    sentiment VARCHAR(20) NOT NULL,
+    model VARCHAR(100),
+    created_at TIMESTAMP DEFAULT NOW()
+);
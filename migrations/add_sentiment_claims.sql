@@ -0,0 +1,7 @@
+-- Leased sentiment claims
+-- Migration: SentimentWorker claims rows with a committed lease instead of holding
+-- FOR UPDATE locks during model calls, and stops retrying rows after SENTIMENT_MAX_ATTEMPTS
+
+ALTER TABLE doctor_reviews ADD COLUMN IF NOT EXISTS sentiment_attempts INTEGER NOT NULL DEFAULT 0;
+ALTER TABLE doctor_reviews ADD COLUMN IF NOT EXISTS sentiment_claimed_at TIMESTAMP;
+ALTER TABLE doctor_reviews ADD COLUMN IF NOT EXISTS sentiment_claimed_by VARCHAR(255);
@@ -0,0 +1,4 @@
+-- Background sentiment stage
+-- Migration: SentimentWorker claims the oldest reviews without sentiment; this keeps the claim an index scan
+
+CREATE INDEX IF NOT EXISTS idx_dr_sentiment_pending ON doctor_reviews(id) WHERE sentiment IS NULL;
@@ -1,6 +1,9 @@
 -- Doctor Review Aggregation Bot - Database Schema
 -- Created: 2025-10-08
 
+-- Trigram matching for fuzzy doctor lookup (partial / misspelled names)
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- ===========================================
 -- 1. Main Tables
 -- ===========================================
@@ -20,6 +23,8 @@ CREATE TABLE IF NOT EXISTS doctors (
     negative_reviews INTEGER DEFAULT 0,
     neutral_reviews INTEGER DEFAULT 0,
     average_rating DECIMAL(2,1),
+    rated_reviews INTEGER DEFAULT 0,  -- reviews with a rating > 0 (for average_rating)
+    rating_total DECIMAL(10,1) DEFAULT 0,  -- sum of those ratings
 
     -- External IDs
     google_place_id VARCHAR(255),
@@ -50,6 +55,9 @@ CREATE TABLE IF NOT EXISTS doctor_reviews (
     -- Review content
     snippet TEXT NOT NULL,
     sentiment VARCHAR(20),  -- positive, negative, neutral
+    sentiment_attempts INTEGER NOT NULL DEFAULT 0,  -- Claims by the background sentiment worker
+    sentiment_claimed_at TIMESTAMP,  -- Lease of the worker currently analyzing the row
+    sentiment_claimed_by VARCHAR(255),
     rating DECIMAL(2,1),
     review_date DATE,
     author_name VARCHAR(255),
@@ -90,9 +98,14 @@ CREATE TABLE IF NOT EXISTS search_logs (
     sources_used TEXT[],
     results_count INTEGER,
 
-    -- Cost tracking
+    -- Cost tracking (OpenAI calls made for this search, see src/utils/llm_usage.py)
     api_calls_count INTEGER DEFAULT 0,
     estimated_cost_usd DECIMAL(10,4),
+    input_tokens INTEGER DEFAULT 0,
+    output_tokens INTEGER DEFAULT 0,
+    reasoning_tokens INTEGER DEFAULT 0,
+    web_search_calls INTEGER DEFAULT 0,
+    llm_time_ms INTEGER DEFAULT 0,
 
     -- Error information
     error_message TEXT,
@@ -127,6 +140,69 @@ CREATE TABLE IF NOT EXISTS user_sessions (
     metadata JSONB
 );
 
+-- Outbound Messages Table (durable WhatsApp send queue)
+CREATE TABLE IF NOT EXISTS outbound_messages (
+    id BIGSERIAL PRIMARY KEY,
+
+    -- Message
+    recipient VARCHAR(100) NOT NULL,
+    body TEXT NOT NULL,
+
+    -- Delivery state: pending, sending, sent, failed
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMP NOT NULL DEFAULT NOW(),
+    worker_id VARCHAR(255),
+    lease_expires_at TIMESTAMP,
+    last_error TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT NOW(),
+    sent_at TIMESTAMP
+);
+
+-- Sentiment Cache Table (keyed by a SHA256 hash of the review text)
+CREATE TABLE IF NOT EXISTS sentiment_cache (
+    hash VARCHAR(64) PRIMARY KEY,
+    sentiment VARCHAR(20) NOT NULL,
+    model VARCHAR(100),
+    created_at TIMESTAMP DEFAULT NOW()
+);
+
+-- LLM Response Cache Table (keyed by a hash of the full request: model, tools, prompt, input)
+CREATE TABLE IF NOT EXISTS llm_response_cache (
+    key VARCHAR(64) PRIMARY KEY,
+    kind VARCHAR(20) NOT NULL,  -- responses, chat
+    model VARCHAR(100),
+    response JSONB NOT NULL,
+    size_bytes INTEGER NOT NULL DEFAULT 0,
+    hits INTEGER NOT NULL DEFAULT 0,
+    created_at TIMESTAMP DEFAULT NOW(),
+    last_used_at TIMESTAMP DEFAULT NOW(),
+    expires_at TIMESTAMP NOT NULL
+);
+
+-- Search Jobs Table (persistent, resumable searches)
+CREATE TABLE IF NOT EXISTS search_jobs (
+    id BIGSERIAL PRIMARY KEY,
+
+    -- Request
+    user_id VARCHAR(100) NOT NULL,
+    doctor_name VARCHAR(255) NOT NULL,
+
+    -- Job state: pending, running, done, failed
+    status VARCHAR(20) NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    worker_id VARCHAR(255),
+    lease_expires_at TIMESTAMP,
+    error_message TEXT,
+
+    -- Timestamps
+    created_at TIMESTAMP DEFAULT NOW(),
+    started_at TIMESTAMP,
+    finished_at TIMESTAMP
+);
+
 -- ===========================================
 -- 2. Indexes for Performance
 -- ===========================================
@@ -136,6 +212,8 @@ CREATE INDEX IF NOT EXISTS idx_doctor_id_main ON doctors(doctor_id);
 CREATE INDEX IF NOT EXISTS idx_doctor_name ON doctors(name);
 CREATE INDEX IF NOT EXISTS idx_hospital ON doctors(hospital_name);
 CREATE INDEX IF NOT EXISTS idx_location ON doctors(location);
+CREATE INDEX IF NOT EXISTS idx_doctor_name_trgm ON doctors USING GIN (name gin_trgm_ops);
+CREATE INDEX IF NOT EXISTS idx_hospital_trgm ON doctors USING GIN (hospital_name gin_trgm_ops);
 
 -- Doctor Reviews indexes
 CREATE INDEX IF NOT EXISTS idx_dr_doctor_id ON doctor_reviews(doctor_id);
@@ -149,18 +227,34 @@ CREATE INDEX IF NOT EXISTS idx_dr_display_policy ON doctor_reviews(display_polic
 -- Composite index for cache queries
 CREATE INDEX IF NOT EXISTS idx_dr_doctor_valid ON doctor_reviews(doctor_id, valid_until);
 CREATE INDEX IF NOT EXISTS idx_dr_sentiment_display ON doctor_reviews(sentiment, display_policy);
+-- LLM response cache expiry and LRU eviction
+CREATE INDEX IF NOT EXISTS idx_llm_cache_expires ON llm_response_cache(expires_at);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_response_cache(last_used_at);
+
+-- Backlog of the background sentiment stage
+CREATE INDEX IF NOT EXISTS idx_dr_sentiment_pending ON doctor_reviews(id) WHERE sentiment IS NULL;
 
 -- Search Logs indexes
 CREATE INDEX IF NOT EXISTS idx_sl_user_id ON search_logs(user_id);
 CREATE INDEX IF NOT EXISTS idx_sl_doctor_name ON search_logs(doctor_name);
 CREATE INDEX IF NOT EXISTS idx_sl_created_at ON search_logs(created_at);
 CREATE INDEX IF NOT EXISTS idx_sl_cache_hit ON search_logs(cache_hit);
+CREATE INDEX IF NOT EXISTS idx_sl_doctor_id_created ON search_logs(doctor_id, created_at);
 
 -- User Sessions indexes
 CREATE INDEX IF NOT EXISTS idx_us_user_id ON user_sessions(user_id);
 CREATE INDEX IF NOT EXISTS idx_us_is_active ON user_sessions(is_active);
 CREATE INDEX IF NOT EXISTS idx_us_quota_reset ON user_sessions(quota_reset_at);
 
+-- Outbound Messages indexes (only unfinished rows are scanned by the workers)
+CREATE INDEX IF NOT EXISTS idx_om_due ON outbound_messages(next_attempt_at) WHERE status = 'pending';
+CREATE INDEX IF NOT EXISTS idx_om_sending_lease ON outbound_messages(lease_expires_at) WHERE status = 'sending';
+CREATE INDEX IF NOT EXISTS idx_om_recipient_open ON outbound_messages(recipient, id) WHERE status IN ('pending', 'sending');
+
+-- Search Jobs indexes (only unfinished jobs are scanned by the runner)
+CREATE INDEX IF NOT EXISTS idx_sj_unfinished ON search_jobs(id) WHERE status IN ('pending', 'running');
+CREATE INDEX IF NOT EXISTS idx_sj_user_unfinished ON search_jobs(user_id, id) WHERE status IN ('pending', 'running');
+
 -- JSONB indexes (for metadata queries)
 CREATE INDEX IF NOT EXISTS idx_doctors_metadata ON doctors USING GIN (metadata);
 CREATE INDEX IF NOT EXISTS idx_reviews_metadata ON doctor_reviews USING GIN (metadata);
@@ -192,11 +286,42 @@ CREATE TRIGGER update_doctor_reviews_updated_at
     EXECUTE FUNCTION update_updated_at_column();
 
 -- Function to cleanup expired reviews
+-- (keeps the doctors statistics in step, same as CacheManager.cleanup_expired_cache)
 CREATE OR REPLACE FUNCTION cleanup_expired_reviews()
 RETURNS void AS $$
 BEGIN
-    DELETE FROM doctor_reviews
-    WHERE valid_until < NOW() - INTERVAL '30 days';
+    WITH changed AS (
+        DELETE FROM doctor_reviews
+        WHERE valid_until < NOW() - INTERVAL '30 days'
+        RETURNING doctor_id, sentiment, rating
+    ),
+    deltas AS (
+        SELECT
+            doctor_id,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative,
+            COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE rating > 0) AS rated,
+            COALESCE(SUM(rating) FILTER (WHERE rating > 0), 0) AS rating_total
+        FROM changed
+        GROUP BY doctor_id
+    )
+    UPDATE doctors d
+    SET
+        total_reviews = GREATEST(COALESCE(d.total_reviews, 0) - c.total, 0),
+        positive_reviews = GREATEST(COALESCE(d.positive_reviews, 0) - c.positive, 0),
+        negative_reviews = GREATEST(COALESCE(d.negative_reviews, 0) - c.negative, 0),
+        neutral_reviews = GREATEST(COALESCE(d.neutral_reviews, 0) - c.neutral, 0),
+        rated_reviews = GREATEST(COALESCE(d.rated_reviews, 0) - c.rated, 0),
+        rating_total = GREATEST(COALESCE(d.rating_total, 0) - c.rating_total, 0),
+        average_rating = ROUND(
+            (COALESCE(d.rating_total, 0) - c.rating_total)
+            / NULLIF(COALESCE(d.rated_reviews, 0) - c.rated, 0),
+            1
+        )
+    FROM deltas c
+    WHERE d.doctor_id = c.doctor_id;
 END;
 $$ LANGUAGE plpgsql;
 
@@ -229,6 +354,10 @@ COMMENT ON TABLE doctors IS '医生主表，存储医生基本信息';
 COMMENT ON TABLE doctor_reviews IS '医生评价缓存表，存储多源聚合的评价数据';
 COMMENT ON TABLE search_logs IS '搜索日志表，用于分析和成本追踪';
 COMMENT ON TABLE user_sessions IS '用户会话表，管理访问控制和配额';
+COMMENT ON TABLE sentiment_cache IS '情感分析结果缓存，相同内容不重复调用模型';
+COMMENT ON TABLE llm_response_cache IS 'LLM 响应缓存，相同请求直接返回保存的响应';
+COMMENT ON TABLE search_jobs IS '搜索任务表，重启后继续执行未完成的搜索';
+COMMENT ON TABLE outbound_messages IS 'WhatsApp 发送队列，由发送 worker 按收件人顺序投递';
 
 COMMENT ON COLUMN doctor_reviews.hash IS '内容去重 hash (SHA256)';
 COMMENT ON COLUMN doctor_reviews.valid_until IS '缓存有效期，超过此时间需重新抓取';
@@ -0,0 +1,33 @@
+"""
+Sentiment engine interface
+SentimentAnalyzer delegates classification to one of these backends
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Optional
+
+SENTIMENTS = ("positive", "negative", "neutral")
+
+
+class SentimentEngine(ABC):
+    """Base class for sentiment backends"""
+
+    # Engine name (stored with cached results)
+    name = "base"
+
+    # Whether results are worth persisting in sentiment_cache
+    # (true for paid API backends, false for in-process ones)
+    cache_results = False
+
+    @abstractmethod
+    async def classify(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Classify review texts
+
+        Args:
+            texts: Review snippets
+
+        Returns:
+            "positive" / "negative" / "neutral" per text, in order
+            (None where a text could not be analyzed)
+        """
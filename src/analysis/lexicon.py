@@ -0,0 +1,156 @@
+"""
+Local lexicon sentiment engine (English, Malay, Chinese)
+Runs in-process with no API call; batches are scored with one NumPy weighted bincount
+"""
+
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.analysis.engine import SentimentEngine
+
+logger = logging.getLogger(__name__)
+
+# Weighted sentiment terms. Latin phrases are space-separated words;
+# Chinese terms (simplified and traditional) are matched as substrings.
+POSITIVE_TERMS = {
+    # English
+    "good": 1.0, "great": 1.5, "excellent": 2.0, "best": 1.5, "amazing": 1.5, "wonderful": 1.5,
+    "professional": 1.0, "friendly": 1.0, "caring": 1.0, "kind": 1.0, "patient": 0.5,
+    "helpful": 1.0, "thorough": 1.0, "knowledgeable": 1.0, "skilled": 1.0, "gentle": 1.0,
+    "attentive": 1.0, "recommend": 1.5, "recommended": 1.5, "satisfied": 1.0, "thank": 1.0,
+    "thanks": 1.0, "grateful": 1.0, "efficient": 1.0, "experienced": 0.5, "reassuring": 1.0,
+    "trust": 1.0, "clearly": 0.5, "happy": 1.0, "highly recommend": 1.0, "well explained": 1.0,
+    # Malay
+    "bagus": 1.0, "baik": 1.0, "terbaik": 1.5, "mesra": 1.0, "profesional": 1.0, "cekap": 1.0,
+    "sabar": 1.0, "teliti": 1.0, "syorkan": 1.5, "disyorkan": 1.5, "puas": 1.0, "hebat": 1.5,
+    "cemerlang": 2.0, "prihatin": 1.0, "ramah": 1.0, "membantu": 1.0, "terima kasih": 1.0,
+    "berpuas hati": 1.0,
+    # Chinese
+    "好": 1.0, "推荐": 1.5, "推薦": 1.5, "专业": 1.0, "專業": 1.0, "负责": 1.0, "負責": 1.0,
+    "满意": 1.0, "滿意": 1.0, "优秀": 1.5, "優秀": 1.5, "精湛": 1.5, "耐心": 1.0, "细心": 1.0,
+    "細心": 1.0, "亲切": 1.0, "親切": 1.0, "认真": 1.0, "認真": 1.0, "感谢": 1.0, "感謝": 1.0,
+    "谢谢": 1.0, "謝謝": 1.0, "仔细": 1.0, "仔細": 1.0, "温柔": 1.0, "溫柔": 1.0, "靠谱": 1.0,
+    "靠譜": 1.0, "放心": 1.0, "医术高": 1.5, "醫術高": 1.5,
+}
+
+NEGATIVE_TERMS = {
+    # English
+    "bad": 1.0, "rude": 1.5, "terrible": 2.0, "worst": 2.0, "poor": 1.0, "arrogant": 1.5,
+    "unprofessional": 1.5, "horrible": 2.0, "awful": 2.0, "careless": 1.5, "dismissive": 1.5,
+    "disappointed": 1.5, "disappointing": 1.5, "avoid": 1.5, "overcharged": 1.5, "expensive": 0.5,
+    "misdiagnosed": 2.0, "impatient": 1.0, "unfriendly": 1.0, "useless": 1.5, "regret": 1.5,
+    "rushed": 1.0, "waited": 0.5, "wrong": 1.0, "never again": 2.0, "waste": 1.5,
+    # Malay
+    "teruk": 1.5, "kasar": 1.5, "lambat": 1.0, "mahal": 0.5, "sombong": 1.5, "kecewa": 1.5,
+    "hampa": 1.5, "buruk": 1.5, "cuai": 1.5, "malas": 1.0, "marah": 1.0, "salah": 1.0,
+    "tunggu lama": 1.0, "menunggu lama": 1.0, "lama tunggu": 1.0,
+    # Chinese
+    "差": 1.0, "失望": 1.5, "不满": 1.0, "不滿": 1.0, "敷衍": 1.5, "冷漠": 1.5, "贵": 0.5,
+    "貴": 0.5, "误诊": 2.0, "誤診": 2.0, "坑": 1.0, "后悔": 1.5, "後悔": 1.5, "傲慢": 1.5,
+    "粗鲁": 1.5, "粗魯": 1.5, "不耐烦": 1.5, "不耐煩": 1.5, "错": 1.0, "錯": 1.0, "等太久": 1.0,
+}
+
+# Negators flip the next sentiment term ("not good", "tidak mesra", "不推荐", "不错")
+LATIN_NEGATORS = ["not", "no", "never", "isn't", "wasn't", "don't", "didn't", "doesn't",
+                  "won't", "cannot", "hardly", "tidak", "tak", "bukan", "kurang"]
+CHINESE_NEGATORS = ["不", "没", "沒", "没有", "沒有", "不太", "不够", "不夠", "别", "別"]
+
+_LATIN_WORD = re.compile(r"[a-z']+")
+_CJK_RUN = re.compile(r"[一-鿿]+")
+_MAX_CJK_NGRAM = 5
+
+
+def _build_lexicon() -> Dict[str, float]:
+    """Signed term weights, including generated negated forms"""
+    lexicon = {term: weight for term, weight in POSITIVE_TERMS.items()}
+    lexicon.update({term: -weight for term, weight in NEGATIVE_TERMS.items()})
+
+    negated = {}
+    for term, weight in lexicon.items():
+        is_chinese = bool(_CJK_RUN.fullmatch(term))
+        for negator in (CHINESE_NEGATORS if is_chinese else LATIN_NEGATORS):
+            phrase = f"{negator}{term}" if is_chinese else f"{negator} {term}"
+            # The bare term still matches inside the phrase, so -2x nets out to a flipped sign
+            negated[phrase] = -2 * weight
+
+    # Explicit lexicon entries win over generated ones ("不满" is listed on its own)
+    negated.update(lexicon)
+    return negated
+
+
+def extract_features(text: str) -> List[str]:
+    """
+    Candidate lexicon keys in a text
+
+    Latin words give unigrams, bigrams and skip-bigrams (so "not very good"
+    also yields "not good"); Chinese runs give every substring up to 5 characters.
+    """
+    text = text.lower().replace("’", "'")
+    features = []
+
+    words = _LATIN_WORD.findall(text)
+    features.extend(words)
+    features.extend(f"{a} {b}" for a, b in zip(words, words[1:]))
+    features.extend(f"{a} {c}" for a, c in zip(words, words[2:]))
+
+    for run in _CJK_RUN.findall(text):
+        for size in range(1, min(_MAX_CJK_NGRAM, len(run)) + 1):
+            features.extend(run[i:i + size] for i in range(len(run) - size + 1))
+
+    return features
+
+
+class LexiconSentimentEngine(SentimentEngine):
+    """
+    Linear lexicon model: score = sum of matched term weights
+
+    A batch is turned into (row, term) index pairs and scored with a single
+    np.bincount, so classification costs microseconds per review.
+    """
+
+    name = "lexicon"
+    cache_results = False
+
+    def __init__(self, threshold: float = 0.5):
+        """
+        Args:
+            threshold: |score| needed for positive/negative (below it is neutral)
+        """
+        self.threshold = threshold
+        lexicon = _build_lexicon()
+        self.vocabulary: Dict[str, int] = {term: i for i, term in enumerate(lexicon)}
+        self.weights = np.array(list(lexicon.values()), dtype=np.float64)
+
+    def _index(self, texts: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+        """(row, term) index pairs for every lexicon hit in the batch"""
+        rows, cols = [], []
+        vocabulary = self.vocabulary
+        for row, text in enumerate(texts):
+            for feature in extract_features(text or ""):
+                col = vocabulary.get(feature)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        return np.asarray(rows, dtype=np.intp), np.asarray(cols, dtype=np.intp)
+
+    def score(self, texts: List[str]) -> np.ndarray:
+        """Raw sentiment scores (positive > 0 > negative) for a batch"""
+        rows, cols = self._index(texts)
+        return np.bincount(rows, weights=self.weights[cols], minlength=len(texts))
+
+    def classify_batch(self, texts: List[str]) -> List[str]:
+        """Synchronous batch classification"""
+        if not texts:
+            return []
+
+        scores = self.score(texts)
+        labels = np.full(len(texts), "neutral", dtype=object)
+        labels[scores >= self.threshold] = "positive"
+        labels[scores <= -self.threshold] = "negative"
+        return labels.tolist()
+
+    async def classify(self, texts: List[str]) -> List[Optional[str]]:
+        return self.classify_batch(texts)
@@ -1,87 +1,93 @@
 """
-Sentiment analysis using OpenAI API
-Classifies reviews as positive, negative, or neutral
+Sentiment analysis for doctor reviews
+Classifies reviews as positive, negative, or neutral using a pluggable engine:
+the OpenAI API (default) or the in-process lexicon engine (SENTIMENT_ENGINE=local)
 """
 
+import asyncio
+import hashlib
 import json
 import logging
-from typing import List, Dict
+import time
+from typing import List, Dict, Optional
 from openai import AsyncOpenAI
 from src.config import settings
+from src.database import db
+from src.analysis.engine import SentimentEngine, SENTIMENTS
+from src.analysis.lexicon import LexiconSentimentEngine
+from src.utils.llm_usage import record_llm_call
 
 logger = logging.getLogger(__name__)
 
 
-class SentimentAnalyzer:
-    """Analyze sentiment of doctor reviews using OpenAI"""
+def sentiment_hash(text: str) -> str:
+    """sentiment_cache key: SHA256 of the review text alone (the same text found on
+    another page, or stored under another URL, reuses the cached sentiment)"""
+    return hashlib.sha256(text.strip().encode()).hexdigest()
 
-    def __init__(self):
-        self.use_mock = (
-            settings.environment == "development" and
-            settings.openai_api_key == "your_openai_api_key"
-        )
 
-        if not self.use_mock:
-            self.client = AsyncOpenAI(api_key=settings.openai_api_key)
-            self.model = settings.openai_model
-        else:
-            logger.info("🧪 Using MOCK sentiment analyzer")
+class OpenAISentimentEngine(SentimentEngine):
+    """Sentiment classification through the OpenAI chat API"""
 
-    async def analyze_reviews(self, reviews: List[Dict]) -> List[Dict]:
-        """
-        Analyze sentiment for a list of reviews
+    cache_results = True
+
+    CHUNK_SIZE = 10
 
+    def __init__(self, api_key: str, model: str, concurrency: int = 4):
+        """
         Args:
-            reviews: List of review dicts
+            api_key: OpenAI API key
+            model: Chat model name (also recorded in sentiment_cache.model)
+            concurrency: Chunks sent to the API at once
+        """
+        self.client = AsyncOpenAI(api_key=api_key)
+        self.model = model
+        self.name = model
+        self.concurrency = concurrency
+
+    async def classify(self, texts: List[str]) -> List[Optional[str]]:
+        """
+        Send texts to the model in concurrent chunks of 10 (bounded by SENTIMENT_CONCURRENCY)
 
         Returns:
-            Reviews with sentiment field added
+            Sentiments in the same order as texts (None where the chunk failed
+            or the model returned no valid label for that text)
         """
-        if not reviews:
-            return []
+        semaphore = asyncio.Semaphore(self.concurrency)
 
-        # Use mock analyzer if no API key
-        if self.use_mock:
-            return await self._mock_analyze(reviews)
+        async def analyze_chunk(chunk: List[str]) -> List[Optional[str]]:
+            async with semaphore:
+                try:
+                    return await self._batch_analyze(chunk)
+                except Exception as e:
+                    logger.error(f"Error in batch analysis: {e}")
+                    return [None] * len(chunk)
 
-        try:
-            # Batch analyze for efficiency
-            if len(reviews) <= 10:
-                return await self._batch_analyze(reviews)
-            else:
-                # Process in chunks
-                analyzed = []
-                for i in range(0, len(reviews), 10):
-                    chunk = reviews[i:i+10]
-                    chunk_analyzed = await self._batch_analyze(chunk)
-                    analyzed.extend(chunk_analyzed)
-                return analyzed
+        chunks = [texts[i:i + self.CHUNK_SIZE] for i in range(0, len(texts), self.CHUNK_SIZE)]
+        results = await asyncio.gather(*(analyze_chunk(chunk) for chunk in chunks))
 
-        except Exception as e:
-            logger.error(f"Error analyzing sentiment: {e}")
-            # Return reviews with default sentiment
-            for review in reviews:
-                review["sentiment"] = "neutral"
-            return reviews
+        return [sentiment for chunk_sentiments in results for sentiment in chunk_sentiments]
 
-    async def _batch_analyze(self, reviews: List[Dict]) -> List[Dict]:
+    async def _batch_analyze(self, texts: List[str]) -> List[Optional[str]]:
         """
-        Analyze a batch of reviews (up to 10)
+        Analyze a batch of review texts (up to 10) in one API call
 
         Args:
-            reviews: List of review dicts
+            texts: Review snippets
 
         Returns:
-            Reviews with sentiment added
+            Sentiments in the same order as texts; None where the response has no
+            entry or an invalid label, so the text isn't cached and is retried
+
+        Raises:
+            Exception: API or response parsing errors
         """
-        try:
-            # Build prompt
-            reviews_text = ""
-            for i, review in enumerate(reviews, 1):
-                snippet = review.get("snippet", "")[:200]
-                reviews_text += f"{i}. {snippet}\n\n"
+        # Build prompt
+        reviews_text = ""
+        for i, text in enumerate(texts, 1):
+            reviews_text += f"{i}. {text[:200]}\n\n"
 
-            prompt = f"""请分析以下 {len(reviews)} 条医生评价的情感倾向。
+        prompt = f"""请分析以下 {len(texts)} 条医生评价的情感倾向。
 对每条评价，判断为：positive（正面）、negative（负面）或 neutral（中性）。
 
 评价内容：
@@ -99,120 +105,200 @@ class SentimentAnalyzer:
 - negative: 批评、抱怨、不满
 - neutral: 中立描述、事实陈述"""
 
-            # Build API call parameters
-            api_params = {
-                "model": self.model,
-                "messages": [
-                    {"role": "system", "content": "你是一个专业的医疗评价分析助手。"},
-                    {"role": "user", "content": prompt}
-                ],
-                "response_format": {"type": "json_object"}
-            }
-
-            # GPT-5 uses different parameter names
-            if "gpt-5" in self.model.lower():
-                api_params["max_completion_tokens"] = 500
-            else:
-                api_params["temperature"] = 0.3
-                api_params["max_tokens"] = 500
+        # Build API call parameters
+        api_params = {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": "你是一个专业的医疗评价分析助手。"},
+                {"role": "user", "content": prompt}
+            ],
+            "response_format": {"type": "json_object"}
+        }
+
+        # GPT-5 uses different parameter names
+        if "gpt-5" in self.model.lower():
+            api_params["max_completion_tokens"] = 500
+        else:
+            api_params["temperature"] = 0.3
+            api_params["max_tokens"] = 500
 
+        started = time.perf_counter()
+        response = None
+        try:
             response = await self.client.chat.completions.create(**api_params)
+        finally:
+            record_llm_call(self.model, response, time.perf_counter() - started, "sentiment")
 
-            # Parse response
-            result_text = response.choices[0].message.content
-            result = json.loads(result_text)
+        # Parse response
+        result_text = response.choices[0].message.content
+        result = json.loads(result_text)
 
-            # Extract sentiment array
-            sentiments = result.get("sentiments", result.get("results", []))
+        # Extract sentiment array
+        sentiments = result.get("sentiments", result.get("results", []))
 
-            # Apply sentiment to reviews
-            for i, review in enumerate(reviews):
-                if i < len(sentiments):
-                    sentiment_data = sentiments[i]
-                    review["sentiment"] = sentiment_data.get("sentiment", "neutral")
-                else:
-                    review["sentiment"] = "neutral"
+        labels = []
+        for i in range(len(texts)):
+            entry = sentiments[i] if isinstance(sentiments, list) and i < len(sentiments) else None
+            sentiment = entry.get("sentiment") if isinstance(entry, dict) else None
+            labels.append(sentiment if sentiment in SENTIMENTS else None)
 
-            logger.info(f"✅ Analyzed {len(reviews)} reviews")
-            return reviews
+        missing = labels.count(None)
+        if missing:
+            logger.warning(f"⚠️ Sentiment response had no valid label for {missing}/{len(texts)} reviews")
+        logger.info(f"✅ Analyzed {len(texts)} reviews")
+        return labels
 
-        except Exception as e:
-            logger.error(f"Error in batch analysis: {e}")
-            # Fallback: assign neutral
-            for review in reviews:
-                review["sentiment"] = "neutral"
-            return reviews
 
-    async def analyze_single(self, text: str) -> str:
+class SentimentAnalyzer:
+    """Analyze sentiment of doctor reviews with the configured engine"""
+
+    def __init__(self):
+        self.cache_hits = 0
+        self.cache_misses = 0
+
+        use_mock = (
+            settings.environment == "development" and
+            settings.openai_api_key == "your_openai_api_key"
+        )
+
+        if use_mock or settings.sentiment_engine == "local":
+            if use_mock:
+                logger.info("🧪 No OpenAI key, using local lexicon sentiment engine")
+            self.engine: SentimentEngine = LexiconSentimentEngine()
+        else:
+            self.engine = OpenAISentimentEngine(
+                api_key=settings.openai_api_key,
+                model=settings.openai_model,
+                concurrency=settings.sentiment_concurrency
+            )
+
+    async def analyze_reviews(self, reviews: List[Dict], fallback: Optional[str] = "neutral") -> List[Dict]:
         """
-        Analyze sentiment for a single text
+        Analyze sentiment for a list of reviews
+
+        For API engines, sentiments already in the sentiment cache (keyed by a
+        hash of the review text) are reused and only new texts are sent to the
+        model. Local engines classify everything directly. Reviews without text
+        are neutral and never sent to the model or cached.
 
         Args:
-            text: Review text
+            reviews: List of review dicts
+            fallback: Sentiment for reviews that could not be analyzed
+                (None leaves them unset so a later run retries them)
 
         Returns:
-            Sentiment: positive, negative, or neutral
+            Reviews with sentiment field added
         """
+        if not reviews:
+            return []
+
+        from src.cache.manager import review_text
+
         try:
-            prompt = f"""分析这条医生评价的情感倾向（positive/negative/neutral）：
+            if not self.engine.cache_results:
+                sentiments = await self.engine.classify([review_text(review) for review in reviews])
+                for review, sentiment in zip(reviews, sentiments):
+                    review["sentiment"] = sentiment or fallback
+                return reviews
+
+            texts = [review_text(review).strip() for review in reviews]
+            hashes = [sentiment_hash(text) if text else None for text in texts]
+            cached = await self._get_cached_sentiments([hash_value for hash_value in hashes if hash_value]) if any(hashes) else {}
+
+            # Identical texts within the batch are only analyzed once
+            uncached: Dict[str, Dict] = {}
+            for review, hash_value in zip(reviews, hashes):
+                if hash_value is None:
+                    review["sentiment"] = "neutral"
+                elif hash_value in cached:
+                    review["sentiment"] = cached[hash_value]
+                elif hash_value not in uncached:
+                    uncached[hash_value] = review
 
-"{text}"
+            self.cache_hits += len(reviews) - len(uncached)
+            self.cache_misses += len(uncached)
 
-只返回一个词：positive、negative 或 neutral"""
+            if uncached:
+                logger.info(f"🧠 Sentiment cache: {len(reviews) - len(uncached)}/{len(reviews)} cached, analyzing {len(uncached)}")
+                new_sentiments = await self.engine.classify(
+                    [review_text(review) for review in uncached.values()]
+                )
+                sentiments = dict(zip(uncached.keys(), new_sentiments))
 
-            response = await self.client.chat.completions.create(
-                model=self.model,
-                messages=[
-                    {"role": "system", "content": "你是情感分析专家。"},
-                    {"role": "user", "content": prompt}
-                ],
-                temperature=0.3,
-                max_tokens=10
-            )
+                for review, hash_value in zip(reviews, hashes):
+                    if hash_value in sentiments:
+                        review["sentiment"] = sentiments[hash_value] or fallback
 
-            sentiment = response.choices[0].message.content.strip().lower()
+                await self._save_sentiments(sentiments)
 
-            # Validate
-            if sentiment in ["positive", "negative", "neutral"]:
-                return sentiment
-            return "neutral"
+            return reviews
 
         except Exception as e:
-            logger.error(f"Error analyzing single review: {e}")
-            return "neutral"
+            logger.error(f"Error analyzing sentiment: {e}")
+            # Return reviews with default sentiment
+            for review in reviews:
+                review["sentiment"] = fallback
+            return reviews
 
-    async def _mock_analyze(self, reviews: List[Dict]) -> List[Dict]:
+    async def _get_cached_sentiments(self, hashes: List[str]) -> Dict[str, str]:
         """
-        Mock sentiment analysis using simple keyword matching
+        Look up cached sentiments by review content hash
 
         Args:
-            reviews: List of review dicts
+            hashes: Review text hashes (sentiment_hash)
 
         Returns:
-            Reviews with sentiment added
+            {hash: sentiment} for the hashes that are cached
         """
-        logger.info(f"🧪 [MOCK] Analyzing {len(reviews)} reviews")
+        try:
+            rows = await db.fetch("""
+                SELECT hash, sentiment
+                FROM sentiment_cache
+                WHERE hash = ANY($1::text[])
+            """, list(set(hashes)))
+            return {row["hash"]: row["sentiment"] for row in rows}
+        except Exception as e:
+            logger.warning(f"Sentiment cache lookup failed: {e}")
+            return {}
 
-        positive_keywords = ["好", "推荐", "专业", "负责", "满意", "不错", "优秀", "精湛"]
-        negative_keywords = ["差", "不满", "态度", "等待", "沟通", "失望"]
+    async def _save_sentiments(self, sentiments: Dict[str, str]):
+        """
+        Store new sentiments in the cache (one multi-row insert)
 
-        for review in reviews:
-            snippet = review.get("snippet", "").lower()
+        Args:
+            sentiments: {hash: sentiment}; None (failed analysis) isn't cached,
+                so it is retried next time
+        """
+        rows = {hash_value: sentiment for hash_value, sentiment in sentiments.items() if sentiment}
+        if not rows:
+            return
 
-            # Count positive and negative keywords
-            positive_count = sum(1 for kw in positive_keywords if kw in snippet)
-            negative_count = sum(1 for kw in negative_keywords if kw in snippet)
+        try:
+            await db.execute("""
+                INSERT INTO sentiment_cache (hash, sentiment, model)
+                SELECT h, s, $3::text
+                FROM unnest($1::text[], $2::text[]) AS r(h, s)
+                ON CONFLICT (hash) DO NOTHING
+            """, list(rows.keys()), list(rows.values()), self.engine.name)
+        except Exception as e:
+            logger.warning(f"Sentiment cache save failed: {e}")
 
-            # Determine sentiment
-            if positive_count > negative_count:
-                review["sentiment"] = "positive"
-            elif negative_count > positive_count:
-                review["sentiment"] = "negative"
-            else:
-                review["sentiment"] = "neutral"
+    async def analyze_single(self, text: str) -> str:
+        """
+        Analyze sentiment for a single text
 
-        logger.info("✅ [MOCK] Sentiment analysis complete")
-        return reviews
+        Args:
+            text: Review text
+
+        Returns:
+            Sentiment: positive, negative, or neutral
+        """
+        try:
+            sentiments = await self.engine.classify([text])
+            return sentiments[0] or "neutral"
+        except Exception as e:
+            logger.error(f"Error analyzing single review: {e}")
+            return "neutral"
 
 
 # Global instance
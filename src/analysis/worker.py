@@ -0,0 +1,232 @@
+"""
+Background sentiment stage
+Reviews are saved without sentiment so results reach the user immediately;
+this worker fills doctor_reviews.sentiment afterwards in batches and keeps
+the per-doctor sentiment counters on doctors in step
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Dict, Optional
+
+from src.config import settings
+from src.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class SentimentWorker:
+    """
+    Fills in missing review sentiment in the background
+
+    Each round claims the oldest unanalyzed reviews with a short lease
+    (one committed UPDATE using SKIP LOCKED, so replicas never analyze the same
+    rows and no row lock or pooled connection is held during model calls),
+    classifies them with the configured engine, then writes sentiments and
+    counter deltas back in one guarded statement.
+
+    Reviews the engine couldn't analyze keep their lease, so they are retried
+    once it expires instead of blocking the head of the queue; after
+    SENTIMENT_MAX_ATTEMPTS claims they are left unanalyzed.
+    """
+
+    CLAIM_QUERY = """
+        UPDATE doctor_reviews
+        SET sentiment_claimed_at = NOW(),
+            sentiment_claimed_by = $2,
+            sentiment_attempts = sentiment_attempts + 1
+        WHERE id IN (
+            SELECT id
+            FROM doctor_reviews
+            WHERE sentiment IS NULL
+            AND sentiment_attempts < $3
+            AND (sentiment_claimed_at IS NULL OR sentiment_claimed_at < NOW() - make_interval(secs => $4))
+            ORDER BY id
+            LIMIT $1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, url, snippet
+    """
+
+    # Only rows still unanalyzed and still claimed by this worker are written
+    # (a lease that expired and was re-claimed elsewhere is left alone), and
+    # counters only move for rows that actually changed
+    WRITE_BACK_QUERY = """
+        WITH updated AS (
+            UPDATE doctor_reviews dr
+            SET sentiment = r.sentiment,
+                sentiment_claimed_at = NULL,
+                sentiment_claimed_by = NULL
+            FROM unnest($1::int[], $2::text[]) AS r(id, sentiment)
+            WHERE dr.id = r.id
+            AND dr.sentiment IS NULL
+            AND dr.sentiment_claimed_by = $3
+            RETURNING dr.doctor_id, dr.sentiment
+        ),
+        counts AS (
+            SELECT
+                doctor_id,
+                COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+                COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative,
+                COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral
+            FROM updated
+            GROUP BY doctor_id
+        ),
+        bumped AS (
+            UPDATE doctors d
+            SET
+                positive_reviews = COALESCE(d.positive_reviews, 0) + c.positive,
+                negative_reviews = COALESCE(d.negative_reviews, 0) + c.negative,
+                neutral_reviews = COALESCE(d.neutral_reviews, 0) + c.neutral
+            FROM counts c
+            WHERE d.doctor_id = c.doctor_id
+        )
+        SELECT doctor_id, positive + negative + neutral AS count
+        FROM counts
+    """
+
+    def __init__(self):
+        self.enabled = settings.sentiment_worker_enabled
+        self.batch_size = settings.sentiment_batch_size
+        self.poll_interval = settings.sentiment_poll_interval_seconds
+        self.lease_seconds = settings.sentiment_claim_lease_seconds
+        self.max_attempts = settings.sentiment_max_attempts
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.analyzed = 0
+        self.failed = 0
+        self.rounds = 0
+
+        self._task: Optional[asyncio.Task] = None
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._stopping
+
+    async def start(self):
+        """Start the worker (picks up reviews left unanalyzed by earlier runs)"""
+        if not self.enabled:
+            logger.info("⏸️ Sentiment worker disabled (SENTIMENT_WORKER_ENABLED=false)")
+            return
+
+        self._stopping = False
+        self._wakeup.set()
+        self._task = asyncio.create_task(self._run())
+        logger.info(f"✅ Sentiment worker started: batches of {self.batch_size}")
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the worker, letting the current batch finish"""
+        if self._task is None:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+
+        try:
+            await asyncio.wait_for(asyncio.shield(self._task), timeout=timeout)
+        except asyncio.TimeoutError:
+            # The batch's lease expires, so it is simply analyzed again later
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+        self._task = None
+        logger.info("Sentiment worker stopped")
+
+    def notify(self):
+        """Wake the worker up (called after new reviews are saved)"""
+        self._wakeup.set()
+
+    async def _run(self):
+        """Process batches until stopped, sleeping while there is nothing to do"""
+        while not self._stopping:
+            try:
+                more = await self.process_batch()
+            except Exception as e:
+                logger.error(f"❌ Sentiment batch failed: {e}")
+                more = False
+
+            if more:
+                continue
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+
+    async def process_batch(self) -> bool:
+        """
+        Analyze one batch of reviews without sentiment
+
+        Returns:
+            True if the batch was full and fully analyzed (more work is likely waiting)
+        """
+        from src.analysis.sentiment import sentiment_analyzer
+        from src.cache.manager import cache_manager
+
+        rows = await db.fetch(
+            self.CLAIM_QUERY, self.batch_size, self.worker_id, self.max_attempts, float(self.lease_seconds)
+        )
+        if not rows:
+            return False
+
+        # No transaction is open while the engine runs
+        reviews = [dict(row) for row in rows]
+        await sentiment_analyzer.analyze_reviews(reviews, fallback=None)
+
+        analyzed = [review for review in reviews if review.get("sentiment")]
+        updated = []
+        if analyzed:
+            updated = await db.fetch(
+                self.WRITE_BACK_QUERY,
+                [review["id"] for review in analyzed],
+                [review["sentiment"] for review in analyzed],
+                self.worker_id
+            )
+
+        self.rounds += 1
+        self.analyzed += len(analyzed)
+        self.failed += len(reviews) - len(analyzed)
+
+        # Cached copies of these doctors' reviews don't have the sentiment yet
+        for row in updated:
+            cache_manager.l1.invalidate(row["doctor_id"])
+            await cache_manager.redis.invalidate(row["doctor_id"])
+
+        logger.info(
+            f"🧠 Sentiment stage: {len(analyzed)}/{len(reviews)} reviews analyzed "
+            f"for {len(updated)} doctors"
+        )
+        return len(rows) == self.batch_size and len(analyzed) == len(reviews)
+
+    async def get_stats(self) -> Dict:
+        """Get backlog size plus this process's counters"""
+        stats = {
+            "running": self.running,
+            "analyzed": self.analyzed,
+            "failed": self.failed,
+            "rounds": self.rounds
+        }
+
+        try:
+            row = await db.fetchrow("""
+                SELECT
+                    COUNT(*) FILTER (WHERE sentiment_attempts < $1) AS pending,
+                    COUNT(*) FILTER (WHERE sentiment_attempts >= $1) AS given_up
+                FROM doctor_reviews
+                WHERE sentiment IS NULL
+            """, self.max_attempts)
+            stats["pending"] = row["pending"]
+            stats["given_up"] = row["given_up"]
+        except Exception as e:
+            logger.warning(f"Could not count pending sentiment: {e}")
+
+        return stats
+
+
+# Global sentiment worker instance
+sentiment_worker = SentimentWorker()
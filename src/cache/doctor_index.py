@@ -0,0 +1,368 @@
+"""
+In-memory doctor name resolution index
+Maps differently written names of the same doctor ("Dr. Mohd Ali", "Muhammad Ali") to
+the doctor already in the doctors table, so they share one cache entry instead of one
+paid search each; looser matches ("Dr. Nick Lim") are only offered as suggestions
+"""
+
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Honorifics that never identify a doctor
+TITLES = {
+    "dr", "doctor", "prof", "professor", "assoc", "associate", "dato", "datuk",
+    "datin", "mr", "mrs", "ms", "madam", "puan", "encik"
+}
+
+# Malay/Indian name connectors ("bin", "binti", "a/l", "a/p")
+CONNECTORS = {"bin", "binti", "bt", "bte", "al", "ap"}
+
+# Common spellings of the same given name
+NAME_ALIASES = {
+    "mohd": "muhammad", "muhd": "muhammad", "mohamad": "muhammad", "mohammad": "muhammad",
+    "mohamed": "muhammad", "mohammed": "muhammad", "muhamad": "muhammad", "mhd": "muhammad",
+    "abd": "abdul",
+}
+
+_SOUNDEX_CODES = {
+    letter: digit
+    for digit, letters in {"1": "bfpv", "2": "cgjkqsxz", "3": "dt", "4": "l", "5": "mn", "6": "r"}.items()
+    for letter in letters
+}
+
+
+def normalize_name(name: str) -> List[str]:
+    """
+    Split a doctor name into normalized tokens
+
+    Lowercases, strips punctuation, drops titles and connectors and
+    unifies common spellings ("Dr. Mohd Ali bin Ahmad" -> ["muhammad", "ali", "ahmad"]).
+    """
+    text = re.sub(r"[^\w\s]", " ", name.lower())
+    tokens = [token for token in text.split() if token not in TITLES and token not in CONNECTORS]
+    return [NAME_ALIASES.get(token, token) for token in tokens]
+
+
+def strip_titles(name: str) -> str:
+    """
+    Lowercase a doctor name and drop punctuation and titles, keeping its spelling
+
+    For matching against names as stored in doctors.name ("Dr. Mohd Ali bin Ahmad" ->
+    "mohd ali bin ahmad"); normalize_name() would also rewrite aliases and connectors,
+    which the stored names don't have.
+    """
+    text = re.sub(r"[^\w\s]", " ", name.lower())
+    return " ".join(token for token in text.split() if token not in TITLES)
+
+
+def phonetic_key(token: str) -> str:
+    """Soundex key of a latin token (non-latin tokens such as Chinese names are returned unchanged)"""
+    letters = [c for c in token if "a" <= c <= "z"]
+    if not letters:
+        return token
+
+    code = letters[0].upper()
+    previous = _SOUNDEX_CODES.get(letters[0])
+    for letter in letters[1:]:
+        digit = _SOUNDEX_CODES.get(letter)
+        if digit and digit != previous:
+            code += digit
+        if letter not in "hw":
+            previous = digit
+    return (code + "000")[:4]
+
+
+def trigrams(text: str) -> Set[str]:
+    """pg_trgm-style trigrams (each word padded with two leading spaces and one trailing space)"""
+    grams = set()
+    for word in text.split():
+        padded = f"  {word} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def trigram_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the trigram sets, same definition as pg_trgm similarity()"""
+    grams_a, grams_b = trigrams(a), trigrams(b)
+    if not grams_a or not grams_b:
+        return 0.0
+    return len(grams_a & grams_b) / len(grams_a | grams_b)
+
+
+def token_similarity(a: str, b: str) -> float:
+    """
+    Similarity of two name tokens (0-1)
+
+    Exact > same sound (long tokens only; Soundex can't tell "Lim" from "Lin") >
+    abbreviation ("Nic" / "Nicholas") > short nickname sharing the first syllable
+    ("Nick" / "Nicholas", but not "Nicole" / "Nicholas") > trigram typo match
+    """
+    if a == b:
+        return 1.0
+
+    short, long = sorted((a, b), key=len)
+    if len(short) >= 5 and phonetic_key(a) == phonetic_key(b):
+        return 0.9
+    if len(short) >= 3 and long.startswith(short):
+        return 0.8
+    if 3 <= len(short) <= 4 and long[:3] == short[:3]:
+        return 0.65
+    return trigram_similarity(a, b)
+
+
+def name_similarity(query_tokens: List[str], candidate_tokens: List[str]) -> float:
+    """
+    Similarity of two token lists (0-1), independent of token order
+
+    Tokens are paired greedily by similarity. The score is the soft Dice coefficient,
+    raised to a (slightly discounted) containment score when the longer name only adds
+    one trailing token ("Nicholas Lim" / "Nicholas Lim Wei"). Names that drop a leading
+    or middle token ("Wei Ming" / "Nicholas Lim Wei Ming", "Tan Ling" / "Tan Mei Ling")
+    are usually different people and get no containment bonus.
+    """
+    if not query_tokens or not candidate_tokens:
+        return 0.0
+
+    pairs = sorted(
+        (
+            (token_similarity(q, c), qi, ci)
+            for qi, q in enumerate(query_tokens)
+            for ci, c in enumerate(candidate_tokens)
+        ),
+        reverse=True
+    )
+
+    used_query, used_candidate = set(), set()
+    matched = 0.0
+    pairing = {}
+    for score, qi, ci in pairs:
+        if score < 0.5:
+            break
+        if qi in used_query or ci in used_candidate:
+            continue
+        used_query.add(qi)
+        used_candidate.add(ci)
+        pairing[qi] = ci
+        matched += score
+
+    dice = 2 * matched / (len(query_tokens) + len(candidate_tokens))
+
+    # Containment: the shorter name (at least two tokens, so a shared surname is never
+    # enough) must be the longer name minus its last token, in the same order
+    shorter, longer = sorted((len(query_tokens), len(candidate_tokens)))
+    if shorter < 2 or longer - shorter > 1 or len(pairing) < shorter:
+        return dice
+    if len(query_tokens) <= len(candidate_tokens):
+        positions = [pairing[qi] for qi in range(len(query_tokens))]
+    else:
+        inverse = {ci: qi for qi, ci in pairing.items()}
+        positions = [inverse[ci] for ci in range(len(candidate_tokens))]
+    if positions != list(range(shorter)):
+        return dice
+    return max(dice, 0.9 * matched / shorter)
+
+
+class DoctorNameIndex:
+    """
+    Inverted index over doctors.name for name resolution and fuzzy suggestions
+
+    resolve() only merges names whose normalized tokens are identical (titles,
+    connectors, punctuation, order and alias spellings such as mohd/muhammad
+    aside); serving one doctor's reviews for another is worse than a paid search.
+    suggest() ranks fuzzy candidates, gathered through exact tokens, phonetic keys
+    and 3-letter prefixes and scored with name_similarity(). Loaded from the doctors table
+    on startup and kept current incrementally (new doctors are added as they
+    are saved; rows added by other replicas are picked up by refresh()).
+    """
+
+    def __init__(self, threshold: float = 0.8, ambiguity_margin: float = 0.05,
+                 refresh_interval_seconds: float = 60.0):
+        """
+        Args:
+            threshold: Minimum score to suggest a known doctor for a name
+            ambiguity_margin: Don't suggest when the runner-up is this close to the best match
+            refresh_interval_seconds: How often refresh() reloads rows added by other replicas
+        """
+        self.threshold = threshold
+        self.ambiguity_margin = ambiguity_margin
+        self.refresh_interval_seconds = refresh_interval_seconds
+
+        self._names: Dict[str, str] = {}  # doctor_id -> name
+        self._tokens: Dict[str, List[str]] = {}  # doctor_id -> normalized tokens
+        self._postings: Dict[str, Set[str]] = defaultdict(set)  # index key -> doctor_ids
+        self._exact: Dict[Tuple[str, ...], Set[str]] = defaultdict(set)  # sorted tokens -> doctor_ids
+        self._last_row_id = 0
+        self._last_refresh = 0.0
+
+        self.resolved = 0
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    def contains(self, doctor_id: str) -> bool:
+        return doctor_id in self._names
+
+    @staticmethod
+    def _index_keys(tokens: List[str]) -> Set[str]:
+        keys = set()
+        for token in tokens:
+            keys.add(f"t:{token}")
+            if len(token) >= 5:
+                keys.add(f"p:{phonetic_key(token)}")
+            if len(token) >= 3:
+                keys.add(f"x:{token[:3]}")
+        return keys
+
+    def add(self, doctor_id: str, name: str):
+        """Add (or rename) a doctor"""
+        if doctor_id in self._names:
+            if self._names[doctor_id] == name:
+                return
+            self.remove(doctor_id)
+
+        tokens = normalize_name(name)
+        if not tokens:
+            return
+
+        self._names[doctor_id] = name
+        self._tokens[doctor_id] = tokens
+        self._exact[tuple(sorted(tokens))].add(doctor_id)
+        for key in self._index_keys(tokens):
+            self._postings[key].add(doctor_id)
+
+    def remove(self, doctor_id: str):
+        """Remove a doctor from the index"""
+        tokens = self._tokens.pop(doctor_id, None)
+        self._names.pop(doctor_id, None)
+        if tokens is None:
+            return
+
+        exact_key = tuple(sorted(tokens))
+        self._exact[exact_key].discard(doctor_id)
+        if not self._exact[exact_key]:
+            del self._exact[exact_key]
+
+        for key in self._index_keys(tokens):
+            postings = self._postings.get(key)
+            if postings is not None:
+                postings.discard(doctor_id)
+                if not postings:
+                    del self._postings[key]
+
+    async def refresh(self, force: bool = False) -> int:
+        """
+        Load doctors added since the last refresh (everything on the first call)
+
+        Args:
+            force: Reload even if the refresh interval hasn't passed
+
+        Returns:
+            Number of doctors loaded
+        """
+        now = time.monotonic()
+        if not force and now - self._last_refresh < self.refresh_interval_seconds:
+            return 0
+        self._last_refresh = now
+
+        from src.database import db
+
+        try:
+            rows = await db.fetch("""
+                SELECT id, doctor_id, name
+                FROM doctors
+                WHERE id > $1
+                ORDER BY id
+            """, self._last_row_id)
+        except Exception as e:
+            logger.warning(f"Could not refresh doctor name index: {e}")
+            return 0
+
+        for row in rows:
+            self.add(row["doctor_id"], row["name"])
+            self._last_row_id = row["id"]
+
+        if rows:
+            logger.info(f"📇 Doctor name index: +{len(rows)} doctors ({len(self)} total)")
+        return len(rows)
+
+    def search(self, name: str, limit: int = 5) -> List[Tuple[str, str, float]]:
+        """
+        Rank indexed doctors by similarity to a name
+
+        Args:
+            name: Name as typed by the user
+            limit: Maximum number of candidates
+
+        Returns:
+            [(doctor_id, name, score)], best first
+        """
+        tokens = normalize_name(name)
+        if not tokens:
+            return []
+
+        candidates: Set[str] = set()
+        for key in self._index_keys(tokens):
+            candidates.update(self._postings.get(key, ()))
+
+        scored = [
+            (doctor_id, self._names[doctor_id], name_similarity(tokens, self._tokens[doctor_id]))
+            for doctor_id in candidates
+        ]
+        scored.sort(key=lambda item: item[2], reverse=True)
+        return scored[:limit]
+
+    def resolve(self, name: str) -> Optional[Dict]:
+        """
+        Find the known doctor a name is another spelling of
+
+        Only identical normalized names match ("Dr. Mohd Ali bin Ahmad" / "Muhammad Ali
+        Ahmad", "Lim Nicholas" / "Nicholas Lim"); use suggest() for fuzzy matches.
+
+        Args:
+            name: Name as typed by the user
+
+        Returns:
+            {"doctor_id", "name", "score"} or None if no single doctor has that name
+        """
+        matches = self._exact.get(tuple(sorted(normalize_name(name))), ())
+        if len(matches) != 1:
+            if len(matches) > 1:
+                logger.info(f"🤔 Ambiguous doctor name '{name}': {len(matches)} doctors")
+            return None
+
+        doctor_id = next(iter(matches))
+        self.resolved += 1
+        return {"doctor_id": doctor_id, "name": self._names[doctor_id], "score": 1.0}
+
+    def suggest(self, name: str) -> Optional[Dict]:
+        """
+        Suggest a known doctor a name probably refers to (never merged automatically)
+
+        Args:
+            name: Name as typed by the user
+
+        Returns:
+            {"doctor_id", "name", "score"} or None if there is no confident, unambiguous match
+        """
+        ranked = self.search(name, limit=2)
+        if not ranked or ranked[0][2] < self.threshold:
+            return None
+
+        if len(ranked) > 1 and ranked[0][2] - ranked[1][2] < self.ambiguity_margin:
+            return None
+
+        doctor_id, matched_name, score = ranked[0]
+        return {"doctor_id": doctor_id, "name": matched_name, "score": score}
+
+    def stats(self) -> Dict:
+        """Get index size and resolution counter"""
+        return {
+            "doctors": len(self),
+            "keys": len(self._postings),
+            "resolved": self.resolved
+        }
@@ -0,0 +1,80 @@
+"""
+Doctor lookup by partial or misspelled name
+Uses pg_trgm trigram GIN indexes on the doctors table, so ranked candidates
+come back quickly even with 100k+ doctors
+"""
+
+import logging
+from typing import Dict, List, Optional
+
+from src.database import db
+from src.cache.doctor_index import strip_titles
+
+logger = logging.getLogger(__name__)
+
+
+class DoctorLookup:
+    """Ranked doctor search over the doctors table"""
+
+    # name % $1   -> whole-name similarity (misspellings: "Nicholaas Lim")
+    # $1 <% name  -> word similarity (partial names: "Nicholas" in "Nicholas Lim Wei")
+    # Both operators are served by the gin_trgm_ops indexes from add_doctor_trgm_indexes.sql.
+    # $1 keeps the user's spelling (only titles are stripped): doctors.name is stored as
+    # written, so alias rewriting ("mohd" -> "muhammad") would only lower the similarity
+    SEARCH_QUERY = """
+        SELECT
+            doctor_id, name, specialty, hospital_name, location, total_reviews,
+            GREATEST(similarity(name, $1), word_similarity($1, name)) AS score
+        FROM doctors
+        WHERE (name % $1 OR $1 <% name)
+        AND ($3::text IS NULL OR hospital_name % $3 OR $3 <% hospital_name)
+        ORDER BY score DESC, total_reviews DESC NULLS LAST
+        LIMIT $2
+    """
+
+    async def search(self, query: str, limit: int = 10, hospital: Optional[str] = None) -> List[Dict]:
+        """
+        Find doctors whose name resembles the query
+
+        Falls back to the in-memory name index if pg_trgm isn't installed.
+
+        Args:
+            query: Full, partial or misspelled doctor name (titles are ignored)
+            limit: Maximum number of candidates
+            hospital: Optional (partial) hospital name to narrow the results
+
+        Returns:
+            Candidates, best first:
+            [{"doctor_id", "name", "specialty", "hospital_name", "location", "total_reviews", "score"}]
+        """
+        search_text = strip_titles(query)
+        if not search_text:
+            return []
+
+        try:
+            rows = await db.fetch(self.SEARCH_QUERY, search_text, limit, hospital)
+            return [
+                {**dict(row), "score": round(float(row["score"]), 3)}
+                for row in rows
+            ]
+        except Exception as e:
+            logger.warning(f"Trigram doctor search failed, using in-memory index: {e}")
+
+        from src.cache.manager import cache_manager
+
+        return [
+            {
+                "doctor_id": doctor_id,
+                "name": name,
+                "specialty": None,
+                "hospital_name": None,
+                "location": None,
+                "total_reviews": None,
+                "score": round(score, 3)
+            }
+            for doctor_id, name, score in cache_manager.doctor_index.search(query, limit=limit)
+        ]
+
+
+# Global doctor lookup instance
+doctor_lookup = DoctorLookup()
@@ -0,0 +1,92 @@
+"""
+Incrementally maintained doctor statistics
+doctors.total_reviews / positive_reviews / negative_reviews / neutral_reviews /
+average_rating are updated by set-based deltas in the same statement that
+inserts or deletes reviews, so a doctor summary is a single row read
+"""
+
+# Per-doctor deltas of the rows in the "changed" CTE, applied to doctors.
+# Ratings of 0 mean "not mentioned" and don't count towards the average;
+# rated_reviews / rating_total keep the average exact as rows come and go.
+_APPLY_DELTAS = """
+    deltas AS (
+        SELECT
+            doctor_id,
+            COUNT(*) AS total,
+            COUNT(*) FILTER (WHERE sentiment = 'positive') AS positive,
+            COUNT(*) FILTER (WHERE sentiment = 'negative') AS negative,
+            COUNT(*) FILTER (WHERE sentiment = 'neutral') AS neutral,
+            COUNT(*) FILTER (WHERE rating > 0) AS rated,
+            COALESCE(SUM(rating) FILTER (WHERE rating > 0), 0) AS rating_total
+        FROM changed
+        GROUP BY doctor_id
+    ),
+    applied AS (
+        UPDATE doctors d
+        SET
+            total_reviews = GREATEST(COALESCE(d.total_reviews, 0) {sign} c.total, 0),
+            positive_reviews = GREATEST(COALESCE(d.positive_reviews, 0) {sign} c.positive, 0),
+            negative_reviews = GREATEST(COALESCE(d.negative_reviews, 0) {sign} c.negative, 0),
+            neutral_reviews = GREATEST(COALESCE(d.neutral_reviews, 0) {sign} c.neutral, 0),
+            rated_reviews = GREATEST(COALESCE(d.rated_reviews, 0) {sign} c.rated, 0),
+            rating_total = GREATEST(COALESCE(d.rating_total, 0) {sign} c.rating_total, 0),
+            average_rating = ROUND(
+                (COALESCE(d.rating_total, 0) {sign} c.rating_total)
+                / NULLIF(COALESCE(d.rated_reviews, 0) {sign} c.rated, 0),
+                1
+            )
+        FROM deltas c
+        WHERE d.doctor_id = c.doctor_id
+    )
+"""
+
+
+def with_review_deltas(change_query: str, added: bool, select: str) -> str:
+    """
+    Wrap an INSERT or DELETE on doctor_reviews so doctors' statistics move with it
+
+    Args:
+        change_query: INSERT/DELETE statement ending in
+            "RETURNING doctor_id, sentiment, rating[, ...]"
+        added: True if the rows were inserted, False if deleted
+        select: Final query over the "changed" CTE (e.g. "SELECT hash FROM changed")
+
+    Returns:
+        Single statement performing the change and the counter update
+    """
+    return (
+        f"WITH changed AS ({change_query}),"
+        + _APPLY_DELTAS.format(sign="+" if added else "-")
+        + select
+    )
+
+
+SUMMARY_QUERY = """
+    SELECT
+        doctor_id, name, total_reviews, positive_reviews, negative_reviews,
+        neutral_reviews, average_rating, rated_reviews
+    FROM doctors
+    WHERE doctor_id = $1
+"""
+
+
+def summarize(row) -> dict:
+    """
+    Build a doctor summary from a doctors row
+
+    Returns:
+        {"doctor_id", "name", "total_reviews", "positive_reviews", "negative_reviews",
+         "neutral_reviews", "average_rating", "rated_reviews", "positive_pct"}
+        positive_pct is the share of sentiment-analyzed reviews that are positive
+        (None until some reviews have been analyzed)
+    """
+    summary = dict(row)
+    for key in ("total_reviews", "positive_reviews", "negative_reviews", "neutral_reviews", "rated_reviews"):
+        summary[key] = summary.get(key) or 0
+
+    if summary.get("average_rating") is not None:
+        summary["average_rating"] = float(summary["average_rating"])
+
+    analyzed = summary["positive_reviews"] + summary["negative_reviews"] + summary["neutral_reviews"]
+    summary["positive_pct"] = round(100 * summary["positive_reviews"] / analyzed) if analyzed else None
+    return summary
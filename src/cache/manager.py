@@ -3,16 +3,31 @@ Cache manager for doctor reviews
 Handles caching logic to minimize API calls
 """
 
+import asyncio
 import hashlib
 import logging
+import time
 from datetime import datetime, timedelta
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Tuple
 from src.database import db
 from src.config import settings
+from src.cache.lru import LRUCache
+from src.cache.redis_cache import RedisCache
+from src.cache.doctor_index import DoctorNameIndex
+from src.cache.doctor_stats import SUMMARY_QUERY, summarize, with_review_deltas
 
 logger = logging.getLogger(__name__)
 
 
+def review_text(review: Dict) -> str:
+    """
+    Review body as stored in doctor_reviews.snippet
+
+    Search clients emit the body as "text"; rows read back from the cache have "snippet".
+    """
+    return review.get("snippet") or review.get("text") or ""
+
+
 class CacheManager:
     """Manages cached doctor review data"""
 
@@ -20,22 +35,83 @@ class CacheManager:
         self.default_ttl_days = settings.cache_default_ttl_days
         self.hot_ttl_days = settings.cache_hot_doctor_ttl_days
         self.cold_ttl_days = settings.cache_cold_doctor_ttl_days
+        self.stale_max_age_days = settings.cache_stale_max_age_days
+        self.hot_min_searches = settings.cache_hot_doctor_min_searches
+        self.popularity_window_days = settings.cache_popularity_window_days
+
+        # Background TTL extensions for hot doctors (kept so tasks aren't garbage-collected)
+        self._background_tasks = set()
+
+        # L1: in-process LRU in front of PostgreSQL, keyed by doctor_id
+        self.l1 = LRUCache(
+            max_entries=settings.cache_l1_max_entries,
+            ttl_seconds=settings.cache_l1_ttl_seconds
+        )
+
+        # L2: optional Redis tier shared by all replicas (only when REDIS_URL is set)
+        self.redis = RedisCache(
+            redis_url=settings.redis_url,
+            ttl_seconds=settings.cache_redis_ttl_seconds,
+            in_flight_ttl_seconds=settings.cache_in_flight_ttl_seconds
+        )
+
+        # Fuzzy name -> doctor_id resolution, so name variants share one cache entry
+        self.doctor_index = DoctorNameIndex(
+            threshold=settings.doctor_match_threshold,
+            refresh_interval_seconds=settings.doctor_index_refresh_seconds
+        )
+
+    async def connect(self):
+        """Connect optional cache tiers and load the doctor name index (called on application startup)"""
+        await self.redis.connect()
+        await self.doctor_index.refresh(force=True)
+
+    async def disconnect(self):
+        """Close optional cache tiers (called on application shutdown)"""
+        await self.redis.disconnect()
 
     async def get_cached_reviews(self, doctor_id: str) -> Optional[List[Dict]]:
         """
         Get cached reviews for a doctor
 
+        Checks the in-process L1 cache first, then the shared Redis tier,
+        then PostgreSQL.
+
         Args:
             doctor_id: Doctor's unique identifier
 
         Returns:
             List of cached reviews or None if not found/expired
         """
+        reviews, _ = await self.lookup_cached_reviews(doctor_id)
+        return reviews
+
+    async def lookup_cached_reviews(self, doctor_id: str) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Get cached reviews for a doctor together with the tier that served them
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            (reviews, tier) where tier is "l1", "redis" or "db", or (None, None) on a miss
+        """
+        l1_reviews = self.l1.get(doctor_id)
+        if l1_reviews is not None:
+            logger.info(f"⚡ L1 cache hit for doctor_id: {doctor_id}, found {len(l1_reviews)} reviews")
+            return list(l1_reviews), "l1"
+
+        shared = await self.redis.get_reviews(doctor_id)
+        if shared is not None:
+            logger.info(f"⚡ Redis cache hit for doctor_id: {doctor_id}, found {len(shared['reviews'])} reviews")
+            self.l1.set(doctor_id, shared["reviews"], expires_at=shared["expires_at"])
+            return list(shared["reviews"]), "redis"
+
         try:
             query = """
                 SELECT
                     snippet, sentiment, source, url, rating,
-                    review_date, author_name, metadata
+                    review_date, author_name, metadata, valid_until
                 FROM doctor_reviews
                 WHERE doctor_id = $1
                   AND valid_until > NOW()
@@ -54,13 +130,70 @@ class CacheManager:
 
             if reviews:
                 logger.info(f"✅ Cache hit for doctor_id: {doctor_id}, found {len(reviews)} reviews")
-                return reviews
+
+                # L1 entry must not outlive the earliest-expiring row
+                earliest_expiry = min(review["valid_until"] for review in reviews).timestamp()
+                self.l1.set(doctor_id, reviews, expires_at=earliest_expiry)
+                await self.redis.set_reviews(doctor_id, reviews, expires_at=earliest_expiry)
+
+                # Slide the expiry forward for hot doctors without delaying the response
+                task = asyncio.create_task(self.extend_hot_ttl(doctor_id))
+                self._background_tasks.add(task)
+                task.add_done_callback(self._background_tasks.discard)
+
+                return list(reviews), "db"
             else:
                 logger.info(f"❌ Cache miss for doctor_id: {doctor_id}")
-                return None
+                return None, None
 
         except Exception as e:
             logger.error(f"Error fetching cached reviews: {e}")
+            return None, None
+
+    async def get_stale_reviews(self, doctor_id: str) -> Optional[List[Dict]]:
+        """
+        Get expired-but-recent reviews for stale-while-revalidate
+
+        Only called after get_cached_reviews misses. Returns reviews whose
+        valid_until passed less than cache_stale_max_age_days ago.
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            List of stale reviews or None if nothing recent enough
+        """
+        if self.stale_max_age_days <= 0:
+            return None
+
+        try:
+            query = """
+                SELECT
+                    snippet, sentiment, source, url, rating,
+                    review_date, author_name, metadata, valid_until
+                FROM doctor_reviews
+                WHERE doctor_id = $1
+                  AND valid_until > NOW() - make_interval(days => $2)
+                  AND display_policy != 'hidden'
+                ORDER BY
+                    CASE sentiment
+                        WHEN 'positive' THEN 1
+                        WHEN 'neutral' THEN 2
+                        WHEN 'negative' THEN 3
+                    END,
+                    rating DESC,
+                    review_date DESC
+            """
+
+            reviews = await db.fetch(query, doctor_id, self.stale_max_age_days)
+
+            if reviews:
+                logger.info(f"🕰️ Stale cache hit for doctor_id: {doctor_id}, found {len(reviews)} reviews")
+                return reviews
+            return None
+
+        except Exception as e:
+            logger.error(f"Error fetching stale reviews: {e}")
             return None
 
     async def save_reviews(
@@ -68,7 +201,8 @@ class CacheManager:
         doctor_id: str,
         doctor_name: str,
         reviews: List[Dict],
-        ttl_days: Optional[int] = None
+        ttl_days: Optional[int] = None,
+        replace: bool = False
     ) -> int:
         """
         Save reviews to cache
@@ -77,38 +211,46 @@ class CacheManager:
             doctor_id: Doctor's unique identifier
             doctor_name: Doctor's name
             reviews: List of review dicts
-            ttl_days: Time-to-live in days (optional)
+            ttl_days: Time-to-live in days (optional, chosen by popularity if omitted)
+            replace: Delete the doctor's existing reviews in the same transaction,
+                so readers see either the old set or the new one (used by refreshes
+                in which every source succeeded)
+
+        All reviews are written with a single multi-row INSERT on one
+        connection inside one transaction, so write latency stays roughly
+        constant in the number of reviews.
 
         Returns:
-            Number of reviews saved
+            Number of reviews inserted (the rest were duplicates and skipped)
         """
         if not reviews:
             return 0
 
         if ttl_days is None:
-            ttl_days = self.default_ttl_days
+            ttl_days = await self.choose_ttl_days(doctor_id)
+
+        # Rows for this doctor are changing - drop stale L1/Redis entries
+        self.l1.invalidate(doctor_id)
+        await self.redis.invalidate(doctor_id)
 
         try:
-            saved_count = 0
             valid_until = datetime.now() + timedelta(days=ttl_days)
 
-            # First, ensure doctor record exists (for foreign key constraint)
-            await self._ensure_doctor_exists(doctor_id, doctor_name)
+            # Build one column array per field so the whole batch is a single INSERT
+            # (duplicates within the batch are dropped here, duplicates already
+            # in the table are skipped by ON CONFLICT)
+            columns = {
+                "doctor_specialty": [], "hospital_name": [], "location": [], "source": [],
+                "url": [], "snippet": [], "sentiment": [], "rating": [], "review_date": [],
+                "author_name": [], "hash": []
+            }
+            seen_hashes = set()
 
             for review in reviews:
-                # Generate unique hash
-                content = f"{review.get('url', '')}|{review.get('snippet', '')}"
-                hash_value = hashlib.sha256(content.encode()).hexdigest()
-
-                # Insert or ignore if duplicate (PostgreSQL: ON CONFLICT DO NOTHING)
-                query = """
-                    INSERT INTO doctor_reviews (
-                        doctor_id, doctor_name, doctor_specialty, hospital_name, location,
-                        source, url, snippet, sentiment, rating, review_date, author_name,
-                        hash, fetched_at, valid_until, display_policy, metadata
-                    ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, NOW(), $14, 'normal', $15)
-                    ON CONFLICT (hash) DO NOTHING
-                """
+                hash_value = self.generate_review_hash(review)
+                if hash_value in seen_hashes:
+                    continue
+                seen_hashes.add(hash_value)
 
                 # Convert empty strings to None for database fields
                 review_date = review.get("review_date")
@@ -121,37 +263,251 @@ class CacheManager:
                     except ValueError:
                         review_date = None
 
-                result = await db.execute(
-                    query,
-                    doctor_id,
-                    doctor_name,
-                    review.get("doctor_specialty"),
-                    review.get("hospital_name"),
-                    review.get("location"),
-                    review.get("source"),
-                    review.get("url"),
-                    review.get("snippet"),
-                    review.get("sentiment"),
-                    review.get("rating"),
-                    review_date,  # Use None or datetime.date object
-                    review.get("author_name"),
-                    hash_value,
-                    valid_until,  # Use datetime object directly
-                    None  # metadata as JSON
+                columns["doctor_specialty"].append(review.get("doctor_specialty"))
+                columns["hospital_name"].append(review.get("hospital_name"))
+                columns["location"].append(review.get("location"))
+                columns["source"].append(review.get("source"))
+                columns["url"].append(review.get("url"))
+                columns["snippet"].append(review_text(review))
+                columns["sentiment"].append(review.get("sentiment"))
+                columns["rating"].append(review.get("rating"))
+                columns["review_date"].append(review_date)  # Use None or datetime.date object
+                columns["author_name"].append(review.get("author_name"))
+                columns["hash"].append(hash_value)
+
+            # Insert or ignore if duplicate (PostgreSQL: ON CONFLICT DO NOTHING)
+            # RETURNING gives the rows actually inserted, so skipped = total - inserted;
+            # the same statement adds them to the doctor's statistics
+            query = with_review_deltas("""
+                INSERT INTO doctor_reviews (
+                    doctor_id, doctor_name, doctor_specialty, hospital_name, location,
+                    source, url, snippet, sentiment, rating, review_date, author_name,
+                    hash, fetched_at, valid_until, display_policy, metadata
                 )
-
-                # PostgreSQL execute returns command tag (e.g., "INSERT 0 1")
-                # Check if insertion was successful
-                if "INSERT" in result:
-                    saved_count += 1
-
-            logger.info(f"💾 Saved {saved_count}/{len(reviews)} reviews to cache for {doctor_name}")
+                SELECT
+                    $1::text, $2::text, r.doctor_specialty, r.hospital_name, r.location,
+                    r.source, r.url, r.snippet, r.sentiment, r.rating, r.review_date, r.author_name,
+                    r.hash, NOW(), $3::timestamp, 'normal', NULL::jsonb
+                FROM unnest(
+                    $4::text[], $5::text[], $6::text[], $7::text[], $8::text[], $9::text[],
+                    $10::text[], $11::numeric[], $12::date[], $13::text[], $14::text[]
+                ) AS r(
+                    doctor_specialty, hospital_name, location, source, url, snippet,
+                    sentiment, rating, review_date, author_name, hash
+                )
+                ON CONFLICT (hash) DO NOTHING
+                RETURNING doctor_id, sentiment, rating, hash
+            """, added=True, select="SELECT hash FROM changed")
+
+            # One connection, one transaction for the doctor row and all reviews
+            async with db.acquire() as conn:
+                async with conn.transaction():
+                    # First, ensure doctor record exists (for foreign key constraint)
+                    await self._ensure_doctor_exists(doctor_id, doctor_name, conn=conn)
+
+                    if replace:
+                        await conn.execute(with_review_deltas("""
+                            DELETE FROM doctor_reviews
+                            WHERE doctor_id = $1
+                            RETURNING doctor_id, sentiment, rating
+                        """, added=False, select="SELECT COUNT(*) FROM changed"), doctor_id)
+
+                    inserted = await conn.fetch(
+                        query,
+                        doctor_id,
+                        doctor_name,
+                        valid_until,  # Use datetime object directly
+                        *columns.values()
+                    )
+
+            saved_count = len(inserted)
+            skipped_count = len(reviews) - saved_count
+
+            # New doctors become resolvable right away (no-op if already indexed)
+            self.doctor_index.add(doctor_id, doctor_name)
+
+            # Drop anything a concurrent read cached while we were writing
+            self.l1.invalidate(doctor_id)
+            await self.redis.invalidate(doctor_id)
+
+            logger.info(f"💾 Saved {saved_count}/{len(reviews)} reviews to cache for {doctor_name} ({skipped_count} duplicates skipped)")
             return saved_count
 
         except Exception as e:
             logger.error(f"Error saving reviews to cache: {e}")
             return 0
 
+    async def get_search_count(self, doctor_id: str) -> int:
+        """
+        Count recent searches for a doctor (across all replicas, from search_logs)
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            Number of searches within the popularity window
+        """
+        query = """
+            SELECT COUNT(*)
+            FROM search_logs
+            WHERE doctor_id = $1
+              AND created_at >= NOW() - make_interval(days => $2)
+        """
+        return await db.fetchval(query, doctor_id, self.popularity_window_days) or 0
+
+    async def choose_ttl_days(self, doctor_id: str) -> int:
+        """
+        Choose a cache TTL from the doctor's search frequency
+
+        - Hot (>= cache_hot_doctor_min_searches recent searches): hot TTL
+        - Cold (no recent searches before this one): cold TTL
+        - Otherwise: default TTL
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            TTL in days
+        """
+        try:
+            search_count = await self.get_search_count(doctor_id)
+        except Exception as e:
+            logger.warning(f"Could not read search frequency, using default TTL: {e}")
+            return self.default_ttl_days
+
+        if search_count >= self.hot_min_searches:
+            ttl_days = self.hot_ttl_days
+        elif search_count == 0:
+            ttl_days = self.cold_ttl_days
+        else:
+            ttl_days = self.default_ttl_days
+
+        logger.info(f"⏳ TTL for doctor_id {doctor_id}: {ttl_days} days ({search_count} recent searches)")
+        return ttl_days
+
+    async def extend_hot_ttl(self, doctor_id: str) -> int:
+        """
+        Extend a hot doctor's valid cache rows to NOW() + hot TTL (sliding expiry)
+
+        Only touches rows that are still valid and would expire sooner;
+        the popularity check runs in the same statement.
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            Number of rows extended
+        """
+        try:
+            query = """
+                UPDATE doctor_reviews
+                SET valid_until = NOW() + make_interval(days => $2)
+                WHERE doctor_id = $1
+                  AND valid_until > NOW()
+                  AND valid_until < NOW() + make_interval(days => $2)
+                  AND (
+                      SELECT COUNT(*)
+                      FROM search_logs
+                      WHERE doctor_id = $1
+                        AND created_at >= NOW() - make_interval(days => $3)
+                  ) >= $4
+            """
+
+            result = await db.execute(
+                query, doctor_id, self.hot_ttl_days, self.popularity_window_days, self.hot_min_searches
+            )
+
+            # PostgreSQL execute returns command tag (e.g., "UPDATE 12")
+            extended = int(result.split()[-1]) if result else 0
+            if extended:
+                logger.info(f"🔥 Extended TTL of {extended} cached reviews for hot doctor_id: {doctor_id}")
+            return extended
+
+        except Exception as e:
+            logger.warning(f"Could not extend TTL for hot doctor: {e}")
+            return 0
+
+    def generate_review_hash(self, review: Dict) -> str:
+        """
+        Generate the content hash used to deduplicate reviews (doctor_reviews.hash)
+
+        Args:
+            review: Review dict
+
+        Returns:
+            SHA256 hex digest of url and review text
+        """
+        content = f"{review.get('url', '')}|{review_text(review)}"
+        return hashlib.sha256(content.encode()).hexdigest()
+
+    def get_l1_stats(self) -> Dict:
+        """
+        Get L1 (in-process) cache statistics
+
+        Returns:
+            Dict with size, hits, misses, evictions and hit rate
+        """
+        return self.l1.stats()
+
+    def get_redis_stats(self) -> Dict:
+        """
+        Get shared Redis cache statistics
+
+        Returns:
+            Dict with enabled flag, hits, misses and hit rate
+        """
+        return self.redis.stats()
+
+    async def mark_search_in_flight(self, doctor_id: str) -> Optional[str]:
+        """
+        Claim a doctor search across replicas
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            Owner token if this replica should run the search, None if another replica already is
+        """
+        return await self.redis.mark_in_flight(doctor_id)
+
+    async def clear_search_in_flight(self, doctor_id: str, token: Optional[str]):
+        """
+        Release a doctor search claimed with mark_search_in_flight
+
+        Only the claim's owner releases it; without a token (the claim went to
+        another replica) this is a no-op.
+
+        Args:
+            doctor_id: Doctor's unique identifier
+            token: Token returned by mark_search_in_flight
+        """
+        await self.redis.clear_in_flight(doctor_id, token)
+
+    async def wait_for_shared_reviews(
+        self,
+        doctor_id: str,
+        timeout: float,
+        poll_interval: float = 1.0
+    ) -> Tuple[Optional[List[Dict]], Optional[str]]:
+        """
+        Wait for another replica's in-flight search to finish and read its results
+
+        Args:
+            doctor_id: Doctor's unique identifier
+            timeout: Maximum time to wait (seconds)
+            poll_interval: Time between marker checks (seconds)
+
+        Returns:
+            (reviews, tier) as returned by lookup_cached_reviews; (None, None)
+            if the other search failed or timed out
+        """
+        deadline = time.monotonic() + timeout
+
+        while time.monotonic() < deadline and await self.redis.is_in_flight(doctor_id):
+            await asyncio.sleep(poll_interval)
+
+        return await self.lookup_cached_reviews(doctor_id)
+
     async def check_cache_status(self, doctor_id: str) -> Dict:
         """
         Check cache status for a doctor
@@ -167,7 +523,8 @@ class CacheManager:
                 SELECT
                     COUNT(*) as total,
                     SUM(CASE WHEN valid_until > NOW() THEN 1 ELSE 0 END) as valid,
-                    MAX(fetched_at) as last_fetched
+                    MAX(fetched_at) as last_fetched,
+                    MIN(CASE WHEN valid_until > NOW() THEN valid_until END) as next_expiry
                 FROM doctor_reviews
                 WHERE doctor_id = $1
             """
@@ -176,22 +533,44 @@ class CacheManager:
 
             return {
                 "total_cached": result["total"] if result else 0,
-                "valid_count": result["valid"] if result else 0,
+                "valid_count": (result["valid"] or 0) if result else 0,
                 "last_fetched": result["last_fetched"] if result else None,
-                "cache_valid": (result["valid"] if result else 0) > 0
+                "next_expiry": result["next_expiry"] if result else None,
+                "cache_valid": ((result["valid"] or 0) if result else 0) > 0
             }
 
         except Exception as e:
             logger.error(f"Error checking cache status: {e}")
             return {"cache_valid": False}
 
-    async def _ensure_doctor_exists(self, doctor_id: str, doctor_name: str):
+    async def get_doctor_summary(self, doctor_id: str) -> Optional[Dict]:
+        """
+        Get a doctor's review statistics ("4.6★ from 23 reviews, 80% positive")
+
+        Reads the counters maintained by save_reviews and the sentiment worker,
+        so this is one primary-key row read rather than a scan of doctor_reviews.
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            Summary dict (see doctor_stats.summarize) or None if the doctor is unknown
+        """
+        try:
+            row = await db.fetchrow(SUMMARY_QUERY, doctor_id)
+            return summarize(row) if row else None
+        except Exception as e:
+            logger.error(f"Error fetching doctor summary: {e}")
+            return None
+
+    async def _ensure_doctor_exists(self, doctor_id: str, doctor_name: str, conn=None):
         """
         Ensure doctor record exists in doctors table (for foreign key constraint)
         
         Args:
             doctor_id: Doctor's unique identifier
             doctor_name: Doctor's name
+            conn: Connection to run on (optional, for use inside a transaction)
         """
         try:
             # Try to insert doctor record, ignore if exists
@@ -200,10 +579,61 @@ class CacheManager:
                 VALUES ($1, $2, NOW(), NOW())
                 ON CONFLICT (doctor_id) DO NOTHING
             """
-            await db.execute(query, doctor_id, doctor_name)
+            await (conn or db).execute(query, doctor_id, doctor_name)
         except Exception as e:
+            if conn is not None:
+                # Inside a transaction the error has aborted it - let the caller handle it
+                raise
             logger.warning(f"Could not ensure doctor exists: {e}")
 
+    async def resolve_doctor_id(self, name: str, hospital: str = "", location: str = "") -> str:
+        """
+        Map a name as typed by the user to the doctor_id it should be cached under
+
+        Exact IDs of known doctors are used as-is. Otherwise the name index looks
+        for a known doctor with the same normalized name ("Mohd Ali" -> "Muhammad Ali",
+        "Lim Nicholas" -> "Nicholas Lim") and the ID is generated from that doctor's
+        name, so both spellings share one cache entry. Fuzzy matches ("Dr. Nick Lim")
+        are only logged as suggestions and keep their own ID, like unknown names.
+
+        Args:
+            name: Doctor's name as typed
+            hospital: Hospital name (optional)
+            location: Location (optional)
+
+        Returns:
+            Doctor ID to use for cache lookups and saves
+        """
+        doctor_id = self.generate_doctor_id(name, hospital, location)
+
+        await self.doctor_index.refresh()
+        if self.doctor_index.contains(doctor_id):
+            return doctor_id
+
+        match = self.doctor_index.resolve(name)
+        if match is None:
+            suggestion = self.doctor_index.suggest(name)
+            if suggestion is not None:
+                logger.info(
+                    f"📇 '{name}' looks like known doctor '{suggestion['name']}' "
+                    f"(score {suggestion['score']:.2f}), not merged"
+                )
+            return doctor_id
+
+        canonical_id = self.generate_doctor_id(match["name"], hospital, location)
+        if canonical_id != doctor_id:
+            logger.info(f"📇 Resolved '{name}' to known doctor '{match['name']}'")
+        return canonical_id
+
+    def get_doctor_index_stats(self) -> Dict:
+        """
+        Get doctor name index statistics
+
+        Returns:
+            Dict with indexed doctors, index keys and resolved lookups
+        """
+        return self.doctor_index.stats()
+
     def generate_doctor_id(self, name: str, hospital: str = "", location: str = "") -> str:
         """
         Generate a unique doctor ID from name and optional identifiers
@@ -250,12 +680,13 @@ class CacheManager:
             Number of deleted entries
         """
         try:
-            query = """
+            query = with_review_deltas("""
                 DELETE FROM doctor_reviews
                 WHERE valid_until < NOW() - INTERVAL '30 days'
-            """
+                RETURNING doctor_id, sentiment, rating
+            """, added=False, select="SELECT COUNT(*) FROM changed")
 
-            result = await db.execute(query)
+            result = await db.fetchval(query)
             logger.info(f"🧹 Cleaned up {result} expired cache entries")
             return result
 
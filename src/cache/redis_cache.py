@@ -0,0 +1,229 @@
+"""
+Redis-backed shared cache tier (L2)
+Shares review lists and in-flight search markers across uvicorn replicas
+"""
+
+import json
+import logging
+import time
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _json_default(value: Any):
+    """Serialize values asyncpg returns that json can't handle"""
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    return str(value)
+
+
+# doctor_reviews columns _json_default flattens, restored on read so a Redis hit
+# has the same types as an asyncpg row (DATE, TIMESTAMP, DECIMAL)
+_REVIEW_COLUMN_TYPES = {
+    "review_date": date.fromisoformat,
+    "valid_until": datetime.fromisoformat,
+    "rating": lambda value: Decimal(str(value)),
+}
+
+
+def _restore_review(review: Dict) -> Dict:
+    """Convert a review read back from JSON to the types PostgreSQL returns"""
+    for column, restore in _REVIEW_COLUMN_TYPES.items():
+        value = review.get(column)
+        if value is not None and not isinstance(value, (date, Decimal)):
+            review[column] = restore(value)
+    return review
+
+
+class RedisCache:
+    """Shared cache between the in-process L1 cache and PostgreSQL"""
+
+    REVIEWS_KEY = "doctor_reviews:{doctor_id}"
+    IN_FLIGHT_KEY = "doctor_search_in_flight:{doctor_id}"
+
+    # Delete the marker only if it still holds our token (it may have expired and
+    # been claimed by another replica while our search was running)
+    RELEASE_SCRIPT = """
+        if redis.call("get", KEYS[1]) == ARGV[1] then
+            return redis.call("del", KEYS[1])
+        end
+        return 0
+    """
+
+    def __init__(self, redis_url: Optional[str] = None, ttl_seconds: int = 3600,
+                 in_flight_ttl_seconds: int = 240, client=None):
+        """
+        Args:
+            redis_url: Redis connection URL (tier is disabled when empty)
+            ttl_seconds: Maximum lifetime of a cached review list
+            in_flight_ttl_seconds: Lifetime of an in-flight search marker
+            client: Pre-built async Redis client (used by tests)
+        """
+        self.redis_url = redis_url
+        self.ttl_seconds = ttl_seconds
+        self.in_flight_ttl_seconds = in_flight_ttl_seconds
+        self.client = client
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.client is not None
+
+    async def connect(self):
+        """Connect to Redis if REDIS_URL is configured (failures disable the tier)"""
+        if self.client is not None or not self.redis_url:
+            return
+
+        try:
+            import redis.asyncio as redis
+        except ImportError:
+            logger.warning("⚠️ REDIS_URL is set but the redis package is not installed, shared cache disabled")
+            return
+
+        try:
+            client = redis.from_url(self.redis_url, decode_responses=True)
+            await client.ping()
+            self.client = client
+            logger.info("✅ Redis shared cache connected")
+        except Exception as e:
+            logger.warning(f"⚠️ Could not connect to Redis, shared cache disabled: {e}")
+
+    async def disconnect(self):
+        """Close the Redis connection"""
+        if self.client is not None and self.redis_url:
+            try:
+                await self.client.aclose()
+            except Exception as e:
+                logger.warning(f"Error closing Redis connection: {e}")
+            self.client = None
+
+    async def get_reviews(self, doctor_id: str) -> Optional[Dict]:
+        """
+        Get a cached review list
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            {"reviews": [...], "expires_at": unix timestamp} or None
+            (review dates, timestamps and ratings come back as date, datetime and Decimal)
+        """
+        if not self.enabled:
+            return None
+
+        try:
+            payload = await self.client.get(self.REVIEWS_KEY.format(doctor_id=doctor_id))
+        except Exception as e:
+            logger.warning(f"Redis get failed: {e}")
+            return None
+
+        if payload is None:
+            self.misses += 1
+            return None
+
+        self.hits += 1
+        shared = json.loads(payload)
+        shared["reviews"] = [_restore_review(review) for review in shared["reviews"]]
+        return shared
+
+    async def set_reviews(self, doctor_id: str, reviews: List[Dict], expires_at: float):
+        """
+        Store a review list
+
+        Args:
+            doctor_id: Doctor's unique identifier
+            reviews: Reviews (dicts or asyncpg Records)
+            expires_at: Unix timestamp the entry must not outlive (earliest valid_until)
+        """
+        if not self.enabled:
+            return
+
+        ttl = int(min(self.ttl_seconds, expires_at - time.time()))
+        if ttl <= 0:
+            return
+
+        payload = json.dumps(
+            {"reviews": [dict(review) for review in reviews], "expires_at": expires_at},
+            default=_json_default,
+            ensure_ascii=False
+        )
+
+        try:
+            await self.client.set(self.REVIEWS_KEY.format(doctor_id=doctor_id), payload, ex=ttl)
+        except Exception as e:
+            logger.warning(f"Redis set failed: {e}")
+
+    async def invalidate(self, doctor_id: str):
+        """Remove a doctor's cached review list"""
+        if not self.enabled:
+            return
+
+        try:
+            await self.client.delete(self.REVIEWS_KEY.format(doctor_id=doctor_id))
+        except Exception as e:
+            logger.warning(f"Redis delete failed: {e}")
+
+    async def mark_in_flight(self, doctor_id: str) -> Optional[str]:
+        """
+        Claim the in-flight marker for a doctor search
+
+        Args:
+            doctor_id: Doctor's unique identifier
+
+        Returns:
+            Owner token if this caller should run the search (pass it to clear_in_flight),
+            None if another replica already is
+        """
+        token = uuid.uuid4().hex
+        if not self.enabled:
+            return token
+
+        try:
+            acquired = await self.client.set(
+                self.IN_FLIGHT_KEY.format(doctor_id=doctor_id),
+                token,
+                ex=self.in_flight_ttl_seconds,
+                nx=True
+            )
+            return token if acquired else None
+        except Exception as e:
+            logger.warning(f"Redis in-flight marker failed: {e}")
+            return token
+
+    async def is_in_flight(self, doctor_id: str) -> bool:
+        """Check whether any replica is currently searching this doctor"""
+        if not self.enabled:
+            return False
+
+        try:
+            return await self.client.get(self.IN_FLIGHT_KEY.format(doctor_id=doctor_id)) is not None
+        except Exception as e:
+            logger.warning(f"Redis in-flight check failed: {e}")
+            return False
+
+    async def clear_in_flight(self, doctor_id: str, token: Optional[str]):
+        """Release the in-flight marker for a doctor search, if it is still ours"""
+        if not self.enabled or not token:
+            return
+
+        try:
+            await self.client.eval(self.RELEASE_SCRIPT, 1, self.IN_FLIGHT_KEY.format(doctor_id=doctor_id), token)
+        except Exception as e:
+            logger.warning(f"Redis in-flight release failed: {e}")
+
+    def stats(self) -> Dict:
+        """Get hit/miss counters"""
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups * 100) if lookups else 0.0
+        }
@@ -39,6 +39,14 @@ class Settings(BaseSettings):
     # OpenAI API
     openai_api_key: str = Field(..., env="OPENAI_API_KEY")
     openai_model: str = Field(default="gpt-4-turbo", env="OPENAI_MODEL")
+    sentiment_concurrency: int = Field(default=4, env="SENTIMENT_CONCURRENCY")  # Sentiment chunks sent to OpenAI at once
+    sentiment_engine: str = Field(default="openai", env="SENTIMENT_ENGINE")  # "openai" or "local" (in-process lexicon)
+    # Background sentiment stage (fills doctor_reviews.sentiment after results are sent)
+    sentiment_worker_enabled: bool = Field(default=True, env="SENTIMENT_WORKER_ENABLED")
+    sentiment_batch_size: int = Field(default=50, env="SENTIMENT_BATCH_SIZE")  # Reviews claimed per round
+    sentiment_poll_interval_seconds: float = Field(default=30.0, env="SENTIMENT_POLL_INTERVAL_SECONDS")
+    sentiment_claim_lease_seconds: float = Field(default=300.0, env="SENTIMENT_CLAIM_LEASE_SECONDS")  # Claimed rows are retried after this
+    sentiment_max_attempts: int = Field(default=3, env="SENTIMENT_MAX_ATTEMPTS")  # Rows still failing after this are left unanalyzed
 
     # Google Custom Search API
     google_search_api_key: Optional[str] = Field(None, env="GOOGLE_SEARCH_API_KEY")
@@ -52,8 +60,91 @@ class Settings(BaseSettings):
 
     # Cache Settings
     cache_default_ttl_days: int = Field(default=7, env="CACHE_DEFAULT_TTL_DAYS")
-    cache_hot_doctor_ttl_days: int = Field(default=7, env="CACHE_HOT_DOCTOR_TTL_DAYS")
+    cache_hot_doctor_ttl_days: int = Field(default=14, env="CACHE_HOT_DOCTOR_TTL_DAYS")
     cache_cold_doctor_ttl_days: int = Field(default=3, env="CACHE_COLD_DOCTOR_TTL_DAYS")
+    cache_hot_doctor_min_searches: int = Field(default=5, env="CACHE_HOT_DOCTOR_MIN_SEARCHES")  # Searches within the window to count as hot
+    cache_popularity_window_days: int = Field(default=7, env="CACHE_POPULARITY_WINDOW_DAYS")
+    cache_stale_max_age_days: int = Field(default=30, env="CACHE_STALE_MAX_AGE_DAYS")  # Serve expired caches this long while refreshing (0 disables)
+    cache_l1_max_entries: int = Field(default=1000, env="CACHE_L1_MAX_ENTRIES")  # In-process LRU size (0 disables)
+    cache_l1_ttl_seconds: int = Field(default=300, env="CACHE_L1_TTL_SECONDS")
+    doctor_match_threshold: float = Field(default=0.8, env="DOCTOR_MATCH_THRESHOLD")  # Name similarity needed to suggest a known doctor (only identical normalized names share a cache)
+    doctor_index_refresh_seconds: float = Field(default=60.0, env="DOCTOR_INDEX_REFRESH_SECONDS")  # Pick up doctors added by other replicas
+
+    # Outbound HTTP (shared keep-alive pools, per upstream host)
+    http_max_connections_per_host: int = Field(default=20, env="HTTP_MAX_CONNECTIONS_PER_HOST")
+    http_max_keepalive_connections_per_host: int = Field(default=10, env="HTTP_MAX_KEEPALIVE_CONNECTIONS_PER_HOST")
+    http_keepalive_expiry_seconds: float = Field(default=60.0, env="HTTP_KEEPALIVE_EXPIRY_SECONDS")
+
+    # Search Settings (per-source and overall deadlines for the concurrent fan-out)
+    search_outscraper_timeout_seconds: float = Field(default=60.0, env="SEARCH_OUTSCRAPER_TIMEOUT_SECONDS")
+    search_chatgpt_timeout_seconds: float = Field(default=180.0, env="SEARCH_CHATGPT_TIMEOUT_SECONDS")
+    search_total_timeout_seconds: float = Field(default=190.0, env="SEARCH_TOTAL_TIMEOUT_SECONDS")
+    # Per-source timeouts adapt to observed p95 latency, capped by the fixed timeouts above
+    search_timeout_p95_multiplier: float = Field(default=1.5, env="SEARCH_TIMEOUT_P95_MULTIPLIER")
+    search_min_timeout_seconds: float = Field(default=5.0, env="SEARCH_MIN_TIMEOUT_SECONDS")
+    # Source scheduling (providers in src/search/providers.py)
+    search_source_strategy: str = Field(default="parallel", env="SEARCH_SOURCE_STRATEGY")  # "parallel" or "cheapest_first" (one source at a time)
+    search_early_exit_reviews: int = Field(default=0, env="SEARCH_EARLY_EXIT_REVIEWS")  # Stop once this many reviews arrive (0 = wait for every source)
+    # cheapest_first only calls the next (more expensive) source while fewer reviews than this have arrived.
+    # Outscraper only covers Google Maps, so a low value skips the forum search for most doctors.
+    search_cheapest_first_min_reviews: int = Field(default=5, env="SEARCH_CHEAPEST_FIRST_MIN_REVIEWS")
+    search_disabled_sources: str = Field(default="", env="SEARCH_DISABLED_SOURCES")  # Comma-separated provider names, e.g. "chatgpt"
+    search_outscraper_cost_usd: float = Field(default=0.005, env="SEARCH_OUTSCRAPER_COST_USD")  # Estimated cost per search
+    search_chatgpt_cost_usd: float = Field(default=0.03, env="SEARCH_CHATGPT_COST_USD")
+    # Per-source circuit breakers (skip a failing source, probe it again after the cool-down)
+    circuit_breaker_window_size: int = Field(default=20, env="CIRCUIT_BREAKER_WINDOW_SIZE")  # Recent calls tracked per source
+    circuit_breaker_min_requests: int = Field(default=5, env="CIRCUIT_BREAKER_MIN_REQUESTS")
+    circuit_breaker_failure_rate: float = Field(default=0.5, env="CIRCUIT_BREAKER_FAILURE_RATE")
+    circuit_breaker_open_seconds: float = Field(default=60.0, env="CIRCUIT_BREAKER_OPEN_SECONDS")
+    # LLM response cache (identical ChatGPT search / parse requests reuse the stored response)
+    llm_cache_enabled: bool = Field(default=True, env="LLM_CACHE_ENABLED")
+    llm_cache_search_ttl_hours: float = Field(default=24.0, env="LLM_CACHE_SEARCH_TTL_HOURS")  # web_search responses (results go stale)
+    llm_cache_ttl_hours: float = Field(default=720.0, env="LLM_CACHE_TTL_HOURS")  # Other calls, e.g. parsing a summary
+    llm_cache_max_entries: int = Field(default=5000, env="LLM_CACHE_MAX_ENTRIES")  # Least recently used entries are evicted
+    llm_cache_max_entry_kb: int = Field(default=512, env="LLM_CACHE_MAX_ENTRY_KB")  # Larger responses aren't cached
+    # ChatGPT forum search (src/search/chatgpt_search.py)
+    chatgpt_structured_output: bool = Field(default=True, env="CHATGPT_STRUCTURED_OUTPUT")  # web_search returns JSON reviews directly (false = two-step parse)
+    chatgpt_per_site_search: bool = Field(default=False, env="CHATGPT_PER_SITE_SEARCH")  # One concurrent web_search per forum site
+    chatgpt_site_max_searches: int = Field(default=2, env="CHATGPT_SITE_MAX_SEARCHES")  # max_tool_calls per site
+    chatgpt_site_timeout_seconds: float = Field(default=60.0, env="CHATGPT_SITE_TIMEOUT_SECONDS")  # A site slower than this counts as no results
+
+    # Background prefetch of popular doctors (off by default - every refresh is a paid search)
+    prefetch_enabled: bool = Field(default=False, env="PREFETCH_ENABLED")
+    prefetch_interval_minutes: int = Field(default=60, env="PREFETCH_INTERVAL_MINUTES")
+    prefetch_top_n: int = Field(default=20, env="PREFETCH_TOP_N")
+    prefetch_concurrency: int = Field(default=2, env="PREFETCH_CONCURRENCY")
+    prefetch_refresh_before_hours: int = Field(default=24, env="PREFETCH_REFRESH_BEFORE_HOURS")  # Refresh caches expiring within this window
+    prefetch_daily_budget_usd: float = Field(default=1.0, env="PREFETCH_DAILY_BUDGET_USD")
+    prefetch_cost_per_search_usd: float = Field(default=0.01, env="PREFETCH_COST_PER_SEARCH_USD")
+    prefetch_offpeak_start_hour_utc: int = Field(default=17, env="PREFETCH_OFFPEAK_START_HOUR_UTC")  # 01:00 in Malaysia
+    prefetch_offpeak_end_hour_utc: int = Field(default=22, env="PREFETCH_OFFPEAK_END_HOUR_UTC")  # 06:00 in Malaysia
+
+    # WhatsApp Delivery
+    # Send each source's results as soon as it finishes instead of one final batch
+    progressive_delivery_enabled: bool = Field(default=True, env="PROGRESSIVE_DELIVERY_ENABLED")
+    # Durable outbound queue (PostgreSQL) drained by a pool of sender workers
+    outbound_queue_enabled: bool = Field(default=True, env="OUTBOUND_QUEUE_ENABLED")
+    outbound_workers: int = Field(default=3, env="OUTBOUND_WORKERS")
+    outbound_rate_per_second: float = Field(default=5.0, env="OUTBOUND_RATE_PER_SECOND")  # Sends per second from our Twilio number
+    outbound_max_attempts: int = Field(default=5, env="OUTBOUND_MAX_ATTEMPTS")
+    outbound_retry_base_seconds: float = Field(default=2.0, env="OUTBOUND_RETRY_BASE_SECONDS")  # Doubles on every retry
+    outbound_retry_max_seconds: float = Field(default=300.0, env="OUTBOUND_RETRY_MAX_SECONDS")
+    outbound_poll_interval_seconds: float = Field(default=1.0, env="OUTBOUND_POLL_INTERVAL_SECONDS")
+    outbound_lease_seconds: float = Field(default=120.0, env="OUTBOUND_LEASE_SECONDS")  # A send not finished by then is retried by any replica
+    outbound_retention_days: int = Field(default=7, env="OUTBOUND_RETENTION_DAYS")  # Keep sent messages this long
+    # Bounded inbound job queue (webhook messages are processed by a fixed worker pool)
+    inbound_workers: int = Field(default=8, env="INBOUND_WORKERS")  # Keep well below the 20-connection DB pool
+    inbound_queue_max_size: int = Field(default=200, env="INBOUND_QUEUE_MAX_SIZE")
+    inbound_queue_max_per_user: int = Field(default=3, env="INBOUND_QUEUE_MAX_PER_USER")
+    inbound_drain_timeout_seconds: float = Field(default=25.0, env="INBOUND_DRAIN_TIMEOUT_SECONDS")
+    # Persistent search jobs (resumed after restarts; safe across replicas)
+    search_jobs_enabled: bool = Field(default=True, env="SEARCH_JOBS_ENABLED")
+    search_job_workers: int = Field(default=6, env="SEARCH_JOB_WORKERS")  # Concurrent searches per replica
+    search_job_max_attempts: int = Field(default=3, env="SEARCH_JOB_MAX_ATTEMPTS")
+    search_job_lease_margin_seconds: int = Field(default=60, env="SEARCH_JOB_LEASE_MARGIN_SECONDS")  # Added to SEARCH_TOTAL_TIMEOUT_SECONDS
+    search_job_poll_interval_seconds: float = Field(default=2.0, env="SEARCH_JOB_POLL_INTERVAL_SECONDS")
+    search_job_retention_days: int = Field(default=7, env="SEARCH_JOB_RETENTION_DAYS")
+    search_job_drain_timeout_seconds: float = Field(default=25.0, env="SEARCH_JOB_DRAIN_TIMEOUT_SECONDS")  # Running searches past this go back to pending on shutdown
 
     # Rate Limiting
     rate_limit_per_user_monthly: int = Field(default=50, env="RATE_LIMIT_PER_USER_MONTHLY")  # Monthly limit for regular users
@@ -68,8 +159,10 @@ class Settings(BaseSettings):
     log_level: str = Field(default="INFO", env="LOG_LEVEL")
     sentry_dsn: Optional[str] = Field(None, env="SENTRY_DSN")
 
-    # Optional: Redis
+    # Optional: Redis (shared cache tier across replicas, disabled when unset)
     redis_url: Optional[str] = Field(None, env="REDIS_URL")
+    cache_redis_ttl_seconds: int = Field(default=3600, env="CACHE_REDIS_TTL_SECONDS")
+    cache_in_flight_ttl_seconds: int = Field(default=240, env="CACHE_IN_FLIGHT_TTL_SECONDS")  # Should exceed SEARCH_TOTAL_TIMEOUT_SECONDS
 
 
 # Create global settings instance
@@ -38,6 +38,17 @@ class Database:
             await self.pool.close()
             logger.info("Database connection pool closed")
 
+    def acquire(self):
+        """
+        Acquire a pooled connection for multi-statement work
+
+        Usage:
+            async with db.acquire() as conn:
+                async with conn.transaction():
+                    ...
+        """
+        return self.pool.acquire()
+
     async def execute(self, query: str, *args):
         """Execute a query without returning results"""
         async with self.pool.acquire() as conn:
@@ -35,6 +35,30 @@ async def lifespan(app: FastAPI):
         await db.connect()
         logger.info("✅ Database connected")
 
+        # Optional shared cache tier (Redis)
+        from src.cache.manager import cache_manager
+        await cache_manager.connect()
+
+        # Background refresh of popular doctors (no-op unless PREFETCH_ENABLED)
+        from src.search.prefetch import prefetch_scheduler
+        await prefetch_scheduler.start()
+
+        # Outbound WhatsApp sender workers
+        from src.whatsapp.outbound import outbound_queue
+        await outbound_queue.start()
+
+        # Background sentiment stage for newly saved reviews
+        from src.analysis.worker import sentiment_worker
+        await sentiment_worker.start()
+
+        # Search job runner (resumes searches interrupted by the last restart)
+        from src.whatsapp.search_jobs import search_job_runner
+        await search_job_runner.start()
+
+        # Inbound webhook workers
+        from src.whatsapp.inbound import inbound_queue
+        await inbound_queue.start()
+
     except Exception as e:
         logger.error(f"❌ Startup failed: {e}")
         raise
@@ -44,6 +68,29 @@ async def lifespan(app: FastAPI):
     # Shutdown
     logger.info("👋 Shutting down Doctor Review Bot...")
     try:
+        # Finish queued searches first - their replies still need the outbound workers
+        from src.whatsapp.inbound import inbound_queue
+        await inbound_queue.stop()
+
+        from src.whatsapp.search_jobs import search_job_runner
+        await search_job_runner.stop()
+
+        from src.search.prefetch import prefetch_scheduler
+        await prefetch_scheduler.stop()
+
+        from src.analysis.worker import sentiment_worker
+        await sentiment_worker.stop()
+
+        # Stop sender workers before the HTTP clients and database go away
+        from src.whatsapp.outbound import outbound_queue
+        await outbound_queue.stop()
+
+        from src.cache.manager import cache_manager
+        await cache_manager.disconnect()
+
+        from src.utils.http_client import close_http_clients
+        await close_http_clients()
+
         await db.disconnect()
         logger.info("✅ Cleanup completed")
     except Exception as e:
@@ -93,13 +140,32 @@ async def health_check():
         # Always use PostgreSQL
         from src.database import db
 
+        from src.cache.manager import cache_manager
+        from src.whatsapp.outbound import outbound_queue
+        from src.whatsapp.inbound import inbound_queue
+        from src.whatsapp.search_jobs import search_job_runner
+        from src.search.aggregator import search_aggregator
+        from src.analysis.worker import sentiment_worker
+        from src.search.llm_cache import llm_cache
+        from src.utils.llm_usage import get_llm_usage_totals
+
         # Check database connection
         await db.fetchval("SELECT 1")
 
         return {
             "status": "healthy",
             "environment": settings.environment,
-            "database": "connected"
+            "database": "connected",
+            "cache_l1": cache_manager.get_l1_stats(),
+            "cache_redis": cache_manager.get_redis_stats(),
+            "doctor_index": cache_manager.get_doctor_index_stats(),
+            "outbound_queue": await outbound_queue.get_stats(),
+            "inbound_queue": inbound_queue.get_stats(),
+            "search_jobs": await search_job_runner.get_stats(),
+            "source_breakers": search_aggregator.get_breaker_stats(),
+            "sentiment_worker": await sentiment_worker.get_stats(),
+            "llm_cache": await llm_cache.get_stats(),
+            "llm_usage": get_llm_usage_totals()
         }
     except Exception as e:
         logger.error(f"Health check failed: {e}")
@@ -25,7 +25,12 @@ class SearchLogger:
         results_count: int,
         api_calls_count: int = 0,
         estimated_cost_usd: float = 0.0,
-        error_message: Optional[str] = None
+        error_message: Optional[str] = None,
+        input_tokens: int = 0,
+        output_tokens: int = 0,
+        reasoning_tokens: int = 0,
+        web_search_calls: int = 0,
+        llm_time_ms: int = 0
     ):
         """
         Log a search query
@@ -38,9 +43,14 @@ class SearchLogger:
             response_time_ms: Response time in milliseconds
             sources_used: List of data sources used
             results_count: Number of results returned
-            api_calls_count: Number of API calls made
-            estimated_cost_usd: Estimated cost in USD
+            api_calls_count: Number of billed OpenAI API calls made
+            estimated_cost_usd: Estimated OpenAI cost in USD (tokens + web_search calls)
             error_message: Error message if any
+            input_tokens: OpenAI input tokens
+            output_tokens: OpenAI output tokens (including reasoning tokens)
+            reasoning_tokens: OpenAI reasoning tokens
+            web_search_calls: web_search tool calls made by the model
+            llm_time_ms: Wall time spent in OpenAI calls (summed across concurrent calls)
         """
         try:
             query = """
@@ -48,8 +58,10 @@ class SearchLogger:
                     user_id, doctor_name, doctor_id, location,
                     cache_hit, response_time_ms, sources_used, results_count,
                     api_calls_count, estimated_cost_usd, error_message,
+                    input_tokens, output_tokens, reasoning_tokens,
+                    web_search_calls, llm_time_ms,
                     created_at
-                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, NOW())
+                ) VALUES ($1, $2, $3, $4, $5, $6, $7, $8, $9, $10, $11, $12, $13, $14, $15, $16, NOW())
             """
 
             # Convert sources list to JSON string
@@ -67,10 +79,18 @@ class SearchLogger:
                 results_count,
                 api_calls_count,
                 estimated_cost_usd,
-                error_message
+                error_message,
+                input_tokens,
+                output_tokens,
+                reasoning_tokens,
+                web_search_calls,
+                llm_time_ms
             )
 
-            logger.info(f"📝 Logged search: {doctor_name} (cache_hit={cache_hit}, time={response_time_ms}ms)")
+            logger.info(
+                f"📝 Logged search: {doctor_name} (cache_hit={cache_hit}, time={response_time_ms}ms, "
+                f"api_calls={api_calls_count}, cost=${estimated_cost_usd:.4f})"
+            )
 
         except Exception as e:
             logger.error(f"Error logging search: {e}")
@@ -102,7 +122,10 @@ class SearchLogger:
                     SUM(CASE WHEN cache_hit = true THEN 1 ELSE 0 END) as cache_hits,
                     AVG(response_time_ms) as avg_response_time,
                     SUM(estimated_cost_usd) as total_cost,
-                    SUM(api_calls_count) as total_api_calls
+                    SUM(api_calls_count) as total_api_calls,
+                    SUM(input_tokens) as total_input_tokens,
+                    SUM(output_tokens) as total_output_tokens,
+                    SUM(web_search_calls) as total_web_search_calls
                 FROM search_logs
                 WHERE DATE(created_at) = CURRENT_DATE
             """
@@ -116,7 +139,10 @@ class SearchLogger:
                     "cache_hit_rate": (result["cache_hits"] or 0) / max(result["total_searches"] or 1, 1) * 100,
                     "avg_response_time_ms": result["avg_response_time"] or 0,
                     "total_cost_usd": result["total_cost"] or 0,
-                    "total_api_calls": result["total_api_calls"] or 0
+                    "total_api_calls": result["total_api_calls"] or 0,
+                    "total_input_tokens": result["total_input_tokens"] or 0,
+                    "total_output_tokens": result["total_output_tokens"] or 0,
+                    "total_web_search_calls": result["total_web_search_calls"] or 0
                 }
 
             return {}
@@ -1,34 +1,120 @@
 """
 搜索聚合器 - 最优方案
 整合 Outscraper（Google Maps）+ ChatGPT（Facebook/论坛）
+数据源通过 src/search/providers.py 的注册表提供，按成本 / 预期耗时调度
 """
 
+import asyncio
 import logging
-from typing import Dict, List
-from src.search.outscraper_client import get_outscraper_client
-from src.search.chatgpt_search import get_chatgpt_client
+import time
+from typing import AsyncIterator, Awaitable, Dict, List, Optional, Tuple
+from src.config import settings
+from src.search.providers import SourceProvider, SourceRegistry, get_source_registry
 from src.cache.manager import cache_manager
+from src.search.circuit_breaker import CircuitBreaker, create_source_breaker
+from src.analysis.worker import sentiment_worker
+from src.utils.llm_usage import track_llm_usage
 
 logger = logging.getLogger(__name__)
 
 
+class _InFlightSearch:
+    """
+    同一医生的进行中搜索（single-flight）
+
+    搜索在独立任务中执行，事件按顺序记录；所有调用方（包括第一个）都从头回放，
+    因此后加入的调用方也能收到完整事件，任何调用方提前退出都不会影响其他人
+    """
+
+    def __init__(self):
+        self.events: List[Dict] = []
+        self.finished = False
+        self.subscribers = 0
+        self.task: asyncio.Task = None
+        self._condition = asyncio.Condition()
+
+    async def publish(self, event: Dict):
+        """记录一个事件并唤醒等待的调用方"""
+        async with self._condition:
+            self.events.append(event)
+            self._condition.notify_all()
+
+    async def finish(self):
+        """标记搜索结束"""
+        async with self._condition:
+            self.finished = True
+            self._condition.notify_all()
+
+    async def subscribe(self) -> AsyncIterator[Dict]:
+        """从头回放事件，并等待后续事件直到搜索结束"""
+        index = 0
+
+        while True:
+            async with self._condition:
+                await self._condition.wait_for(lambda: index < len(self.events) or self.finished)
+                new_events = self.events[index:]
+                finished = self.finished
+
+            for event in new_events:
+                yield event
+            index += len(new_events)
+
+            if finished and index >= len(self.events):
+                return
+
+
 class SearchAggregator:
     """
     搜索聚合器 - 简化版
 
-    数据源：
+    数据源（注册表中的 SourceProvider，默认）：
     1. Outscraper（关键词搜索 Google Maps 评价）
     2. ChatGPT（web search Facebook 和论坛）
+
+    调度（SEARCH_SOURCE_STRATEGY）：
+    - parallel：所有数据源并发执行，用户只需等待最慢的数据源
+    - cheapest_first：按成本从低到高逐个执行，找到足够评价后不再调用更贵的数据源
+    两种方式都支持 SEARCH_EARLY_EXIT_REVIEWS：评价数量达到后取消其余数据源
     """
 
-    def __init__(self):
-        """初始化搜索聚合器"""
-        self.outscraper_client = get_outscraper_client()
-        self.chatgpt_client = get_chatgpt_client()
+    def __init__(self, registry: Optional[SourceRegistry] = None):
+        """
+        初始化搜索聚合器
 
-        logger.info("🚀 搜索聚合器已初始化（最优方案）")
-        logger.info(f"  - Outscraper: {'✅ 已启用' if self.outscraper_client.enabled else '❌ 未配置'}")
-        logger.info(f"  - ChatGPT: {'✅ 已启用' if self.chatgpt_client.enabled else '❌ 未配置'}")
+        Args:
+            registry: 数据源注册表（默认使用全局注册表）
+        """
+        self.registry = registry or get_source_registry()
+
+        # 进行中的搜索（按 doctor_id），并发请求同一医生时共享一次搜索
+        self._in_flight: Dict[str, _InFlightSearch] = {}
+        self.coalesced_searches = 0
+
+        # 后台刷新任务（按 doctor_id），用于 stale-while-revalidate
+        self._refresh_tasks: Dict[str, asyncio.Task] = {}
+
+        # 每个数据源的熔断器（同时提供基于 p95 的自适应超时），之后注册的数据源在首次使用时创建
+        self.breakers: Dict[str, CircuitBreaker] = {}
+
+        logger.info(f"🚀 搜索聚合器已初始化（最优方案，调度: {settings.search_source_strategy}）")
+        for provider in self.registry:
+            self._breaker(provider)
+            logger.info(f"  - {provider.label}: {'✅ 已启用' if provider.enabled else '❌ 未配置或已禁用'}")
+
+    def _breaker(self, provider: SourceProvider) -> CircuitBreaker:
+        """获取数据源的熔断器（不存在时创建）"""
+        breaker = self.breakers.get(provider.name)
+        if breaker is None:
+            breaker = create_source_breaker(provider.label, provider.max_timeout_seconds)
+            self.breakers[provider.name] = breaker
+        return breaker
+
+    def get_breaker_stats(self) -> Dict[str, Dict]:
+        """获取每个数据源的元数据和熔断器状态（用于 /health）"""
+        stats = {}
+        for provider in self.registry:
+            stats[provider.name] = {**provider.describe(), **self._breaker(provider).stats()}
+        return stats
 
     async def search_doctor_reviews(
         self,
@@ -43,7 +129,8 @@ class SearchAggregator:
         1. 检查缓存
         2. Outscraper：搜索 Google Maps 评价（关键词搜索）
         3. ChatGPT：搜索 Facebook + 论坛（web search）
-        4. 合并结果
+           （步骤 2 和 3 并发执行，各自有超时，另有整体截止时间）
+        4. 合并已完成数据源的结果
         5. 缓存结果
 
         Args:
@@ -56,147 +143,527 @@ class SearchAggregator:
                 "doctor_name": "Dr. Nicholas Lim",
                 "doctor_id": "...",
                 "reviews": [...],
-                "google_maps_count": 5,
+                "google_maps_count": 5,            # 各数据源声明的 count_key
                 "facebook_forums_count": 3,
+                "source_counts": {"outscraper": 5, "chatgpt": 3},
                 "total_count": 8,
                 "sources": ["outscraper", "chatgpt"],
-                "chatgpt_summary": "..."
+                "chatgpt_summary": "..."           # 各数据源的文本总结（目前只有 ChatGPT 提供）
             }
         """
+        result = {}
+
+        async for event in self.stream_doctor_reviews(doctor_name, location, specialty):
+            if event["type"] == "done":
+                result = event["result"]
+
+        return result
+
+    async def stream_doctor_reviews(
+        self,
+        doctor_name: str,
+        location: str = "Malaysia",
+        specialty: str = ""
+    ) -> AsyncIterator[Dict]:
+        """
+        渐进式搜索医生评价：每个数据源完成后立即产出一个事件
+
+        调用方可以先发送 Google Maps 结果，再在论坛结果返回后补发
+
+        Args:
+            doctor_name: 医生名字
+            location: 地点（默认 Malaysia）
+            specialty: 专科（可选，暂未使用）
+
+        同一医生（相同 doctor_id）的并发调用会合并为一次搜索，共享其结果，
+        避免群聊转发时重复调用付费 API
+
+        Yields:
+            {"type": "cache", "reviews": [...], "stale": False,
+             "cache_tier": "l1", "doctor_stats": {...}}                   缓存命中（stale=True 表示已过期、正在后台刷新；
+                                                                          cache_tier 为命中的缓存层 l1 / redis / db / stale；
+                                                                          doctor_stats 为 CacheManager.get_doctor_summary）
+            {"type": "source", "source": "outscraper", "reviews": [...]}  某个数据源完成
+            {"type": "done", "result": {...}}                             最终合并结果（与 search_doctor_reviews 返回值相同）
+        """
+        # 名字变体（"Dr. Nick Lim" / "Nicholas Lim"）解析到同一位已知医生，共用缓存
+        doctor_id = await cache_manager.resolve_doctor_id(doctor_name, specialty, location)
+
+        flight = self._in_flight.get(doctor_id)
+        if flight is None:
+            flight = _InFlightSearch()
+            self._in_flight[doctor_id] = flight
+            flight.task = asyncio.create_task(
+                self._run_flight(flight, doctor_name, doctor_id, location)
+            )
+        else:
+            self.coalesced_searches += 1
+            logger.info(f"🔗 {doctor_name} 已在搜索中，共享进行中的搜索结果（第 {flight.subscribers + 1} 个调用方）")
+
+        flight.subscribers += 1
+        async for event in flight.subscribe():
+            yield event
+
+    async def _run_flight(self, flight: _InFlightSearch, doctor_name: str, doctor_id: str, location: str):
+        """执行一次搜索并把事件发布给所有调用方"""
         try:
-            # 生成医生 ID
-            doctor_id = cache_manager.generate_doctor_id(doctor_name, specialty, location)
+            async for event in self._stream_search(doctor_name, doctor_id, location):
+                await flight.publish(event)
+        finally:
+            self._in_flight.pop(doctor_id, None)
+            await flight.finish()
 
+    async def _stream_search(self, doctor_name: str, doctor_id: str, location: str) -> AsyncIterator[Dict]:
+        """
+        实际执行搜索（缓存 → 并发数据源 → 合并），事件格式见 stream_doctor_reviews
+
+        Args:
+            doctor_name: 医生名字
+            doctor_id: 医生 ID
+            location: 地点
+        """
+        try:
             logger.info(f"🔍 搜索医生评价: {doctor_name} ({doctor_id})")
 
             # 步骤 1：检查缓存（如果数据库可用）
             try:
-                cached_reviews = await cache_manager.get_cached_reviews(doctor_id)
+                cached_reviews, cache_tier = await cache_manager.lookup_cached_reviews(doctor_id)
 
                 if cached_reviews:
-                    logger.info(f"✅ 使用缓存结果：{len(cached_reviews)} 条评价")
-                    return {
-                        "doctor_name": doctor_name,
-                        "doctor_id": doctor_id,
-                        "reviews": cached_reviews,
-                        "source": "cache",
-                        "total_count": len(cached_reviews)
+                    logger.info(f"✅ 使用缓存结果（{cache_tier}）：{len(cached_reviews)} 条评价")
+                    yield {
+                        "type": "cache", "reviews": cached_reviews, "cache_tier": cache_tier,
+                        "doctor_stats": await cache_manager.get_doctor_summary(doctor_id)
+                    }
+                    yield {"type": "done", "result": self._cached_result(doctor_name, doctor_id, cached_reviews, cache_tier)}
+                    return
+
+                # 缓存已过期但仍在宽限期内：立即返回旧结果，并在后台刷新（stale-while-revalidate）
+                stale_reviews = await cache_manager.get_stale_reviews(doctor_id)
+
+                if stale_reviews:
+                    logger.info(f"🕰️ 使用过期缓存结果：{len(stale_reviews)} 条评价，后台刷新中")
+                    self._schedule_refresh(doctor_name, doctor_id, location)
+                    yield {
+                        "type": "cache", "reviews": stale_reviews, "stale": True, "cache_tier": "stale",
+                        "doctor_stats": await cache_manager.get_doctor_summary(doctor_id)
                     }
+                    yield {"type": "done", "result": self._cached_result(doctor_name, doctor_id, stale_reviews, "stale", stale=True)}
+                    return
             except Exception as cache_error:
                 logger.warning(f"⚠️ 缓存检查失败（可能数据库未初始化）: {cache_error}")
 
-            # 步骤 2：Outscraper - Google Maps 评价（关键词搜索）
-            all_reviews = []
-            google_maps_count = 0
-            facebook_forums_count = 0
-            chatgpt_summary = ""
-
-            if self.outscraper_client.enabled:
-                logger.info(f"📍 Outscraper 关键词搜索...")
-
-                outscraper_result = await self.outscraper_client.search_doctor_reviews(
-                    doctor_name=doctor_name,
-                    location=location,
-                    limit=20  # 最多 20 条评价
+            # 其他副本正在搜索同一位医生：等待其结果写入共享缓存，避免重复调用付费 API
+            # 没有拿到标记（token 为 None）时不会释放其他实例的标记
+            in_flight_token = await cache_manager.mark_search_in_flight(doctor_id)
+            if not in_flight_token:
+                logger.info(f"⏳ 其他实例正在搜索 {doctor_name}，等待共享缓存结果...")
+                shared_reviews, cache_tier = await cache_manager.wait_for_shared_reviews(
+                    doctor_id, timeout=settings.search_total_timeout_seconds
                 )
 
-                outscraper_reviews = outscraper_result.get("reviews", [])
-                google_maps_count = len(outscraper_reviews)
-
-                if outscraper_reviews:
-                    logger.info(f"✅ Outscraper 找到 {google_maps_count} 条 Google Maps 评价")
-                    all_reviews.extend(outscraper_reviews)
-                else:
-                    logger.warning("⚠️ Outscraper 未找到评价")
-            else:
-                logger.warning("⚠️ Outscraper 未配置，跳过 Google Maps 搜索")
-
-            # 步骤 3：ChatGPT - Facebook + 论坛
-            if self.chatgpt_client.enabled:
-                logger.info(f"🤖 ChatGPT 搜索 Facebook 和论坛...")
-
-                chatgpt_result = await self.chatgpt_client.search_facebook_and_forums(
-                    doctor_name=doctor_name,
-                    location=location
-                )
+                if shared_reviews:
+                    logger.info(f"✅ 使用共享缓存结果（{cache_tier}）：{len(shared_reviews)} 条评价")
+                    yield {
+                        "type": "cache", "reviews": shared_reviews, "cache_tier": cache_tier,
+                        "doctor_stats": await cache_manager.get_doctor_summary(doctor_id)
+                    }
+                    yield {"type": "done", "result": self._cached_result(doctor_name, doctor_id, shared_reviews, cache_tier)}
+                    return
 
-                chatgpt_reviews = chatgpt_result.get("reviews", [])
-                chatgpt_summary = chatgpt_result.get("summary", "")
-                chatgpt_citations = chatgpt_result.get("citations", [])
-                facebook_forums_count = len(chatgpt_reviews)
-
-                # Responses API 返回 summary 和 citations，而不是结构化的 reviews
-                # 检查是否有实质内容（summary 或 citations）
-                has_content = (
-                    chatgpt_summary and chatgpt_summary != "No results found" and len(chatgpt_summary) > 50
-                ) or len(chatgpt_citations) > 0
-
-                if chatgpt_reviews:
-                    logger.info(f"✅ ChatGPT 找到 {facebook_forums_count} 条 Facebook/论坛评价")
-                    all_reviews.extend(chatgpt_reviews)
-                elif has_content:
-                    logger.info(f"✅ ChatGPT 找到患者评价信息（{len(chatgpt_citations)} 个来源）")
-                    # 即使没有结构化 reviews，也记录找到了内容
-                else:
-                    logger.warning("⚠️ ChatGPT 未找到评价")
-            else:
-                logger.warning("⚠️ ChatGPT 未配置，跳过 Facebook/论坛搜索")
+            try:
+                # 步骤 2 + 3：并发启动所有已启用的数据源，按完成顺序产出
+                # 用户只需等待最慢的数据源，而不是所有数据源耗时之和
+                source_results = {}
+
+                async for name, source_result in self._iter_sources(doctor_name, location):
+                    source_results[name] = source_result
+                    yield {
+                        "type": "source",
+                        "source": name,
+                        "reviews": source_result.get("reviews", []),
+                        "summary": source_result.get("summary", ""),
+                        "citations": source_result.get("citations", []),
+                        "error": source_result.get("error")
+                    }
 
-            # 步骤 4：合并结果
-            total_count = len(all_reviews)
+                # 步骤 4 + 5：合并并缓存
+                result = await self._merge_results(doctor_name, doctor_id, source_results)
+            finally:
+                await cache_manager.clear_search_in_flight(doctor_id, in_flight_token)
 
-            # 检查是否有任何有价值的内容（结构化评价或 ChatGPT summary）
-            has_chatgpt_content = chatgpt_summary and chatgpt_summary != "No results found" and len(chatgpt_summary) > 50
+            yield {"type": "done", "result": result}
 
-            if total_count == 0 and not has_chatgpt_content:
-                logger.warning(f"❌ 未找到 {doctor_name} 的评价")
-                return {
+        except Exception as e:
+            logger.error(f"❌ 搜索失败: {e}")
+            yield {
+                "type": "done",
+                "result": {
                     "doctor_name": doctor_name,
-                    "doctor_id": doctor_id,
                     "reviews": [],
-                    "google_maps_count": 0,
-                    "facebook_forums_count": 0,
                     "total_count": 0,
-                    "chatgpt_summary": chatgpt_summary if 'chatgpt_summary' in locals() else "",
-                    "chatgpt_citations": chatgpt_citations if 'chatgpt_citations' in locals() else [],
-                    "message": "未找到评价，建议尝试不同的医生名字拼写"
+                    "error": str(e)
                 }
+            }
 
-            logger.info(f"✅ 搜索完成：共 {total_count} 条评价（Google Maps: {google_maps_count}, Facebook/论坛: {facebook_forums_count}）")
+    def _cached_result(
+        self, doctor_name: str, doctor_id: str, reviews: List[Dict], cache_tier: str, stale: bool = False
+    ) -> Dict:
+        """构建缓存命中时的返回结果（cache_tier 为命中的缓存层；stale=True 表示缓存已过期，正在后台刷新）"""
+        return {
+            "doctor_name": doctor_name,
+            "doctor_id": doctor_id,
+            "reviews": reviews,
+            "source": "cache",
+            "cache_tier": cache_tier,
+            "stale": stale,
+            "total_count": len(reviews)
+        }
+
+    async def refresh_doctor_reviews(
+        self,
+        doctor_name: str,
+        location: str = "Malaysia",
+        specialty: str = ""
+    ):
+        """
+        主动刷新某位医生的缓存（供后台预取使用）
 
-            # 步骤 5：缓存结果（如果数据库可用）
-            try:
-                await cache_manager.save_reviews(doctor_id, doctor_name, all_reviews)
-            except Exception as cache_error:
-                logger.warning(f"⚠️ 缓存保存失败（可能数据库未初始化）: {cache_error}")
+        与请求触发的后台刷新共用去重：同一医生已在刷新时只等待该刷新完成
 
-            # 返回结果
-            result_message = f"找到 {total_count} 条评价"
-            if total_count == 0 and has_chatgpt_content:
-                result_message = f"找到患者评价信息（来自 {len(chatgpt_citations)} 个来源）"
+        Args:
+            doctor_name: 医生名字
+            location: 地点（默认 Malaysia）
+            specialty: 专科（可选，暂未使用）
+        """
+        doctor_id = await cache_manager.resolve_doctor_id(doctor_name, specialty, location)
+        self._schedule_refresh(doctor_name, doctor_id, location)
 
-            return {
-                "doctor_name": doctor_name,
-                "doctor_id": doctor_id,
-                "reviews": all_reviews,
-                "google_maps_count": google_maps_count,
-                "facebook_forums_count": facebook_forums_count,
-                "total_count": total_count,
-                "sources": ["outscraper", "chatgpt"],
-                "chatgpt_summary": chatgpt_summary if 'chatgpt_summary' in locals() else "",
-                "chatgpt_citations": chatgpt_citations if 'chatgpt_citations' in locals() else [],
-                "message": result_message
-            }
+        task = self._refresh_tasks.get(doctor_id)
+        if task is not None:
+            await asyncio.shield(task)
+
+    def _schedule_refresh(self, doctor_name: str, doctor_id: str, location: str):
+        """
+        在后台刷新过期缓存（同一医生同时只有一个刷新任务）
+
+        Args:
+            doctor_name: 医生名字
+            doctor_id: 医生 ID
+            location: 地点
+        """
+        if doctor_id in self._refresh_tasks:
+            return
+
+        task = asyncio.create_task(self._refresh_reviews(doctor_name, doctor_id, location))
+        self._refresh_tasks[doctor_id] = task
+        task.add_done_callback(lambda _: self._refresh_tasks.pop(doctor_id, None))
+
+    async def _refresh_reviews(self, doctor_name: str, doctor_id: str, location: str):
+        """
+        重新搜索所有数据源，并原子替换该医生的旧评价
+
+        只有所有已启用的数据源都成功返回时才替换；有数据源超时、出错、熔断跳过或
+        被提前结束跳过时，只追加新评价，保留旧评价（否则该数据源的评价会被清空）
+
+        刷新产生的 OpenAI 用量单独统计并记录日志，不计入触发刷新的那次用户搜索
+        （那次搜索在刷新完成前就已写入 search_logs）
+
+        Args:
+            doctor_name: 医生名字
+            doctor_id: 医生 ID
+            location: 地点
+        """
+        # 其他实例已在搜索该医生，无需重复刷新
+        in_flight_token = await cache_manager.mark_search_in_flight(doctor_id)
+        if not in_flight_token:
+            return
+
+        try:
+            logger.info(f"🔄 后台刷新缓存: {doctor_name} ({doctor_id})")
+
+            source_results = {}
+            with track_llm_usage(detached=True) as llm_usage:
+                async for name, source_result in self._iter_sources(doctor_name, location):
+                    source_results[name] = source_result
+
+            logger.info(
+                f"💵 后台刷新 OpenAI 用量: {doctor_name}（api_calls={llm_usage.calls}, "
+                f"tokens={llm_usage.input_tokens} in / {llm_usage.output_tokens} out, "
+                f"web_search={llm_usage.web_search_calls}, cost=${llm_usage.cost_usd:.4f}）"
+            )
+
+            missing = [
+                provider.name for provider in self.registry.enabled()
+                if provider.name not in source_results or source_results[provider.name].get("error")
+            ]
+            if missing:
+                logger.warning(f"⚠️ 数据源未完整返回（{', '.join(missing)}），保留旧评价，只追加新评价")
+
+            result = await self._merge_results(doctor_name, doctor_id, source_results, replace=not missing)
+            logger.info(f"✅ 后台刷新完成: {doctor_name}（{result.get('total_count', 0)} 条评价）")
 
         except Exception as e:
-            logger.error(f"❌ 搜索失败: {e}")
+            logger.error(f"❌ 后台刷新失败: {doctor_name}: {e}")
+        finally:
+            await cache_manager.clear_search_in_flight(doctor_id, in_flight_token)
+
+    async def _merge_results(
+        self,
+        doctor_name: str,
+        doctor_id: str,
+        source_results: Dict[str, Dict],
+        replace: bool = False
+    ) -> Dict:
+        """
+        合并已完成数据源的结果并写入缓存
+
+        Args:
+            doctor_name: 医生名字
+            doctor_id: 医生 ID
+            source_results: {数据源名称: 数据源结果}
+            replace: 是否原子替换该医生的旧评价（后台刷新时使用）
+
+        Returns:
+            最终搜索结果（格式见 search_doctor_reviews）
+        """
+        all_reviews = []
+        source_counts = {}
+        summaries = []
+        all_citations = []
+
+        for name, source_result in source_results.items():
+            provider = self.registry.get(name)
+            label = provider.label if provider else name
+            source_reviews = source_result.get("reviews", [])
+            source_counts[name] = len(source_reviews)
+
+            # 文本总结和引用来源（ChatGPT 的 Responses API 即使没有结构化评价也可能返回）
+            summary = source_result.get("summary", "")
+            citations = source_result.get("citations", [])
+            if summary and summary != "No results found":
+                summaries.append(summary)
+            all_citations.extend(citations)
+
+            if source_reviews:
+                logger.info(f"✅ {label} 找到 {len(source_reviews)} 条评价")
+                all_reviews.extend(source_reviews)
+            elif (summary and summary != "No results found" and len(summary) > 50) or citations:
+                logger.info(f"✅ {label} 找到患者评价信息（{len(citations)} 个来源）")
+                # 即使没有结构化 reviews，也记录找到了内容
+            else:
+                logger.warning(f"⚠️ {label} 未找到评价")
+
+        combined_summary = "\n\n".join(summaries) if summaries else ""
+
+        # 各数据源声明的计数字段（google_maps_count / facebook_forums_count）
+        counts = {}
+        for provider in self.registry:
+            if provider.count_key:
+                counts[provider.count_key] = source_counts.get(provider.name, 0)
+
+        total_count = len(all_reviews)
+
+        # 检查是否有任何有价值的内容（结构化评价或数据源的文本总结）
+        has_summary_content = len(combined_summary) > 50
+
+        if total_count == 0 and not has_summary_content:
+            logger.warning(f"❌ 未找到 {doctor_name} 的评价")
             return {
                 "doctor_name": doctor_name,
+                "doctor_id": doctor_id,
                 "reviews": [],
+                **{count_key: 0 for count_key in counts},
+                "source_counts": source_counts,
                 "total_count": 0,
-                "error": str(e)
+                "chatgpt_summary": combined_summary,
+                "chatgpt_citations": all_citations,
+                "message": "未找到评价，建议尝试不同的医生名字拼写"
             }
 
+        per_source = ", ".join(f"{name}: {count}" for name, count in source_counts.items())
+        logger.info(f"✅ 搜索完成：共 {total_count} 条评价（{per_source}）")
+
+        # 缓存结果（如果数据库可用）
+        try:
+            saved = await cache_manager.save_reviews(doctor_id, doctor_name, all_reviews, replace=replace)
+            if saved:
+                # 情感分析在后台进行，不增加用户等待时间
+                sentiment_worker.notify()
+        except Exception as cache_error:
+            logger.warning(f"⚠️ 缓存保存失败（可能数据库未初始化）: {cache_error}")
+
+        # 返回结果
+        result_message = f"找到 {total_count} 条评价"
+        if total_count == 0 and has_summary_content:
+            result_message = f"找到患者评价信息（来自 {len(all_citations)} 个来源）"
+
+        return {
+            "doctor_name": doctor_name,
+            "doctor_id": doctor_id,
+            "reviews": all_reviews,
+            **counts,
+            "source_counts": source_counts,
+            "total_count": total_count,
+            "sources": list(source_results.keys()),
+            "chatgpt_summary": combined_summary,
+            "chatgpt_citations": all_citations,
+            "message": result_message
+        }
+
+    async def _run_source(self, breaker: CircuitBreaker, coro: Awaitable[Dict]) -> Dict:
+        """
+        执行单个数据源，带自适应超时，并把结果计入熔断器
+
+        超时或异常不会影响其他数据源，只返回空结果和错误信息
+
+        Args:
+            breaker: 数据源的熔断器（提供名称和超时时间）
+            coro: 数据源的搜索协程
+
+        Returns:
+            数据源结果（附带 elapsed_ms）
+        """
+        name = breaker.name
+        timeout = breaker.current_timeout()
+        start_time = time.monotonic()
+
+        try:
+            result = await asyncio.wait_for(coro, timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"⏱️ {name} 超时（{timeout:.0f}s），跳过该数据源")
+            result = {"reviews": [], "total_count": 0, "error": f"Timeout after {timeout:.0f}s"}
+            breaker.record_failure(time.monotonic() - start_time, timed_out=True)
+        except Exception as e:
+            logger.error(f"❌ {name} 搜索失败: {e}")
+            result = {"reviews": [], "total_count": 0, "error": str(e)}
+            breaker.record_failure(time.monotonic() - start_time)
+        else:
+            # 客户端自己捕获异常，以 error 字段返回
+            if result.get("error"):
+                breaker.record_failure(time.monotonic() - start_time)
+            else:
+                breaker.record_success(time.monotonic() - start_time)
+
+        result["elapsed_ms"] = int((time.monotonic() - start_time) * 1000)
+        logger.info(f"⏱️ {name} 完成，耗时 {result['elapsed_ms']}ms")
+        return result
+
+    def _schedule(self) -> List[SourceProvider]:
+        """
+        已启用的数据源，按成本从低到高排序（成本相同时预期耗时短的优先）
+
+        预期耗时优先使用熔断器记录的实际 p95 延迟，没有样本时使用数据源声明的值
+        """
+        def expected_latency(provider: SourceProvider) -> float:
+            return self._breaker(provider).p95_latency() or provider.expected_latency_seconds
+
+        for provider in self.registry:
+            if not provider.enabled:
+                logger.warning(f"⚠️ {provider.label} 未配置或已禁用，跳过")
+
+        return sorted(self.registry.enabled(), key=lambda provider: (provider.cost_usd, expected_latency(provider)))
+
+    def _launch_sources(
+        self,
+        doctor_name: str,
+        location: str,
+        providers: List[SourceProvider]
+    ) -> Dict[str, asyncio.Task]:
+        """
+        为每个数据源创建并发任务（熔断中的数据源跳过）
+
+        Args:
+            doctor_name: 医生名字
+            location: 地点
+            providers: 要启动的数据源
+
+        Returns:
+            {数据源名称: asyncio.Task}
+        """
+        tasks: Dict[str, asyncio.Task] = {}
+
+        for provider in providers:
+            breaker = self._breaker(provider)
+            if not breaker.allow_request():
+                logger.warning(f"🔴 {provider.label} 熔断中，跳过该数据源")
+                continue
+
+            logger.info(f"🔎 {provider.label} 搜索中（预计成本 ${provider.cost_usd:.3f}）...")
+            tasks[provider.name] = asyncio.create_task(self._run_source(
+                breaker,
+                provider.search(doctor_name, location)
+            ))
+
+        return tasks
+
+    async def _iter_sources(self, doctor_name: str, location: str) -> AsyncIterator[Tuple[str, Dict]]:
+        """
+        按调度策略执行数据源，按完成顺序产出结果，直到整体截止时间
+
+        - parallel：所有数据源一次性并发启动
+        - cheapest_first：按成本逐个启动，前面的数据源评价不足
+          SEARCH_CHEAPEST_FIRST_MIN_REVIEWS 条时才调用下一个（只有 Outscraper 的
+          Google Maps 评价时覆盖面较窄，该值过低会使论坛搜索几乎总被跳过）
+        parallel 下评价数量达到 SEARCH_EARLY_EXIT_REVIEWS 后提前结束；
+        未完成的数据源会被取消（调用方提前退出或超过整体截止时间时同样会取消）
+
+        Args:
+            doctor_name: 医生名字
+            location: 地点
+
+        Yields:
+            (数据源名称, 数据源结果)
+        """
+        providers = self._schedule()
+        if settings.search_source_strategy == "cheapest_first":
+            rounds = [[provider] for provider in providers]
+            enough_reviews = max(1, settings.search_cheapest_first_min_reviews)
+        else:
+            rounds = [providers]
+            enough_reviews = settings.search_early_exit_reviews
+
+        deadline = time.monotonic() + settings.search_total_timeout_seconds
+        reviews_found = 0
+        names: Dict[asyncio.Task, str] = {}
+        pending = set()
+
+        try:
+            for round_index, round_providers in enumerate(rounds):
+                tasks = self._launch_sources(doctor_name, location, round_providers)
+                names.update({task: name for name, task in tasks.items()})
+                pending = set(tasks.values())
+
+                while pending:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        for task in pending:
+                            logger.warning(f"⏱️ {names[task]} 未在整体截止时间内完成（{settings.search_total_timeout_seconds:.0f}s），已取消")
+                        return
+
+                    done, pending = await asyncio.wait(
+                        pending,
+                        timeout=remaining,
+                        return_when=asyncio.FIRST_COMPLETED
+                    )
+
+                    for task in done:
+                        source_result = task.result()
+                        reviews_found += len(source_result.get("reviews", []))
+                        yield names[task], source_result
+
+                    if enough_reviews and reviews_found >= enough_reviews:
+                        skipped = [names[task] for task in pending] + [
+                            provider.name for later in rounds[round_index + 1:] for provider in later
+                        ]
+                        if skipped:
+                            logger.info(f"⚡ 已找到 {reviews_found} 条评价，跳过其余数据源: {', '.join(skipped)}")
+                        return
+        finally:
+            # 提前结束、整体截止时间已到或调用方不再需要：取消未完成的数据源
+            for task in pending:
+                task.cancel()
+
 
 # 创建全局实例
 search_aggregator = SearchAggregator()
@@ -5,26 +5,92 @@ ChatGPT Search - 用于搜索 Facebook 和论坛评价
 这是 OpenAI 的新一代 Agentic API，支持实时网络搜索
 """
 
-from openai import AsyncOpenAI
-from typing import Dict, List
+from openai import AsyncOpenAI, BadRequestError
+from typing import Dict, List, Optional, Tuple
+import asyncio
 import logging
 import os
 import json
+import time
+
+from src.config import settings
 
 logger = logging.getLogger(__name__)
 
+# 搜索的论坛网站（域名, 显示名称）
+SEARCH_SITES = [
+    ("forum.lowyat.net", "Lowyat Forum"),
+    ("motherhood.com.my", "Motherhood"),
+    ("theasianparent.com", "theAsianparent"),
+    ("babycenter.com", "BabyCenter"),
+]
+
+# 单次调用结构化输出的 JSON Schema（strict 模式要求所有字段都在 required 中）
+REVIEWS_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "summary": {
+            "type": "string",
+            "description": "Short overview of what patients say about the doctor"
+        },
+        "reviews": {
+            "type": "array",
+            "items": {
+                "type": "object",
+                "properties": {
+                    "author_name": {"type": "string", "description": "Patient name, or 'Anonymous'"},
+                    "review_date": {"type": "string", "description": "YYYY-MM-DD, or empty string if unknown"},
+                    "text": {"type": "string", "description": "Patient's own words or experience"},
+                    "rating": {"type": "number", "description": "1-5 if stated, otherwise 0"},
+                    "source": {"type": "string", "description": "Site name"},
+                    "url": {"type": "string", "description": "URL of the page the review is on"}
+                },
+                "required": ["author_name", "review_date", "text", "rating", "source", "url"],
+                "additionalProperties": False
+            }
+        }
+    },
+    "required": ["summary", "reviews"],
+    "additionalProperties": False
+}
+
+
+def _rejects_json_schema(error: BadRequestError) -> bool:
+    """请求错误是否由结构化输出（text.format / json_schema）引起"""
+    text = f"{getattr(error, 'param', None) or ''} {error}".lower()
+    return any(keyword in text for keyword in ("text.format", "json_schema", "response_format"))
+
+
+def _rejects_site_filters(error: BadRequestError) -> bool:
+    """请求错误是否由按网站搜索的参数（filters / max_tool_calls）引起"""
+    text = f"{getattr(error, 'param', None) or ''} {error}".lower()
+    return any(keyword in text for keyword in ("filters", "allowed_domains", "max_tool_calls"))
+
 
 class ChatGPTSearchClient:
     """ChatGPT Search 客户端 - 使用 Responses API + gpt-5-mini + web_search"""
 
-    def __init__(self, api_key: str = None):
+    def __init__(self, api_key: str = None, structured_output: Optional[bool] = None,
+                 use_response_cache: bool = True, per_site: Optional[bool] = None):
         """
         初始化 ChatGPT 客户端
 
         Args:
             api_key: OpenAI API key
+            structured_output: 是否在 web_search 调用中直接返回结构化评价（JSON Schema），
+                               省去第二次 gpt-4o-mini 解析调用；默认使用 settings.chatgpt_structured_output
+            use_response_cache: 相同请求是否复用 LLM 响应缓存（见 src/search/llm_cache.py）
+            per_site: 是否按网站拆分为多个并发的小搜索（每个网站一次 web_search 调用，
+                      限定域名和搜索次数），再合并去重；默认使用 settings.chatgpt_per_site_search
         """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY", "")
+        self.structured_output = settings.chatgpt_structured_output if structured_output is None else structured_output
+        self.use_response_cache = use_response_cache
+
+        self.per_site = settings.chatgpt_per_site_search if per_site is None else per_site
+        # 按网站搜索时每个网站的搜索次数上限和超时（超时的网站按无结果处理）
+        self.site_max_searches = settings.chatgpt_site_max_searches
+        self.site_timeout_seconds = settings.chatgpt_site_timeout_seconds
 
         if not self.api_key or self.api_key == "your_openai_api_key_here":
             logger.warning("OpenAI API key not configured")
@@ -46,6 +112,13 @@ class ChatGPTSearchClient:
 
         使用 OpenAI 的 web_search_preview 工具进行实时网络搜索
 
+        两种模式：
+        - 结构化（默认）：web_search 调用直接按 REVIEWS_SCHEMA 返回 JSON，只需一次调用
+        - 两步：web_search 返回文本总结，再用 gpt-4o-mini 解析（结构化输出不可用时的后备）
+
+        per_site 开启时，每个网站各发一次 web_search 调用并发执行（耗时约为最慢的单个网站），
+        结果合并去重；两种模式同样适用
+
         Args:
             doctor_name: 医生名字
             location: 地点
@@ -79,21 +152,66 @@ class ChatGPTSearchClient:
         try:
             logger.info(f"🔍 ChatGPT Responses API 实时网络搜索: {doctor_name} in {location}")
 
-            # 使用 Responses API + gpt-5-mini + web_search 工具
-            # 注：虽然较慢（90-120秒），但搜索质量最好
-            response = await self.client.responses.create(
-                model="gpt-5-mini",  # ⭐ 使用 gpt-5-mini
-                tools=[{"type": "web_search"}],  # ⭐ 启用 web_search 工具
-                reasoning={"effort": "low"},  # ⭐ 降低思考强度，可能减少搜索次数
-                input=f"""Find patient reviews about {doctor_name} in {location}.
+            per_site = self.per_site
+
+            if self.structured_output:
+                try:
+                    if per_site:
+                        return await self._search_per_site(doctor_name, location, structured=True)
+                    return await self._search_structured(doctor_name, location)
+                except BadRequestError as e:
+                    if per_site and _rejects_site_filters(e):
+                        self._disable_per_site(e)
+                    elif _rejects_json_schema(e):
+                        # 模型或账号不支持 web_search + JSON Schema，之后都使用两步解析
+                        logger.warning(f"⚠️ 结构化输出不可用，之后改用两步解析: {e}")
+                        self.structured_output = False
+                    else:
+                        # 其他请求错误只影响本次调用
+                        logger.warning(f"⚠️ 结构化搜索请求失败，本次改用两步解析: {e}")
+                    # 后备使用合并搜索：不再带按网站的 filters / max_tool_calls，避免同样的请求错误
+                    per_site = False
+
+            if per_site:
+                try:
+                    return await self._search_per_site(doctor_name, location, structured=False)
+                except BadRequestError as e:
+                    if not _rejects_site_filters(e):
+                        raise
+                    self._disable_per_site(e)
+            return await self._search_two_step(doctor_name, location)
 
-Search these specific sites:
-- forum.lowyat.net
-- motherhood.com.my
-- theasianparent.com
-- babycenter.com
+        except Exception as e:
+            logger.error(f"❌ ChatGPT Responses API 搜索失败: {e}")
+            logger.exception(e)  # 打印完整堆栈跟踪
+            return {
+                "reviews": [],
+                "summary": f"搜索失败: {str(e)}",
+                "total_count": 0,
+                "error": str(e)
+            }
+
+    def _disable_per_site(self, error: BadRequestError):
+        """模型或账号不支持限定域名 / 限制搜索次数，之后都使用合并搜索"""
+        logger.warning(f"⚠️ 按网站搜索参数（filters / max_tool_calls）不可用，之后改用合并搜索: {error}")
+        self.per_site = False
+
+    def _search_prompt(self, doctor_name: str, location: str, site: Optional[str] = None) -> str:
+        """web_search 调用的搜索指令（两种模式共用；指定 site 时只搜索该网站）"""
+        if site:
+            scope = f"""Search only {site}.
+
+Use at most {self.site_max_searches} queries. Focus on quality over quantity."""
+        else:
+            sites = "\n".join(f"- {domain}" for domain, _ in SEARCH_SITES)
+            scope = f"""Search these specific sites:
+{sites}
+
+Limit your search to 2-3 queries maximum. Focus on quality over quantity."""
+
+        return f"""Find patient reviews about {doctor_name} in {location}.
 
-Limit your search to 2-3 queries maximum. Focus on quality over quantity.
+{scope}
 
 For each review found, provide:
 - Review text (patient's actual words)
@@ -102,82 +220,301 @@ For each review found, provide:
 - Source URL
 
 Return specific patient testimonials only."""
-            )
 
-            # 解析 Responses API 的输出
-            reviews = []
-            summary_parts = []
-            citations = []
-
-            logger.info(f"📦 Response type: {type(response)}")
-
-            # Responses API 返回的 output 是一个列表
-            # 包含 reasoning items, web_search_call items, 和最终的 message
-            if hasattr(response, 'output') and isinstance(response.output, list):
-                logger.info(f"📝 Output items count: {len(response.output)}")
-
-                # 遍历 output 列表，找到 type='message' 的项目
-                for item in response.output:
-                    if hasattr(item, 'type'):
-                        logger.info(f"  - Item type: {item.type}")
-
-                        # 记录搜索查询
-                        if item.type == 'web_search_call' and hasattr(item, 'action'):
-                            if hasattr(item.action, 'query'):
-                                logger.info(f"    🔍 Search query: {item.action.query}")
-
-                        # 提取最终消息内容
-                        if item.type == 'message' and hasattr(item, 'content'):
-                            for content_block in item.content:
-                                # 文本内容
-                                if hasattr(content_block, 'text'):
-                                    summary_parts.append(content_block.text)
-                                    logger.info(f"  ✅ Found text content: {len(content_block.text)} chars")
-
-                                    # 检查是否有 annotations (引用/链接)
-                                    if hasattr(content_block, 'annotations'):
-                                        for annotation in content_block.annotations:
-                                            if hasattr(annotation, 'url'):
-                                                citations.append({
-                                                    'url': annotation.url,
-                                                    'title': getattr(annotation, 'title', 'Unknown')
-                                                })
-                                                logger.info(f"  🔗 Citation: {annotation.title}")
-
-            # 合并总结
-            full_summary = "\n\n".join(summary_parts) if summary_parts else "No results found"
-
-            logger.info(f"✅ ChatGPT Responses API 搜索完成")
-            logger.info(f"📝 返回文本总结 ({len(summary_parts)} 部分)")
-            logger.info(f"📚 Citations: {len(citations)} sources")
-
-            # 步骤 2：如果找到了内容，解析为结构化评价
-            if full_summary and full_summary != "No results found" and len(full_summary) > 100:
-                logger.info("🔄 解析文本总结为结构化评价...")
-                structured_reviews = await self._parse_summary_to_reviews(
-                    full_summary, citations, doctor_name
-                )
-                reviews.extend(structured_reviews)
-                logger.info(f"✅ 提取了 {len(structured_reviews)} 条结构化评价")
+    async def _web_search(self, doctor_name: str, location: str, structured: bool, site: Optional[str] = None):
+        """
+        调用 Responses API + gpt-5-mini + web_search 工具
 
-            return {
-                "reviews": reviews,
-                "summary": full_summary,
-                "total_count": len(reviews),
-                "source": "chatgpt_responses_api",
-                "citations": citations,  # 引用来源列表
-                "raw_response": full_summary
+        Args:
+            doctor_name: 医生名字
+            location: 地点
+            structured: 是否要求按 REVIEWS_SCHEMA 返回 JSON
+            site: 只搜索这个域名（按网站并发搜索时使用）
+        """
+        params = {
+            "model": "gpt-5-mini",  # ⭐ 使用 gpt-5-mini
+            "tools": [{"type": "web_search"}],  # ⭐ 启用 web_search 工具
+            "reasoning": {"effort": "low"},  # ⭐ 降低思考强度，可能减少搜索次数
+            "input": self._search_prompt(doctor_name, location, site)
+        }
+
+        if site:
+            # 限定域名 + 限制工具调用次数，单个网站的搜索保持短小
+            params["tools"] = [{"type": "web_search", "filters": {"allowed_domains": [site]}}]
+            params["max_tool_calls"] = self.site_max_searches
+
+        if structured:
+            params["input"] += (
+                "\n\nReturn the reviews as JSON matching the schema. Use the URL of the page "
+                "each review was found on. If no patient reviews are found, return an empty reviews list."
+            )
+            params["text"] = {
+                "format": {
+                    "type": "json_schema",
+                    "name": "doctor_reviews",
+                    "schema": REVIEWS_SCHEMA,
+                    "strict": True
+                }
             }
 
-        except Exception as e:
-            logger.error(f"❌ ChatGPT Responses API 搜索失败: {e}")
-            logger.exception(e)  # 打印完整堆栈跟踪
-            return {
-                "reviews": [],
-                "summary": f"搜索失败: {str(e)}",
-                "total_count": 0,
-                "error": str(e)
-            }
+        # 注：虽然较慢（90-120秒），但搜索质量最好
+        return await self._create("responses", self.client.responses.create, params)
+
+    async def _create(self, kind: str, create, params: Dict):
+        """
+        调用 OpenAI（启用时先查 LLM 响应缓存，相同请求不重复消耗 token）
+
+        每次调用的 token、web_search 次数和耗时都记入 llm_usage（用于 search_logs 成本统计）
+        """
+        from src.utils.llm_usage import record_llm_call
+
+        purpose = "web_search" if params.get("tools") else "parse"
+        started = time.perf_counter()
+        response = None
+        try:
+            if not self.use_response_cache:
+                response = await create(**params)
+            else:
+                from src.search.llm_cache import llm_cache
+                response = await llm_cache.create(kind, create, **params)
+            return response
+        finally:
+            record_llm_call(params.get("model"), response, time.perf_counter() - started, purpose)
+
+    def _extract_output(self, response) -> Tuple[List[str], List[Dict]]:
+        """
+        解析 Responses API 的输出
+
+        Returns:
+            (文本内容列表, 引用来源列表)
+        """
+        summary_parts = []
+        citations = []
+
+        logger.info(f"📦 Response type: {type(response)}")
+
+        # Responses API 返回的 output 是一个列表
+        # 包含 reasoning items, web_search_call items, 和最终的 message
+        if hasattr(response, 'output') and isinstance(response.output, list):
+            logger.info(f"📝 Output items count: {len(response.output)}")
+
+            # 遍历 output 列表，找到 type='message' 的项目
+            for item in response.output:
+                if hasattr(item, 'type'):
+                    logger.info(f"  - Item type: {item.type}")
+
+                    # 记录搜索查询
+                    if item.type == 'web_search_call' and hasattr(item, 'action'):
+                        if hasattr(item.action, 'query'):
+                            logger.info(f"    🔍 Search query: {item.action.query}")
+
+                    # 提取最终消息内容
+                    if item.type == 'message' and hasattr(item, 'content'):
+                        for content_block in item.content:
+                            # 文本内容
+                            if hasattr(content_block, 'text'):
+                                summary_parts.append(content_block.text)
+                                logger.info(f"  ✅ Found text content: {len(content_block.text)} chars")
+
+                                # 检查是否有 annotations (引用/链接)
+                                if hasattr(content_block, 'annotations'):
+                                    for annotation in content_block.annotations:
+                                        if hasattr(annotation, 'url'):
+                                            citations.append({
+                                                'url': annotation.url,
+                                                'title': getattr(annotation, 'title', 'Unknown')
+                                            })
+                                            logger.info(f"  🔗 Citation: {getattr(annotation, 'title', 'Unknown')}")
+
+        return summary_parts, citations
+
+    async def _search_two_step(self, doctor_name: str, location: str) -> Dict:
+        """两步模式：web_search 返回文本总结，再用 gpt-4o-mini 解析为结构化评价"""
+        response = await self._web_search(doctor_name, location, structured=False)
+        summary_parts, citations = self._extract_output(response)
+
+        # 合并总结
+        full_summary = "\n\n".join(summary_parts) if summary_parts else "No results found"
+
+        logger.info(f"✅ ChatGPT Responses API 搜索完成")
+        logger.info(f"📝 返回文本总结 ({len(summary_parts)} 部分)")
+        logger.info(f"📚 Citations: {len(citations)} sources")
+
+        return await self._finish_two_step(full_summary, citations, doctor_name)
+
+    async def _finish_two_step(self, full_summary: str, citations: List[Dict], doctor_name: str) -> Dict:
+        """步骤 2：如果找到了内容，解析为结构化评价"""
+        reviews = []
+
+        if full_summary and full_summary != "No results found" and len(full_summary) > 100:
+            logger.info("🔄 解析文本总结为结构化评价...")
+            structured_reviews = await self._parse_summary_to_reviews(
+                full_summary, citations, doctor_name
+            )
+            reviews.extend(structured_reviews)
+            logger.info(f"✅ 提取了 {len(structured_reviews)} 条结构化评价")
+
+        return {
+            "reviews": reviews,
+            "summary": full_summary,
+            "total_count": len(reviews),
+            "source": "chatgpt_responses_api",
+            "citations": citations,  # 引用来源列表
+            "raw_response": full_summary
+        }
+
+    async def _search_structured(self, doctor_name: str, location: str) -> Dict:
+        """
+        单次调用模式：web_search 调用直接按 REVIEWS_SCHEMA 返回结构化评价
+
+        返回内容无法解析为 JSON 时，把原文交给两步模式的解析步骤（不重新搜索）
+        """
+        response = await self._web_search(doctor_name, location, structured=True)
+        summary_parts, citations = self._extract_output(response)
+        output_text = "\n\n".join(summary_parts)
+
+        parsed = self._parse_structured_output(output_text)
+        if parsed is None:
+            return await self._finish_two_step(output_text or "No results found", citations, doctor_name)
+
+        parsed_reviews, summary = parsed
+        reviews = self._standardize_reviews(parsed_reviews)
+        self._add_review_citations(parsed_reviews, citations)
+
+        logger.info(f"✅ ChatGPT 单次结构化搜索完成：{len(reviews)} 条评价，{len(citations)} 个来源")
+
+        return {
+            "reviews": reviews,
+            "summary": summary or "No results found",
+            "total_count": len(reviews),
+            "source": "chatgpt_responses_api",
+            "citations": citations,
+            "raw_response": output_text
+        }
+
+    def _parse_structured_output(self, output_text: str) -> Optional[Tuple[List[Dict], str]]:
+        """
+        解析结构化输出的 JSON
+
+        Returns:
+            (评价列表, 总结)；无法解析时返回 None
+        """
+        try:
+            result_json = json.loads(output_text)
+            return result_json.get("reviews", []), result_json.get("summary", "")
+        except (ValueError, AttributeError) as e:
+            logger.warning(f"⚠️ 结构化输出解析失败，改用文本解析: {e}")
+            return None
+
+    def _add_review_citations(self, parsed_reviews: List[Dict], citations: List[Dict]):
+        """评价中的链接也作为引用来源（结构化输出时 annotations 可能为空）"""
+        known_urls = {citation["url"] for citation in citations}
+        for review in parsed_reviews:
+            url = review.get("url")
+            if url and url not in known_urls:
+                known_urls.add(url)
+                citations.append({"url": url, "title": review.get("source") or "Unknown"})
+
+    async def _search_per_site(self, doctor_name: str, location: str, structured: bool) -> Dict:
+        """
+        按网站并发搜索：每个网站一次限定域名的 web_search 调用，结果合并去重
+
+        - 结构化模式：每个网站直接返回 JSON；无法解析的文本合并后统一解析一次
+        - 两步模式：所有网站的文本总结合并后只调用一次 gpt-4o-mini 解析
+        - 单个网站失败或超时按无结果处理；全部失败时抛出第一个错误
+        """
+        outcomes = await asyncio.gather(*(
+            asyncio.wait_for(
+                self._web_search(doctor_name, location, structured, site=domain),
+                timeout=self.site_timeout_seconds
+            )
+            for domain, _ in SEARCH_SITES
+        ), return_exceptions=True)
+
+        parsed_reviews = []
+        summaries = []
+        prose_parts = []
+        citations = []
+        errors = []
+
+        for (domain, site_name), outcome in zip(SEARCH_SITES, outcomes):
+            if isinstance(outcome, BaseException):
+                if structured and isinstance(outcome, BadRequestError):
+                    raise outcome
+                logger.warning(f"⚠️ {site_name} 搜索失败: {outcome!r}")
+                errors.append(outcome)
+                continue
+
+            summary_parts, site_citations = self._extract_output(outcome)
+            citations.extend(site_citations)
+            output_text = "\n\n".join(summary_parts)
+
+            parsed = self._parse_structured_output(output_text) if structured and output_text else None
+            if parsed is not None:
+                site_reviews, summary = parsed
+                parsed_reviews.extend(site_reviews)
+                if summary:
+                    summaries.append(f"{site_name}: {summary}")
+                logger.info(f"  🌐 {site_name}: {len(site_reviews)} 条评价")
+            elif output_text:
+                prose_parts.append(f"[{site_name}]\n{output_text}")
+
+        if len(errors) == len(SEARCH_SITES):
+            raise errors[0]
+
+        reviews = self._standardize_reviews(parsed_reviews)
+        self._add_review_citations(parsed_reviews, citations)
+
+        # 文本结果（两步模式，或结构化 JSON 解析失败的网站）合并后解析一次
+        prose = "\n\n".join(prose_parts)
+        if len(prose) > 100:
+            logger.info("🔄 解析文本总结为结构化评价...")
+            reviews.extend(await self._parse_summary_to_reviews(prose, citations, doctor_name))
+
+        reviews = self._dedupe_reviews(reviews)
+        citations = list({citation["url"]: citation for citation in citations}.values())
+        summary = "\n\n".join(summaries + prose_parts)
+
+        logger.info(
+            f"✅ ChatGPT 按网站并发搜索完成：{len(SEARCH_SITES) - len(errors)}/{len(SEARCH_SITES)} 个网站，"
+            f"{len(reviews)} 条评价，{len(citations)} 个来源"
+        )
+
+        return {
+            "reviews": reviews,
+            "summary": summary or "No results found",
+            "total_count": len(reviews),
+            "source": "chatgpt_responses_api",
+            "citations": citations,
+            "raw_response": summary
+        }
+
+    def _dedupe_reviews(self, reviews: List[Dict]) -> List[Dict]:
+        """按评价内容去重（同一帖子可能被多个搜索返回；同一链接下的不同评价保留）"""
+        seen = set()
+        unique_reviews = []
+        for review in reviews:
+            key = " ".join(review.get("text", "").lower().split())[:200]
+            if not key or key in seen:
+                continue
+            seen.add(key)
+            unique_reviews.append(review)
+        return unique_reviews
+
+    def _standardize_reviews(self, parsed_reviews: List[Dict]) -> List[Dict]:
+        """标准化评价格式，添加 source 标识"""
+        standardized_reviews = []
+        for review in parsed_reviews:
+            standardized_reviews.append({
+                "text": review.get("text", ""),
+                "rating": review.get("rating", 0),
+                "author_name": review.get("author_name", "Anonymous"),
+                "review_date": review.get("review_date", ""),
+                "url": review.get("url", ""),
+                "source": "facebook_forum",  # 来源标识
+                "place_name": review.get("source", "Community Review")
+            })
+        return standardized_reviews
 
     async def _parse_summary_to_reviews(
         self,
@@ -198,7 +535,7 @@ Return specific patient testimonials only."""
         """
         try:
             # 使用 gpt-4o-mini 解析文本为结构化数据（便宜且快速）
-            parse_response = await self.client.chat.completions.create(
+            parse_response = await self._create("chat", self.client.chat.completions.create, dict(
                 model="gpt-4o-mini",
                 response_format={"type": "json_object"},
                 messages=[
@@ -239,7 +576,7 @@ Return specific patient testimonials only."""
 """
                     }
                 ]
-            )
+            ))
 
             # 解析返回的 JSON
             result_text = parse_response.choices[0].message.content
@@ -247,20 +584,7 @@ Return specific patient testimonials only."""
 
             parsed_reviews = result_json.get("reviews", [])
 
-            # 标准化格式，添加 source 标识
-            standardized_reviews = []
-            for review in parsed_reviews:
-                standardized_reviews.append({
-                    "text": review.get("text", ""),
-                    "rating": review.get("rating", 0),
-                    "author_name": review.get("author_name", "Anonymous"),
-                    "review_date": review.get("review_date", ""),
-                    "url": review.get("url", ""),
-                    "source": "facebook_forum",  # 来源标识
-                    "place_name": review.get("source", "Community Review")
-                })
-
-            return standardized_reviews
+            return self._standardize_reviews(parsed_reviews)
 
         except Exception as e:
             logger.error(f"❌ 解析文本总结失败: {e}")
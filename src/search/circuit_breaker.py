@@ -0,0 +1,186 @@
+"""
+数据源熔断器 + 自适应超时
+数据源故障时跳过该数据源，恢复后通过半开探测重新启用；超时时间根据实际 p95 延迟计算
+"""
+
+import logging
+import math
+import time
+from collections import deque
+from typing import Deque, Dict
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitBreaker:
+    """
+    单个数据源的熔断器
+
+    状态：
+    - closed：正常调用，统计最近 N 次调用的错误率和延迟
+    - open：错误率超过阈值后打开，冷却期内直接跳过该数据源
+    - half_open：冷却期结束后只放行一个探测请求，成功则关闭，失败则重新打开
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        name: str,
+        max_timeout: float,
+        window_size: int = 20,
+        min_requests: int = 5,
+        failure_rate_threshold: float = 0.5,
+        open_seconds: float = 60.0,
+        min_timeout: float = 5.0,
+        timeout_multiplier: float = 1.5
+    ):
+        """
+        Args:
+            name: 数据源名称
+            max_timeout: 超时上限（秒），即原来的固定超时，样本不足或半开探测时使用
+            window_size: 统计窗口（最近多少次调用）
+            min_requests: 窗口内至少多少次调用才判断错误率 / 计算 p95
+            failure_rate_threshold: 打开熔断的错误率
+            open_seconds: 打开后的冷却时间（秒）
+            min_timeout: 自适应超时下限（秒）
+            timeout_multiplier: 自适应超时 = p95 × 该倍数
+        """
+        self.name = name
+        self.max_timeout = max_timeout
+        self.min_requests = min_requests
+        self.failure_rate_threshold = failure_rate_threshold
+        self.open_seconds = open_seconds
+        self.min_timeout = min_timeout
+        self.timeout_multiplier = timeout_multiplier
+
+        self.state = self.CLOSED
+        self.opened_at = 0.0
+        self._probe_started_at = None  # 半开探测开始时间（None 表示没有探测在进行）
+        self._outcomes: Deque[bool] = deque(maxlen=window_size)  # True = 成功
+        self._latencies: Deque[float] = deque(maxlen=window_size)
+
+        self.rejected = 0
+        self.times_opened = 0
+
+    def allow_request(self) -> bool:
+        """
+        是否放行本次调用
+
+        Returns:
+            True 表示可以调用该数据源；False 表示熔断中，应跳过
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self.opened_at < self.open_seconds:
+                self.rejected += 1
+                return False
+            self.state = self.HALF_OPEN
+            self._probe_started_at = None
+            logger.info(f"🟡 {self.name} 熔断冷却结束，进入半开状态，放行探测请求")
+
+        if self.state == self.HALF_OPEN:
+            # 探测请求被取消时不会回报结果，超过 max_timeout 视为丢失，允许新的探测
+            now = time.monotonic()
+            if self._probe_started_at is not None and now - self._probe_started_at < self.max_timeout:
+                self.rejected += 1
+                return False
+            self._probe_started_at = now
+
+        return True
+
+    def current_timeout(self) -> float:
+        """
+        本次调用的超时时间：p95 × 倍数，限制在 [min_timeout, max_timeout]
+
+        样本不足或半开探测时使用 max_timeout，给恢复中的数据源完整机会
+        """
+        if self.state == self.HALF_OPEN or len(self._latencies) < self.min_requests:
+            return self.max_timeout
+
+        adaptive = self.p95_latency() * self.timeout_multiplier
+        return min(self.max_timeout, max(self.min_timeout, adaptive))
+
+    def p95_latency(self) -> float:
+        """最近调用的 p95 延迟（秒），没有样本时返回 0"""
+        if not self._latencies:
+            return 0.0
+        ordered = sorted(self._latencies)
+        return ordered[max(0, math.ceil(len(ordered) * 0.95) - 1)]
+
+    def record_success(self, latency: float):
+        """记录一次成功调用"""
+        self._latencies.append(latency)
+
+        if self.state == self.HALF_OPEN:
+            self.state = self.CLOSED
+            self._probe_started_at = None
+            self._outcomes.clear()
+            logger.info(f"🟢 {self.name} 探测成功，熔断关闭")
+
+        self._outcomes.append(True)
+
+    def record_failure(self, latency: float, timed_out: bool = False):
+        """
+        记录一次失败调用
+
+        Args:
+            latency: 耗时（秒）
+            timed_out: 是否为超时；超时的耗时也计入延迟样本，
+                       否则数据源整体变慢时 p95 永远无法跟着上升
+        """
+        if timed_out:
+            self._latencies.append(latency)
+
+        if self.state == self.HALF_OPEN:
+            self._open("探测失败")
+            return
+
+        self._outcomes.append(False)
+
+        if len(self._outcomes) >= self.min_requests and self.failure_rate() >= self.failure_rate_threshold:
+            self._open(f"错误率 {self.failure_rate():.0%}")
+
+    def failure_rate(self) -> float:
+        """统计窗口内的错误率"""
+        if not self._outcomes:
+            return 0.0
+        return self._outcomes.count(False) / len(self._outcomes)
+
+    def _open(self, reason: str):
+        """打开熔断"""
+        self.state = self.OPEN
+        self.opened_at = time.monotonic()
+        self._probe_started_at = None
+        self._outcomes.clear()
+        self.times_opened += 1
+        logger.warning(f"🔴 {self.name} 熔断打开（{reason}），{self.open_seconds:.0f}s 内跳过该数据源")
+
+    def stats(self) -> Dict:
+        """获取熔断器状态和统计"""
+        return {
+            "state": self.state,
+            "failure_rate": round(self.failure_rate(), 3),
+            "p95_latency_ms": int(self.p95_latency() * 1000),
+            "timeout_seconds": round(self.current_timeout(), 1),
+            "samples": len(self._latencies),
+            "rejected": self.rejected,
+            "times_opened": self.times_opened
+        }
+
+
+def create_source_breaker(name: str, max_timeout: float) -> CircuitBreaker:
+    """按配置创建数据源熔断器"""
+    return CircuitBreaker(
+        name=name,
+        max_timeout=max_timeout,
+        window_size=settings.circuit_breaker_window_size,
+        min_requests=settings.circuit_breaker_min_requests,
+        failure_rate_threshold=settings.circuit_breaker_failure_rate,
+        open_seconds=settings.circuit_breaker_open_seconds,
+        min_timeout=settings.search_min_timeout_seconds,
+        timeout_multiplier=settings.search_timeout_p95_multiplier
+    )
@@ -0,0 +1,211 @@
+"""
+LLM 响应缓存（按内容寻址）
+相同的模型 + 工具 + 提示词 + 输入直接返回 PostgreSQL 中保存的响应，不消耗 token
+"""
+
+import hashlib
+import json
+import logging
+from types import SimpleNamespace
+from typing import Any, Awaitable, Callable, Dict
+
+from src.config import settings
+from src.database import db
+
+logger = logging.getLogger(__name__)
+
+
+def to_namespace(value: Any) -> Any:
+    """把保存的 JSON 还原为可按属性访问的对象（与 OpenAI SDK 响应对象用法一致）"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+class LLMResponseCache:
+    """
+    PostgreSQL 中的 LLM 响应缓存
+
+    - 键：请求参数（model、tools、input/messages、输出格式等）规范化 JSON 的 SHA256
+    - 过期：web_search 响应按 LLM_CACHE_SEARCH_TTL_HOURS，解析等其他调用按 LLM_CACHE_TTL_HOURS
+    - 容量：最多 LLM_CACHE_MAX_ENTRIES 条，超出后按最近使用时间淘汰（LRU）
+    - 命中的响应对象带 from_cache=True，便于统计 token 消耗
+    """
+
+    # 每写入多少条执行一次过期清理 + 容量淘汰
+    EVICT_EVERY = 50
+
+    def __init__(self):
+        self.enabled = settings.llm_cache_enabled
+        self.search_ttl_hours = settings.llm_cache_search_ttl_hours
+        self.ttl_hours = settings.llm_cache_ttl_hours
+        self.max_entries = settings.llm_cache_max_entries
+        self.max_entry_bytes = settings.llm_cache_max_entry_kb * 1024
+
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evicted = 0
+        self._stores_since_evict = 0
+
+    @staticmethod
+    def make_key(kind: str, params: Dict) -> str:
+        """
+        计算缓存键
+
+        Args:
+            kind: 调用类型（"responses" / "chat"）
+            params: 传给 create() 的全部参数
+        """
+        canonical = json.dumps({"kind": kind, **params}, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    async def create(self, kind: str, create: Callable[..., Awaitable[Any]], **params) -> Any:
+        """
+        带缓存的 create() 调用
+
+        Args:
+            kind: 调用类型（"responses" / "chat"）
+            create: 实际的 SDK 方法（client.responses.create / client.chat.completions.create）
+            **params: create() 的参数
+
+        Returns:
+            SDK 响应对象；命中缓存时为同结构的 SimpleNamespace（from_cache=True）
+        """
+        if not self.enabled:
+            return await create(**params)
+
+        key = self.make_key(kind, params)
+        cached = await self._get(key)
+        if cached is not None:
+            self.hits += 1
+            logger.info(f"♻️ LLM 响应缓存命中（{kind}, {params.get('model')}）")
+            response = to_namespace(cached)
+            response.from_cache = True
+            return response
+
+        self.misses += 1
+        response = await create(**params)
+
+        ttl_hours = self.search_ttl_hours if params.get("tools") else self.ttl_hours
+        await self._put(key, kind, params.get("model"), response, ttl_hours)
+        return response
+
+    async def _get(self, key: str):
+        """读取未过期的缓存并更新最近使用时间（一次往返）"""
+        try:
+            payload = await db.fetchval("""
+                UPDATE llm_response_cache
+                SET last_used_at = NOW(), hits = hits + 1
+                WHERE key = $1
+                AND expires_at > NOW()
+                RETURNING response
+            """, key)
+        except Exception as e:
+            logger.warning(f"LLM 响应缓存读取失败: {e}")
+            return None
+
+        return json.loads(payload) if payload is not None else None
+
+    async def _put(self, key: str, kind: str, model: str, response: Any, ttl_hours: float):
+        """保存响应（过大的响应不缓存）"""
+        try:
+            payload = json.dumps(response.model_dump(mode="json"), ensure_ascii=False)
+        except Exception as e:
+            logger.warning(f"LLM 响应无法序列化，不缓存: {e}")
+            return
+
+        # 按 UTF-8 字节数限制和统计（中文等非 ASCII 内容一个字符占多个字节）
+        size_bytes = len(payload.encode("utf-8"))
+        if size_bytes > self.max_entry_bytes:
+            return
+
+        try:
+            await db.execute("""
+                INSERT INTO llm_response_cache (key, kind, model, response, size_bytes, expires_at)
+                VALUES ($1, $2, $3, $4::jsonb, $5, NOW() + make_interval(secs => $6))
+                ON CONFLICT (key) DO UPDATE
+                SET response = EXCLUDED.response,
+                    size_bytes = EXCLUDED.size_bytes,
+                    created_at = NOW(),
+                    last_used_at = NOW(),
+                    expires_at = EXCLUDED.expires_at
+            """, key, kind, model, payload, size_bytes, ttl_hours * 3600.0)
+        except Exception as e:
+            logger.warning(f"LLM 响应缓存写入失败: {e}")
+            return
+
+        self.stores += 1
+        self._stores_since_evict += 1
+        if self._stores_since_evict >= self.EVICT_EVERY:
+            self._stores_since_evict = 0
+            await self.evict()
+
+    async def evict(self) -> int:
+        """
+        删除过期条目，并按最近使用时间淘汰超出容量的条目
+
+        Returns:
+            删除的条目数
+        """
+        try:
+            expired = await db.fetchval("""
+                WITH removed AS (
+                    DELETE FROM llm_response_cache
+                    WHERE expires_at <= NOW()
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM removed
+            """)
+            overflow = await db.fetchval("""
+                WITH removed AS (
+                    DELETE FROM llm_response_cache
+                    WHERE key IN (
+                        SELECT key FROM llm_response_cache
+                        ORDER BY last_used_at DESC
+                        OFFSET $1
+                    )
+                    RETURNING 1
+                )
+                SELECT COUNT(*) FROM removed
+            """, self.max_entries)
+        except Exception as e:
+            logger.warning(f"LLM 响应缓存淘汰失败: {e}")
+            return 0
+
+        removed = (expired or 0) + (overflow or 0)
+        if removed:
+            self.evicted += removed
+            logger.info(f"🧹 LLM 响应缓存：删除 {expired} 条过期、{overflow} 条超出容量的条目")
+        return removed
+
+    async def get_stats(self) -> Dict:
+        """获取命中率和缓存大小"""
+        lookups = self.hits + self.misses
+        stats = {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0,
+            "stores": self.stores,
+            "evicted": self.evicted,
+            "max_entries": self.max_entries
+        }
+
+        try:
+            row = await db.fetchrow("""
+                SELECT COUNT(*) AS entries, COALESCE(SUM(size_bytes), 0) AS size_bytes
+                FROM llm_response_cache
+            """)
+            stats["entries"] = row["entries"]
+            stats["size_kb"] = int(row["size_bytes"]) // 1024
+        except Exception as e:
+            logger.warning(f"无法统计 LLM 响应缓存: {e}")
+
+        return stats
+
+
+# 全局 LLM 响应缓存实例
+llm_cache = LLMResponseCache()
@@ -4,10 +4,10 @@ Outscraper Google Maps API 客户端
 """
 
 import asyncio
-import httpx
 import time
 from typing import Dict, List, Optional
 import logging
+from src.utils.http_client import get_http_client
 
 logger = logging.getLogger(__name__)
 
@@ -82,34 +82,34 @@ class OutscraperClient:
                 "Content-Type": "application/json"
             }
 
-            # 发送请求
-            async with httpx.AsyncClient(timeout=60.0) as client:
-                response = await client.get(url, params=params, headers=headers)
+            # 发送请求（复用共享连接池，避免每次重新建立 TCP/TLS 连接）
+            client = get_http_client("api.app.outscraper.com")
+            response = await client.get(url, params=params, headers=headers, timeout=60.0)
 
-                if response.status_code == 200:
-                    data = response.json()
-                    reviews = self._parse_reviews(data, doctor_name)
+            if response.status_code == 200:
+                data = response.json()
+                reviews = self._parse_reviews(data, doctor_name)
 
-                    logger.info(f"✅ Outscraper 找到 {len(reviews)} 条包含 '{doctor_name}' 的评价")
+                logger.info(f"✅ Outscraper 找到 {len(reviews)} 条包含 '{doctor_name}' 的评价")
 
-                    return {
-                        "reviews": reviews,
-                        "total_count": len(reviews),
-                        "source": "outscraper_keyword_search",
-                        "query": query
-                    }
+                return {
+                    "reviews": reviews,
+                    "total_count": len(reviews),
+                    "source": "outscraper_keyword_search",
+                    "query": query
+                }
 
-                elif response.status_code == 401:
-                    logger.error("❌ Outscraper API key 无效")
-                    return {"reviews": [], "total_count": 0, "error": "Invalid API key"}
+            elif response.status_code == 401:
+                logger.error("❌ Outscraper API key 无效")
+                return {"reviews": [], "total_count": 0, "error": "Invalid API key"}
 
-                elif response.status_code == 429:
-                    logger.error("❌ Outscraper API 请求过于频繁")
-                    return {"reviews": [], "total_count": 0, "error": "Rate limit exceeded"}
+            elif response.status_code == 429:
+                logger.error("❌ Outscraper API 请求过于频繁")
+                return {"reviews": [], "total_count": 0, "error": "Rate limit exceeded"}
 
-                else:
-                    logger.error(f"❌ Outscraper API 错误: {response.status_code}")
-                    return {"reviews": [], "total_count": 0, "error": f"HTTP {response.status_code}"}
+            else:
+                logger.error(f"❌ Outscraper API 错误: {response.status_code}")
+                return {"reviews": [], "total_count": 0, "error": f"HTTP {response.status_code}"}
 
         except Exception as e:
             logger.error(f"❌ Outscraper 搜索失败: {e}")
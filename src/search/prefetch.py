@@ -0,0 +1,191 @@
+"""
+热门医生后台预取
+在缓存过期前刷新最常被搜索的医生，把昂贵的搜索移出用户请求路径
+"""
+
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+from src.config import settings
+from src.cache.manager import cache_manager
+
+logger = logging.getLogger(__name__)
+
+
+class PrefetchScheduler:
+    """
+    热门医生预取调度器（在 FastAPI lifespan 中运行）
+
+    每个周期：
+    1. 从 search_logs 取最热门的 N 位医生
+    2. 找出缓存缺失或即将过期的医生
+    3. 在并发上限和每日成本预算内刷新（只在低峰时段运行）
+    """
+
+    def __init__(self):
+        self.enabled = settings.prefetch_enabled
+        self.interval_seconds = settings.prefetch_interval_minutes * 60
+        self.top_n = settings.prefetch_top_n
+        self.concurrency = settings.prefetch_concurrency
+        self.refresh_before = timedelta(hours=settings.prefetch_refresh_before_hours)
+        self.daily_budget_usd = settings.prefetch_daily_budget_usd
+        self.cost_per_search_usd = settings.prefetch_cost_per_search_usd
+        self.offpeak_start_hour = settings.prefetch_offpeak_start_hour_utc
+        self.offpeak_end_hour = settings.prefetch_offpeak_end_hour_utc
+
+        self.spent_today_usd = 0.0
+        self._budget_date = None
+        self._task: asyncio.Task = None
+
+    async def start(self):
+        """启动后台循环（未启用时不做任何事）"""
+        if not self.enabled:
+            logger.info("⏸️ 热门医生预取未启用（PREFETCH_ENABLED=false）")
+            return
+
+        self._task = asyncio.create_task(self._run())
+        logger.info(
+            f"✅ 热门医生预取已启动：每 {self.interval_seconds // 60} 分钟，"
+            f"Top {self.top_n}，并发 {self.concurrency}，每日预算 ${self.daily_budget_usd:.2f}"
+        )
+
+    async def stop(self):
+        """停止后台循环"""
+        if self._task is None:
+            return
+
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def _run(self):
+        """后台循环：只在低峰时段执行预取"""
+        while True:
+            try:
+                if self.in_offpeak_window(datetime.now(timezone.utc)):
+                    await self.run_once()
+                else:
+                    logger.debug("⏸️ 当前不在低峰时段，跳过预取")
+            except Exception as e:
+                logger.error(f"❌ 预取周期失败: {e}")
+
+            await asyncio.sleep(self.interval_seconds)
+
+    def in_offpeak_window(self, now: datetime) -> bool:
+        """
+        判断是否处于低峰时段（UTC 小时，支持跨午夜，例如 22-5）
+
+        Args:
+            now: 当前 UTC 时间
+
+        Returns:
+            是否处于低峰时段
+        """
+        start, end = self.offpeak_start_hour, self.offpeak_end_hour
+        if start == end:
+            return True
+        if start < end:
+            return start <= now.hour < end
+        return now.hour >= start or now.hour < end
+
+    def _reserve_budget(self) -> bool:
+        """为一次搜索预留预算（每天 UTC 零点重置），超出预算返回 False"""
+        today = datetime.now(timezone.utc).date()
+        if self._budget_date != today:
+            self._budget_date = today
+            self.spent_today_usd = 0.0
+
+        if self.spent_today_usd + self.cost_per_search_usd > self.daily_budget_usd:
+            return False
+
+        self.spent_today_usd += self.cost_per_search_usd
+        return True
+
+    async def _find_candidates(self) -> List[Dict]:
+        """
+        找出需要刷新的热门医生（缓存缺失或在刷新窗口内过期）
+
+        Returns:
+            [{"doctor_name": ..., "doctor_id": ..., "search_count": ...}]，按热度排序
+        """
+        from src.models.search_log import search_logger
+
+        popular_doctors = await search_logger.get_popular_doctors(limit=self.top_n)
+        refresh_deadline = datetime.now() + self.refresh_before
+
+        candidates = []
+        seen_ids = set()
+
+        for doctor in popular_doctors:
+            doctor_name = doctor["doctor_name"]
+            # 与聚合器使用相同的缓存键（默认地点 Malaysia，名字变体解析到同一位医生）
+            doctor_id = await cache_manager.resolve_doctor_id(doctor_name, location="Malaysia")
+
+            # search_logs 按原始名字分组，不同写法可能是同一位医生
+            if doctor_id in seen_ids:
+                continue
+            seen_ids.add(doctor_id)
+
+            status = await cache_manager.check_cache_status(doctor_id)
+            next_expiry = status.get("next_expiry")
+
+            if status.get("cache_valid") and next_expiry and next_expiry > refresh_deadline:
+                continue
+
+            candidates.append({
+                "doctor_name": doctor_name,
+                "doctor_id": doctor_id,
+                "search_count": doctor["search_count"]
+            })
+
+        return candidates
+
+    async def run_once(self) -> int:
+        """
+        执行一个预取周期
+
+        Returns:
+            本周期刷新的医生数量
+        """
+        from src.search.aggregator import search_aggregator
+
+        candidates = await self._find_candidates()
+        if not candidates:
+            logger.info("✅ 热门医生缓存都还新鲜，无需预取")
+            return 0
+
+        semaphore = asyncio.Semaphore(self.concurrency)
+        refreshed = 0
+
+        async def refresh(candidate: Dict):
+            nonlocal refreshed
+            async with semaphore:
+                try:
+                    await search_aggregator.refresh_doctor_reviews(candidate["doctor_name"])
+                    refreshed += 1
+                except Exception as e:
+                    logger.error(f"❌ 预取失败: {candidate['doctor_name']}: {e}")
+
+        # 按热度顺序预留预算，超出预算的医生留到下一天
+        scheduled = []
+        for candidate in candidates:
+            if not self._reserve_budget():
+                logger.warning(
+                    f"💰 预取预算已用完（${self.spent_today_usd:.2f}/${self.daily_budget_usd:.2f}），"
+                    f"跳过剩余 {len(candidates) - len(scheduled)} 位医生"
+                )
+                break
+            scheduled.append(refresh(candidate))
+
+        await asyncio.gather(*scheduled)
+
+        logger.info(f"🔄 预取完成：刷新 {refreshed}/{len(candidates)} 位热门医生，今日花费 ${self.spent_today_usd:.2f}")
+        return refreshed
+
+
+# 全局实例
+prefetch_scheduler = PrefetchScheduler()
@@ -0,0 +1,164 @@
+"""
+数据源提供者 + 注册表
+每个数据源声明自己的成本、预期耗时和启用状态，SearchAggregator 按这些元数据调度；
+新增数据源只需实现 SourceProvider 并注册，无需修改聚合器的控制流
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from typing import Dict, Iterator, List, Optional
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SourceProvider(ABC):
+    """
+    数据源接口
+
+    子类声明：
+    - name：数据源名称（事件、熔断器、结果中的 sources 使用）
+    - label：日志中显示的名称
+    - count_key：结果中该数据源评价数量的字段（如 google_maps_count），为空则不输出
+    - cost_usd：每次搜索的预计成本（cheapest_first 调度按此排序）
+    - expected_latency_seconds：预计耗时（没有实际延迟样本时使用）
+    - max_timeout_seconds：超时上限（熔断器的自适应超时不会超过该值）
+    """
+
+    name: str = ""
+    label: str = ""
+    count_key: str = ""
+    cost_usd: float = 0.0
+    expected_latency_seconds: float = 30.0
+    max_timeout_seconds: float = 60.0
+
+    @property
+    def configured(self) -> bool:
+        """客户端是否已配置（例如 API key 已设置）"""
+        return True
+
+    @property
+    def enabled(self) -> bool:
+        """是否参与搜索：已配置，且未在 SEARCH_DISABLED_SOURCES 中禁用"""
+        disabled = {name.strip() for name in settings.search_disabled_sources.split(",") if name.strip()}
+        return self.configured and self.name not in disabled
+
+    @abstractmethod
+    async def search(self, doctor_name: str, location: str) -> Dict:
+        """
+        搜索医生评价
+
+        Returns:
+            {"reviews": [...], "total_count": 5, "summary": "...", "citations": [...], "error": "..."}
+            （summary / citations / error 可选；客户端自己捕获的错误以 error 字段返回）
+        """
+
+    def describe(self) -> Dict:
+        """数据源元数据（用于 /health）"""
+        return {
+            "enabled": self.enabled,
+            "cost_usd": self.cost_usd,
+            "expected_latency_seconds": self.expected_latency_seconds,
+            "max_timeout_seconds": self.max_timeout_seconds
+        }
+
+
+class OutscraperProvider(SourceProvider):
+    """Outscraper 关键词搜索 Google Maps 评价"""
+
+    name = "outscraper"
+    label = "Outscraper"
+    count_key = "google_maps_count"
+    expected_latency_seconds = 15.0
+
+    # 每次最多获取的评价数
+    REVIEW_LIMIT = 20
+
+    def __init__(self, client=None):
+        from src.search.outscraper_client import get_outscraper_client
+        self.client = client or get_outscraper_client()
+        self.cost_usd = settings.search_outscraper_cost_usd
+        self.max_timeout_seconds = settings.search_outscraper_timeout_seconds
+
+    @property
+    def configured(self) -> bool:
+        return self.client.enabled
+
+    async def search(self, doctor_name: str, location: str) -> Dict:
+        return await self.client.search_doctor_reviews(
+            doctor_name=doctor_name,
+            location=location,
+            limit=self.REVIEW_LIMIT
+        )
+
+
+class ChatGPTProvider(SourceProvider):
+    """ChatGPT web search 搜索 Facebook 和论坛评价"""
+
+    name = "chatgpt"
+    label = "ChatGPT"
+    count_key = "facebook_forums_count"
+    expected_latency_seconds = 90.0
+
+    def __init__(self, client=None):
+        from src.search.chatgpt_search import get_chatgpt_client
+        self.client = client or get_chatgpt_client()
+        self.cost_usd = settings.search_chatgpt_cost_usd
+        self.max_timeout_seconds = settings.search_chatgpt_timeout_seconds
+
+    @property
+    def configured(self) -> bool:
+        return self.client.enabled
+
+    async def search(self, doctor_name: str, location: str) -> Dict:
+        return await self.client.search_facebook_and_forums(
+            doctor_name=doctor_name,
+            location=location
+        )
+
+
+class SourceRegistry:
+    """数据源注册表（按注册顺序保存）"""
+
+    def __init__(self):
+        self._providers: Dict[str, SourceProvider] = {}
+
+    def register(self, provider: SourceProvider):
+        """注册数据源（同名数据源会被替换）"""
+        if provider.name in self._providers:
+            logger.warning(f"⚠️ 数据源 {provider.name} 已注册，替换为新的实现")
+        self._providers[provider.name] = provider
+
+    def unregister(self, name: str):
+        """移除数据源"""
+        self._providers.pop(name, None)
+
+    def get(self, name: str) -> Optional[SourceProvider]:
+        """按名称获取数据源"""
+        return self._providers.get(name)
+
+    def enabled(self) -> List[SourceProvider]:
+        """已启用的数据源"""
+        return [provider for provider in self._providers.values() if provider.enabled]
+
+    def __iter__(self) -> Iterator[SourceProvider]:
+        return iter(list(self._providers.values()))
+
+    def __len__(self) -> int:
+        return len(self._providers)
+
+
+# 创建全局实例（懒加载）
+_source_registry = None
+
+def get_source_registry() -> SourceRegistry:
+    """获取数据源注册表（首次调用时注册内置的 Outscraper 和 ChatGPT 数据源）"""
+    global _source_registry
+
+    if _source_registry is None:
+        _source_registry = SourceRegistry()
+        _source_registry.register(OutscraperProvider())
+        _source_registry.register(ChatGPTProvider())
+
+    return _source_registry
@@ -3,6 +3,8 @@ Utility modules
 """
 
 from src.utils.logger import setup_logging, get_logger
+from src.utils.http_client import get_http_client, close_http_clients
+from src.utils.llm_usage import track_llm_usage, record_llm_call, get_llm_usage_totals
 from src.utils.error_handler import (
     DoctorReviewError,
     QuotaExceededError,
@@ -16,6 +18,11 @@ from src.utils.error_handler import (
 __all__ = [
     'setup_logging',
     'get_logger',
+    'get_http_client',
+    'close_http_clients',
+    'track_llm_usage',
+    'record_llm_call',
+    'get_llm_usage_totals',
     'DoctorReviewError',
     'QuotaExceededError',
     'SearchError',
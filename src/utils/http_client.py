@@ -0,0 +1,66 @@
+"""
+Shared pooled HTTP clients for outbound requests
+One keep-alive httpx.AsyncClient per upstream host, closed on app shutdown
+"""
+
+import logging
+from typing import Dict, Optional
+
+import httpx
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+# HTTP/2 needs the optional h2 package (pip install httpx[http2])
+try:
+    import h2  # noqa: F401
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
+_clients: Dict[str, httpx.AsyncClient] = {}
+
+
+def get_http_client(host: str, timeout: Optional[float] = 30.0) -> httpx.AsyncClient:
+    """
+    Get the shared client for an upstream host (created on first use)
+
+    Each host gets its own connection pool, so the limits apply per host and
+    TCP/TLS connections are reused across calls.
+
+    Args:
+        host: Upstream host name, used as the registry key (e.g. "api.twilio.com")
+        timeout: Default request timeout in seconds (can be overridden per request)
+
+    Returns:
+        Shared httpx.AsyncClient
+    """
+    client = _clients.get(host)
+
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            timeout=timeout,
+            http2=HTTP2_AVAILABLE,
+            limits=httpx.Limits(
+                max_connections=settings.http_max_connections_per_host,
+                max_keepalive_connections=settings.http_max_keepalive_connections_per_host,
+                keepalive_expiry=settings.http_keepalive_expiry_seconds
+            )
+        )
+        _clients[host] = client
+        logger.info(f"🔌 Created pooled HTTP client for {host} (http2={HTTP2_AVAILABLE})")
+
+    return client
+
+
+async def close_http_clients():
+    """Close all shared clients (called on application shutdown)"""
+    for host, client in list(_clients.items()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Error closing HTTP client for {host}: {e}")
+
+    _clients.clear()
+    logger.info("HTTP clients closed")
@@ -0,0 +1,184 @@
+"""
+OpenAI usage and cost accounting
+Every AsyncOpenAI call reports its tokens, web_search tool calls and wall time here;
+usage is attributed to the request being tracked (search_logs) and to per-model totals
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Dict, Iterator, Tuple
+
+logger = logging.getLogger(__name__)
+
+# USD per 1M tokens (input, output); reasoning tokens are billed as output.
+# Dated snapshots ("gpt-4o-mini-2024-07-18") match by prefix.
+MODEL_PRICING_PER_1M = {
+    "gpt-5-mini": (0.25, 2.00),
+    "gpt-5-nano": (0.05, 0.40),
+    "gpt-5": (1.25, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4.1-mini": (0.40, 1.60),
+    "gpt-4.1": (2.00, 8.00),
+}
+
+# web_search tool, per call
+WEB_SEARCH_CALL_USD = 0.01
+
+
+class LLMUsage:
+    """Accumulated OpenAI usage"""
+
+    def __init__(self):
+        self.calls = 0
+        self.cached_calls = 0
+        self.failed_calls = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.reasoning_tokens = 0
+        self.web_search_calls = 0
+        self.wall_ms = 0
+        self.cost_usd = 0.0
+
+    def to_dict(self) -> Dict:
+        return {
+            "calls": self.calls,
+            "cached_calls": self.cached_calls,
+            "failed_calls": self.failed_calls,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "reasoning_tokens": self.reasoning_tokens,
+            "web_search_calls": self.web_search_calls,
+            "wall_ms": self.wall_ms,
+            "cost_usd": round(self.cost_usd, 6)
+        }
+
+
+# Usage trackers active in the current task (tasks copy the context, so
+# source tasks started during a tracked search report to the same tracker)
+_active: ContextVar[Tuple[LLMUsage, ...]] = ContextVar("llm_usage", default=())
+
+# Process-wide totals per model (for /health)
+_totals: Dict[str, LLMUsage] = {}
+_unpriced_models = set()
+
+
+@contextmanager
+def track_llm_usage(detached: bool = False) -> Iterator[LLMUsage]:
+    """
+    Collect the usage of every OpenAI call made inside the block
+
+    Usage:
+        with track_llm_usage() as usage:
+            await search(...)
+        usage.cost_usd
+
+    Args:
+        detached: Don't also report to trackers inherited from the enclosing context
+            (background work such as a cache refresh started from a tracked search)
+    """
+    usage = LLMUsage()
+    token = _active.set((usage,) if detached else _active.get() + (usage,))
+    try:
+        yield usage
+    finally:
+        _active.reset(token)
+
+
+def estimate_cost_usd(model: str, input_tokens: int, output_tokens: int, web_search_calls: int = 0) -> float:
+    """
+    Cost of one call from its token counts
+
+    Unknown models are priced at 0 (logged once) rather than guessed.
+    """
+    pricing = None
+    for name in sorted(MODEL_PRICING_PER_1M, key=len, reverse=True):
+        if (model or "").startswith(name):
+            pricing = MODEL_PRICING_PER_1M[name]
+            break
+
+    if pricing is None:
+        if model not in _unpriced_models:
+            _unpriced_models.add(model)
+            logger.warning(f"No pricing for model {model}, its token cost is counted as $0")
+        pricing = (0.0, 0.0)
+
+    input_price, output_price = pricing
+    return (
+        input_tokens * input_price / 1_000_000
+        + output_tokens * output_price / 1_000_000
+        + web_search_calls * WEB_SEARCH_CALL_USD
+    )
+
+
+def _extract_usage(response) -> Tuple[int, int, int, int]:
+    """(input, output, reasoning, web_search_calls) from a Responses or Chat Completions response"""
+    usage = getattr(response, "usage", None)
+
+    input_tokens = getattr(usage, "input_tokens", None)
+    if input_tokens is None:
+        input_tokens = getattr(usage, "prompt_tokens", 0)
+    output_tokens = getattr(usage, "output_tokens", None)
+    if output_tokens is None:
+        output_tokens = getattr(usage, "completion_tokens", 0)
+
+    details = getattr(usage, "output_tokens_details", None) or getattr(usage, "completion_tokens_details", None)
+    reasoning_tokens = getattr(details, "reasoning_tokens", 0) or 0
+
+    output_items = getattr(response, "output", None)
+    web_search_calls = sum(
+        1 for item in output_items or [] if getattr(item, "type", None) == "web_search_call"
+    ) if isinstance(output_items, list) else 0
+
+    return input_tokens or 0, output_tokens or 0, reasoning_tokens, web_search_calls
+
+
+def record_llm_call(model: str, response, wall_seconds: float, purpose: str = ""):
+    """
+    Record one OpenAI call
+
+    Args:
+        model: Model name the call was made with
+        response: SDK response (None if the call failed); responses served by
+            the LLM response cache (from_cache=True) cost nothing
+        wall_seconds: Wall time of the call
+        purpose: Short label for the log line (e.g. "web_search", "sentiment")
+    """
+    wall_ms = int(wall_seconds * 1000)
+    trackers = _active.get() + (_totals.setdefault(model or "unknown", LLMUsage()),)
+
+    if response is None:
+        for usage in trackers:
+            usage.failed_calls += 1
+            usage.wall_ms += wall_ms
+        return
+
+    if getattr(response, "from_cache", False):
+        for usage in trackers:
+            usage.cached_calls += 1
+            usage.wall_ms += wall_ms
+        return
+
+    input_tokens, output_tokens, reasoning_tokens, web_search_calls = _extract_usage(response)
+    cost = estimate_cost_usd(model, input_tokens, output_tokens, web_search_calls)
+
+    for usage in trackers:
+        usage.calls += 1
+        usage.input_tokens += input_tokens
+        usage.output_tokens += output_tokens
+        usage.reasoning_tokens += reasoning_tokens
+        usage.web_search_calls += web_search_calls
+        usage.wall_ms += wall_ms
+        usage.cost_usd += cost
+
+    logger.info(
+        f"💵 {purpose or model}: {input_tokens} in / {output_tokens} out "
+        f"({reasoning_tokens} reasoning), {web_search_calls} web searches, {wall_ms}ms, ${cost:.4f}"
+    )
+
+
+def get_llm_usage_totals() -> Dict[str, Dict]:
+    """Process-wide usage per model since startup"""
+    return {model: usage.to_dict() for model, usage in _totals.items()}
@@ -2,6 +2,14 @@
 Message formatting utilities for WhatsApp
 """
 
+# Human-readable labels for search sources (used in progressive delivery headers)
+SOURCE_LABELS = {
+    "cache": "Saved results",
+    "stale_cache": "Saved results (updating in the background)",
+    "outscraper": "Google Maps",
+    "chatgpt": "Facebook & forums",
+}
+
 
 def format_no_results(doctor_name: str, remaining: int = None, quota: int = None) -> str:
     """
@@ -28,9 +36,33 @@ _We search: Google Maps, Facebook, forums, and Malaysian healthcare sites_"""
     return message
 
 
+def format_doctor_summary(summary: dict) -> str:
+    """
+    Format a doctor's review statistics as one line
+
+    Args:
+        summary: Summary dict from CacheManager.get_doctor_summary
+
+    Returns:
+        e.g. "⭐ 4.6 from 23 reviews · 80% positive" (empty if there are no reviews yet)
+    """
+    if not summary or not summary.get("total_reviews"):
+        return ""
+
+    if summary.get("average_rating") is not None:
+        line = f"⭐ {summary['average_rating']:.1f} from {summary['total_reviews']} reviews"
+    else:
+        line = f"📊 {summary['total_reviews']} reviews"
+
+    if summary.get("positive_pct") is not None:
+        line += f" · {summary['positive_pct']}% positive"
+    return line
+
+
 def format_review_batch(batch: list, start_num: int, batch_num: int = None, total_batches: int = None,
                         doctor_name: str = "", total_count: int = 0, filtered_count: int = 0,
-                        remaining: int = None, quota: int = None) -> str:
+                        remaining: int = None, quota: int = None, source_label: str = None,
+                        summary: dict = None) -> str:
     """
     Format a batch of reviews for WhatsApp with header and footer
 
@@ -44,6 +76,8 @@ def format_review_batch(batch: list, start_num: int, batch_num: int = None, tota
         filtered_count: Number of filtered/invalid reviews
         remaining: Remaining searches this month (optional)
         quota: Monthly quota limit (optional)
+        source_label: Source shown in the header when results are sent per source (optional)
+        summary: Doctor statistics shown under the header (optional, see format_doctor_summary)
 
     Returns:
         Formatted message string
@@ -56,10 +90,16 @@ def format_review_batch(batch: list, start_num: int, batch_num: int = None, tota
             message += f"📊 Monthly quota: {remaining}/{quota} searches remaining\n\n"
 
         message += f"🔍 *{doctor_name}*\n"
+        if source_label:
+            message += f"From {source_label}: "
         message += f"Found {total_count} reviews"
         if filtered_count > 0:
             message += f" ({filtered_count} removed)"
-        message += "\n\n"
+        message += "\n"
+        summary_line = format_doctor_summary(summary)
+        if summary_line:
+            message += f"{summary_line}\n"
+        message += "\n"
     else:
         message = ""
 
@@ -136,7 +176,8 @@ def format_error_message(error_type: str = "general") -> str:
         "quota_exceeded": "⚠️ You've reached your daily query limit.\nDaily limit: 10 queries\nTry again tomorrow!",
         "invalid_input": "❌ Unable to recognize your input.\nPlease send a doctor's name, e.g.: Dr. Smith",
         "no_results": "❌ No reviews found.\nSuggestions:\n• Check spelling\n• Add hospital or location\n• Use full name",
-        "rate_limit": "⏳ Request too fast, please try again later."
+        "rate_limit": "⏳ Request too fast, please try again later.",
+        "busy": "⏳ We're handling a lot of searches right now. Please send your request again in a minute."
     }
 
     return messages.get(error_type, messages["general"])
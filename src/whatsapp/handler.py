@@ -4,7 +4,8 @@ Processes incoming messages and coordinates responses
 """
 
 import logging
-from src.whatsapp.client_mock import whatsapp_client
+from typing import Optional, Tuple
+from src.whatsapp.outbound import outbound_queue
 from src.whatsapp.formatter import (
     format_welcome_message,
     format_error_message,
@@ -51,11 +52,11 @@ class MessageHandler:
 ---
 Reply to user: Send them a message directly"""
 
-                await whatsapp_client.send_message(settings.admin_phone_number, feedback_message)
+                await outbound_queue.send_message(settings.admin_phone_number, feedback_message)
                 logger.info(f"📤 Feedback forwarded from {from_number} to admin")
 
                 # Confirm to user
-                await whatsapp_client.send_message(
+                await outbound_queue.send_message(
                     from_number,
                     "✅ Thank you for your feedback! Your message has been sent to the administrator."
                 )
@@ -142,6 +143,23 @@ Reply to user: Send them a message directly"""
                 response += f"   💾 Cache: {'✅' if record['cache_hit'] else '❌'}\n\n"
             return response
 
+        # Look up known doctors by partial or misspelled name
+        elif message_lower.startswith("find "):
+            from src.cache.doctor_lookup import doctor_lookup
+            query = message_text[5:].strip()
+            candidates = await doctor_lookup.search(query, limit=10)
+            if not candidates:
+                return f"❌ No known doctors match: {query}"
+
+            response = f"🔎 *Doctors matching: {query}*\n\n"
+            for i, doctor in enumerate(candidates, 1):
+                response += f"{i}. {doctor['name']} ({doctor['score']:.0%} match)\n"
+                if doctor.get("hospital_name"):
+                    response += f"   🏥 {doctor['hospital_name']}\n"
+                if doctor.get("total_reviews"):
+                    response += f"   📊 {doctor['total_reviews']} reviews\n"
+            return response
+
         # View system daily stats
         elif message_lower in ["daily", "system", "overview"]:
             daily_stats = await search_logger.get_daily_stats()
@@ -170,7 +188,8 @@ Reply to user: Send them a message directly"""
             response += "• `pending` - List pending users\n\n"
             response += "📊 *User Data:*\n"
             response += "• `stats <phone>` - User statistics\n"
-            response += "• `history <phone>` - User search history\n\n"
+            response += "• `history <phone>` - User search history\n"
+            response += "• `find <name>` - Look up known doctors\n\n"
             response += "📈 *System:*\n"
             response += "• `daily` - Daily system overview\n"
             response += "• `help` - Show this help"
@@ -198,12 +217,12 @@ Reply to user: Send them a message directly"""
                 # Allow welcome commands for admin too
                 if message_text.lower() in ["hi", "hello", "start", "/start"]:
                     response = format_welcome_message()
-                    await whatsapp_client.send_message(from_number, response)
+                    await outbound_queue.send_message(from_number, response)
                     return
                 
                 admin_response = await self._handle_admin_command(message_text)
                 if admin_response:
-                    await whatsapp_client.send_message(from_number, admin_response)
+                    await outbound_queue.send_message(from_number, admin_response)
                     return
 
             # Check for feedback command (available to all users)
@@ -226,14 +245,14 @@ Reply to user: Send them a message directly"""
 An administrator has been notified and will review your request shortly.
 
 You'll be able to use the bot once approved."""
-                await whatsapp_client.send_message(from_number, pending_message)
+                await outbound_queue.send_message(from_number, pending_message)
                 return
 
             # Handle commands
             if message_text.lower() in ["hi", "hello", "start", "help", "/start", "quota", "limit"]:
                 # Send welcome message
                 response = format_welcome_message()
-                await whatsapp_client.send_message(from_number, response)
+                await outbound_queue.send_message(from_number, response)
                 return
 
             # User sent a doctor name - search directly (no specialty selection needed)
@@ -242,7 +261,7 @@ You'll be able to use the bot once approved."""
             # Reject single digits or single characters as doctor names
             if len(doctor_name) <= 1:
                 response = format_error_message("invalid_input")
-                await whatsapp_client.send_message(from_number, response)
+                await outbound_queue.send_message(from_number, response)
                 return
 
             # Check user quota (admin also has quota now - 500/month)
@@ -251,16 +270,18 @@ You'll be able to use the bot once approved."""
 
             if not quota_status.get("allowed", True):
                 response = format_error_message("quota_exceeded")
-                await whatsapp_client.send_message(from_number, response)
+                await outbound_queue.send_message(from_number, response)
                 return
 
             # Search directly - no specialty needed
-            await self._perform_search(from_number, doctor_name)
+            # Quota is already charged, so record the search as a job that survives restarts
+            from src.whatsapp.search_jobs import search_job_runner
+            await search_job_runner.submit(from_number, doctor_name)
             return
 
         except Exception as e:
             logger.error(f"❌ Error processing message: {e}", exc_info=True)
-            await whatsapp_client.send_message(
+            await outbound_queue.send_message(
                 from_number,
                 format_error_message("general")
             )
@@ -275,7 +296,7 @@ You'll be able to use the bot once approved."""
         """
         try:
             # Send processing message
-            await whatsapp_client.send_message(
+            await outbound_queue.send_message(
                 from_number,
                 format_processing_message()
             )
@@ -284,29 +305,52 @@ You'll be able to use the bot once approved."""
             import time
             start_time = time.time()
 
-            # Search for doctor reviews using Google + OpenAI
-            reviews = await self._search_doctor_reviews(doctor_name)
+            from src.config import settings
+            from src.utils.llm_usage import track_llm_usage
+
+            # Every OpenAI call made for this search (including source tasks it starts)
+            # reports its tokens and cost to llm_usage
+            with track_llm_usage() as llm_usage:
+                if settings.progressive_delivery_enabled:
+                    # Send each source's results as soon as it finishes
+                    reviews, cache_tier = await self._stream_search_results(from_number, doctor_name, start_time)
+                else:
+                    # Search for doctor reviews using Google + OpenAI
+                    reviews, cache_tier = await self._search_doctor_reviews(doctor_name)
 
             # Calculate response time
             response_time_ms = int((time.time() - start_time) * 1000)
+            served_from = f"cache ({cache_tier})" if cache_tier else "sources"
+            logger.info(f"📊 Search for {doctor_name} served from {served_from} in {response_time_ms}ms")
 
             # Log search
             from src.models.search_log import search_logger
             from src.cache.manager import cache_manager
 
-            doctor_id = cache_manager.generate_doctor_id(doctor_name)
+            # Same key the aggregator caches under (default location, name variants
+            # resolved), so search_logs can be joined with doctor_reviews for popularity-based TTLs
+            doctor_id = await cache_manager.resolve_doctor_id(doctor_name, location="Malaysia")
             await search_logger.log_search(
                 user_id=from_number,
                 doctor_name=doctor_name,
                 doctor_id=doctor_id,
-                cache_hit=len(reviews) > 0 and response_time_ms < 500,
+                cache_hit=cache_tier is not None,
                 response_time_ms=response_time_ms,
                 sources_used=list(set([r.get("source") for r in reviews if r.get("source")])),
                 results_count=len(reviews),
-                api_calls_count=0 if response_time_ms < 500 else 2,
-                estimated_cost_usd=0.0 if response_time_ms < 500 else 0.01
+                api_calls_count=llm_usage.calls,
+                estimated_cost_usd=llm_usage.cost_usd,
+                input_tokens=llm_usage.input_tokens,
+                output_tokens=llm_usage.output_tokens,
+                reasoning_tokens=llm_usage.reasoning_tokens,
+                web_search_calls=llm_usage.web_search_calls,
+                llm_time_ms=llm_usage.wall_ms
             )
 
+            if settings.progressive_delivery_enabled:
+                # Results were already sent as each source finished
+                return
+
             # Send results in batches to show all reviews
             # Each message can hold ~5 reviews within 1600 char limit
             # Quota is now shown at the top of the first message
@@ -314,7 +358,7 @@ You'll be able to use the bot once approved."""
 
         except Exception as e:
             logger.error(f"❌ Error performing search: {e}", exc_info=True)
-            await whatsapp_client.send_message(
+            await outbound_queue.send_message(
                 from_number,
                 format_error_message("general")
             )
@@ -370,7 +414,71 @@ You'll be able to use the bot once approved."""
 
         return merged
 
-    async def _send_reviews_in_batches(self, from_number: str, doctor_name: str, reviews: list):
+    async def _stream_search_results(self, from_number: str, doctor_name: str, start_time: float) -> Tuple[list, Optional[str]]:
+        """
+        Search for doctor reviews and send each source's results as soon as it finishes
+
+        Google Maps results usually arrive well before the forum search,
+        so the user gets a first useful message without waiting for every source.
+
+        Args:
+            from_number: User's phone number
+            doctor_name: Doctor's name
+            start_time: Search start time (time.time()), for time-to-first-message logging
+
+        Returns:
+            (all reviews that were sent, cache tier that served them or None
+            if they came from the sources)
+        """
+        import time
+        from src.search.aggregator import search_aggregator
+        from src.whatsapp.formatter import SOURCE_LABELS
+
+        logger.info(f"🔍 Streaming reviews: {doctor_name}")
+
+        all_reviews = []
+        cache_tier = None
+        messages_sent = 0
+
+        async for event in search_aggregator.stream_doctor_reviews(doctor_name=doctor_name):
+            if event["type"] == "done":
+                cache_tier = event["result"].get("cache_tier")
+                continue
+
+            reviews = event.get("reviews", [])
+            if not reviews:
+                continue
+
+            if event["type"] == "cache":
+                source = "stale_cache" if event.get("stale") else "cache"
+            else:
+                source = event.get("source")
+            all_reviews.extend(reviews)
+
+            # Fresh cache hits look like a normal result; sources and stale caches are labelled
+            await self._send_reviews_in_batches(
+                from_number,
+                doctor_name,
+                reviews,
+                source_label=SOURCE_LABELS.get(source, source) if source != "cache" else None,
+                show_quota=messages_sent == 0,
+                summary=event.get("doctor_stats")
+            )
+
+            if messages_sent == 0:
+                first_message_ms = int((time.time() - start_time) * 1000)
+                logger.info(f"⚡ Time to first result message: {first_message_ms}ms (source: {source})")
+            messages_sent += 1
+
+        if messages_sent == 0:
+            # No source returned reviews - send the usual "no results" message
+            await self._send_reviews_in_batches(from_number, doctor_name, [])
+
+        return all_reviews, cache_tier
+
+    async def _send_reviews_in_batches(self, from_number: str, doctor_name: str, reviews: list,
+                                       source_label: str = None, show_quota: bool = True,
+                                       summary: dict = None):
         """
         Send reviews in multiple messages to show all results
 
@@ -378,19 +486,25 @@ You'll be able to use the bot once approved."""
             from_number: User's phone number
             doctor_name: Doctor's name
             reviews: List of all reviews
+            source_label: Source name shown in the header (progressive delivery only)
+            show_quota: Whether to show the quota line (only on the first message of a search)
+            summary: Doctor statistics for the header (cached results only)
         """
         from src.whatsapp.formatter import format_review_batch
 
         # Get user quota stats to show at the top
-        from src.models.user import user_quota_manager
-        user_stats = await user_quota_manager.get_user_stats(from_number)
-        remaining = user_stats.get("remaining", 0)
-        quota = user_stats.get("monthly_quota", 50)
+        remaining = None
+        quota = None
+        if show_quota:
+            from src.models.user import user_quota_manager
+            user_stats = await user_quota_manager.get_user_stats(from_number)
+            remaining = user_stats.get("remaining", 0)
+            quota = user_stats.get("monthly_quota", 50)
 
         if not reviews:
             from src.whatsapp.formatter import format_no_results
             no_results = format_no_results(doctor_name, remaining=remaining, quota=quota)
-            await whatsapp_client.send_message(from_number, no_results)
+            await outbound_queue.send_message(from_number, no_results)
             return
 
         # Skip URL validation - GPT-4 already extracted valid reviews
@@ -401,7 +515,7 @@ You'll be able to use the bot once approved."""
         if not valid_reviews:
             from src.whatsapp.formatter import format_no_results
             no_results = format_no_results(doctor_name, remaining=remaining, quota=quota)
-            await whatsapp_client.send_message(from_number, no_results)
+            await outbound_queue.send_message(from_number, no_results)
             return
 
         # Sort by date (newest first) - no date filtering, show all reviews
@@ -449,17 +563,15 @@ You'll be able to use the bot once approved."""
                 total_count=len(valid_reviews),
                 filtered_count=0,  # Set to 0 to hide "X removed" message
                 remaining=remaining,  # Add quota info
-                quota=quota  # Add quota info
+                quota=quota,  # Add quota info
+                source_label=source_label,
+                summary=summary
             )
 
-            # Send batch
-            await whatsapp_client.send_message(from_number, message)
-
-            # Small delay between messages
-            import asyncio
-            await asyncio.sleep(0.3)
+            # Queue batch (sender workers keep per-recipient order and pace sends)
+            await outbound_queue.send_message(from_number, message)
 
-    async def _search_doctor_reviews(self, doctor_name: str) -> list:
+    async def _search_doctor_reviews(self, doctor_name: str) -> Tuple[list, Optional[str]]:
         """
         Search for doctor reviews using Google Custom Search
 
@@ -467,7 +579,7 @@ You'll be able to use the bot once approved."""
             doctor_name: Doctor's name
 
         Returns:
-            List of review dicts
+            (review dicts, cache tier that served them or None if they came from the sources)
         """
         from src.search.aggregator import search_aggregator
 
@@ -478,7 +590,7 @@ You'll be able to use the bot once approved."""
             doctor_name=doctor_name
         )
 
-        return result.get("reviews", [])
+        return result.get("reviews", []), result.get("cache_tier")
 
 
 # Global message handler instance
@@ -0,0 +1,218 @@
+"""
+Bounded inbound job queue for webhook messages
+A fixed pool of workers processes incoming messages, so a burst of webhooks
+can't start hundreds of concurrent searches against the database pool and OpenAI
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Deque, Dict, List, Set
+
+from src.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class InboundJobQueue:
+    """
+    Per-user fair job queue with a bounded worker pool
+
+    - Each user has their own FIFO; workers take users round-robin, so one
+      chatty user can't starve everyone else
+    - At most one job per user runs at a time (their messages are handled in order)
+    - Total and per-user queue sizes are bounded; rejected messages get a
+      "busy" reply instead of being dropped silently
+    - stop() drains queued and running jobs before shutdown
+    """
+
+    def __init__(self):
+        self.worker_count = settings.inbound_workers
+        self.max_size = settings.inbound_queue_max_size
+        self.max_per_user = settings.inbound_queue_max_per_user
+        self.drain_timeout = settings.inbound_drain_timeout_seconds
+
+        self._pending: Dict[str, Deque[Dict]] = {}
+        self._ready: Deque[str] = deque()  # Users with queued jobs and nothing running
+        self._active_users: Set[str] = set()
+        self._size = 0
+        self._condition = asyncio.Condition()
+        self._workers: List[asyncio.Task] = []
+        self._accepting = True
+        self._stopping = False
+
+        # Backpressure metrics
+        self.enqueued = 0
+        self.rejected = 0
+        self.completed = 0
+        self.failed = 0
+        self.max_depth = 0
+        self.total_wait_ms = 0
+        self.max_wait_ms = 0
+
+    async def start(self):
+        """Start the worker pool"""
+        if self._workers:
+            return
+
+        self._accepting = True
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(
+            f"✅ Inbound queue started: {self.worker_count} workers, "
+            f"max {self.max_size} queued ({self.max_per_user} per user)"
+        )
+
+    async def stop(self):
+        """Stop accepting messages and drain queued/running jobs (up to the drain timeout)"""
+        if not self._workers:
+            return
+
+        self._accepting = False
+        logger.info(f"⏳ Draining inbound queue: {self._size} queued, {len(self._active_users)} running")
+
+        async with self._condition:
+            self._stopping = True
+            self._condition.notify_all()
+
+        done, pending = await asyncio.wait(self._workers, timeout=self.drain_timeout)
+        if pending:
+            logger.warning(
+                f"⚠️ Inbound queue drain timed out after {self.drain_timeout}s: "
+                f"{self._size} queued and {len(self._active_users)} running job(s) abandoned"
+            )
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+
+        self._workers = []
+        logger.info("Inbound queue stopped")
+
+    async def submit(self, from_number: str, message_text: str) -> bool:
+        """
+        Queue an incoming message for processing
+
+        Args:
+            from_number: Sender's phone number
+            message_text: Message content
+
+        Returns:
+            True if queued, False if rejected (the user is told to retry later)
+        """
+        async with self._condition:
+            user_jobs = self._pending.get(from_number)
+            queued_for_user = len(user_jobs) if user_jobs else 0
+
+            if not self._accepting:
+                reason = "shutting down"
+            elif self._size >= self.max_size:
+                reason = f"queue full ({self._size}/{self.max_size})"
+            elif queued_for_user >= self.max_per_user:
+                reason = f"user has {queued_for_user} queued"
+            else:
+                reason = None
+
+            if reason is None:
+                if user_jobs is None:
+                    user_jobs = self._pending[from_number] = deque()
+                user_jobs.append({
+                    "from_number": from_number,
+                    "message_text": message_text,
+                    "enqueued_at": time.time()
+                })
+                self._size += 1
+                self.enqueued += 1
+                self.max_depth = max(self.max_depth, self._size)
+
+                if from_number not in self._active_users and len(user_jobs) == 1:
+                    self._ready.append(from_number)
+                self._condition.notify()
+                return True
+
+            self.rejected += 1
+
+        logger.warning(f"🚧 Rejected message from {from_number}: {reason}")
+        await self._send_busy_reply(from_number)
+        return False
+
+    async def _send_busy_reply(self, from_number: str):
+        """Tell a rejected user to try again instead of dropping their message silently"""
+        from src.whatsapp.outbound import outbound_queue
+        from src.whatsapp.formatter import format_error_message
+
+        try:
+            await outbound_queue.send_message(from_number, format_error_message("busy"))
+        except Exception as e:
+            logger.error(f"❌ Error sending busy reply to {from_number}: {e}")
+
+    async def _next_job(self):
+        """Wait for the next user's job (round-robin); None once stopping and drained"""
+        async with self._condition:
+            while not self._ready:
+                if self._stopping:
+                    return None
+                await self._condition.wait()
+
+            from_number = self._ready.popleft()
+            job = self._pending[from_number].popleft()
+            if not self._pending[from_number]:
+                del self._pending[from_number]
+            self._size -= 1
+            self._active_users.add(from_number)
+            return job
+
+    async def _finish_job(self, from_number: str):
+        """Release the user and put them at the back of the line if they have more jobs"""
+        async with self._condition:
+            self._active_users.discard(from_number)
+            if from_number in self._pending:
+                self._ready.append(from_number)
+                self._condition.notify()
+
+    async def _worker(self, worker_id: int):
+        """Process jobs until stopped and drained"""
+        from src.whatsapp.handler import message_handler
+
+        while True:
+            job = await self._next_job()
+            if job is None:
+                return
+
+            wait_ms = int((time.time() - job["enqueued_at"]) * 1000)
+            self.total_wait_ms += wait_ms
+            self.max_wait_ms = max(self.max_wait_ms, wait_ms)
+
+            try:
+                await message_handler.process_message(job["from_number"], job["message_text"])
+                self.completed += 1
+            except Exception as e:
+                # process_message handles its own errors; this is a last resort
+                self.failed += 1
+                logger.error(f"❌ Inbound worker {worker_id} job failed: {e}", exc_info=True)
+            finally:
+                await self._finish_job(job["from_number"])
+
+    def get_stats(self) -> Dict:
+        """Get queue depth and backpressure counters"""
+        started = self.completed + self.failed + len(self._active_users)
+        return {
+            "workers": len(self._workers),
+            "depth": self._size,
+            "max_size": self.max_size,
+            "running": len(self._active_users),
+            "waiting_users": len(self._pending),
+            "enqueued": self.enqueued,
+            "rejected": self.rejected,
+            "completed": self.completed,
+            "failed": self.failed,
+            "max_depth": self.max_depth,
+            "avg_wait_ms": int(self.total_wait_ms / started) if started else 0,
+            "max_wait_ms": self.max_wait_ms
+        }
+
+
+# Global inbound queue instance
+inbound_queue = InboundJobQueue()
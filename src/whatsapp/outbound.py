@@ -0,0 +1,298 @@
+"""
+Durable outbound WhatsApp message queue
+Messages are stored in PostgreSQL and delivered by a pool of sender workers,
+so a Twilio error no longer raises into the search that produced the message
+"""
+
+import asyncio
+import logging
+import os
+import socket
+import time
+from typing import Dict, List
+
+import httpx
+
+from src.config import settings
+from src.database import db
+from src.whatsapp.client_mock import whatsapp_client
+
+logger = logging.getLogger(__name__)
+
+
+class SendRateLimiter:
+    """Spaces sends from our WhatsApp number evenly across all workers"""
+
+    def __init__(self, rate_per_second: float):
+        self.interval = 1.0 / rate_per_second if rate_per_second > 0 else 0.0
+        self._next_slot = 0.0
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        """Wait until the next send slot is free"""
+        if self.interval <= 0:
+            return
+
+        async with self._lock:
+            now = time.monotonic()
+            wait = self._next_slot - now
+            if wait > 0:
+                await asyncio.sleep(wait)
+            self._next_slot = max(now, self._next_slot) + self.interval
+
+
+class OutboundMessageQueue:
+    """
+    PostgreSQL-backed outbound message queue with a sender worker pool
+
+    - Delivery is at-least-once: a claimed message holds a short lease; if its worker
+      dies mid-send the lease expires and any replica sends it again (this replica's
+      own leftovers from a previous process are retried right away on startup)
+    - Messages to the same recipient are delivered strictly in enqueue order,
+      a message is only claimed once every earlier message to that recipient is done
+    - Failed sends are retried with exponential backoff; permanent Twilio errors
+      (4xx other than 429) and exhausted retries are marked 'failed'
+    """
+
+    # Claim the oldest due message whose recipient has no earlier unfinished message
+    CLAIM_QUERY = """
+        UPDATE outbound_messages
+        SET status = 'sending',
+            attempts = attempts + 1,
+            worker_id = $1,
+            lease_expires_at = NOW() + make_interval(secs => $2)
+        WHERE id = (
+            SELECT m.id
+            FROM outbound_messages m
+            WHERE ((m.status = 'pending' AND m.next_attempt_at <= NOW())
+                   OR (m.status = 'sending' AND m.lease_expires_at < NOW()))
+            AND NOT EXISTS (
+                SELECT 1 FROM outbound_messages earlier
+                WHERE earlier.recipient = m.recipient
+                AND earlier.status IN ('pending', 'sending')
+                AND earlier.id < m.id
+            )
+            ORDER BY m.id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, recipient, body, attempts
+    """
+
+    # Mark a delivered message sent while this worker still holds the claim
+    SENT_QUERY = """
+        UPDATE outbound_messages
+        SET status = 'sent', sent_at = NOW(), last_error = NULL, lease_expires_at = NULL
+        WHERE id = $1 AND worker_id = $2 AND status = 'sending'
+    """
+
+    # Record a failed send (retry later or give up) while this worker still holds the claim
+    FAILURE_QUERY = """
+        UPDATE outbound_messages
+        SET status = $2,
+            last_error = $3,
+            next_attempt_at = NOW() + make_interval(secs => $4),
+            lease_expires_at = NULL
+        WHERE id = $1 AND status = 'sending' AND worker_id = $5
+    """
+
+    # Sends this worker id claimed before a restart can't still be in progress
+    RECOVER_QUERY = """
+        UPDATE outbound_messages
+        SET status = 'pending', next_attempt_at = NOW(), lease_expires_at = NULL
+        WHERE status = 'sending' AND worker_id = $1
+    """
+
+    def __init__(self):
+        self.enabled = settings.outbound_queue_enabled
+        self.worker_count = settings.outbound_workers
+        self.max_attempts = settings.outbound_max_attempts
+        self.retry_base_seconds = settings.outbound_retry_base_seconds
+        self.retry_max_seconds = settings.outbound_retry_max_seconds
+        self.poll_interval = settings.outbound_poll_interval_seconds
+        self.rate_limiter = SendRateLimiter(settings.outbound_rate_per_second)
+        self.lease_seconds = settings.outbound_lease_seconds
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.sent = 0
+        self.retried = 0
+        self.failed = 0
+
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and not self._stopping
+
+    async def start(self):
+        """Recover interrupted sends and start the worker pool"""
+        if not self.enabled:
+            logger.info("⏸️ Outbound queue disabled (OUTBOUND_QUEUE_ENABLED=false), sending inline")
+            return
+
+        try:
+            # A crash mid-send leaves our rows in 'sending' - deliver them again
+            # (other replicas' sends are recovered when their leases expire)
+            recovered = await db.execute(self.RECOVER_QUERY, self.worker_id)
+            if recovered and recovered != "UPDATE 0":
+                logger.warning(f"♻️ Outbound queue recovered interrupted sends: {recovered}")
+
+            await db.execute("""
+                DELETE FROM outbound_messages
+                WHERE status = 'sent'
+                AND sent_at < NOW() - make_interval(days => $1)
+            """, settings.outbound_retention_days)
+        except Exception as e:
+            logger.error(f"❌ Outbound queue unavailable, sending inline: {e}")
+            return
+
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(
+            f"✅ Outbound queue started: {self.worker_count} workers, "
+            f"{settings.outbound_rate_per_second}/s send rate"
+        )
+
+    async def stop(self, timeout: float = 10.0):
+        """Stop the workers, letting in-progress sends finish (pending rows stay queued)"""
+        if not self._workers:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+
+        done, pending = await asyncio.wait(self._workers, timeout=timeout)
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        self._workers = []
+        logger.info("Outbound queue stopped")
+
+    async def send_message(self, to: str, message: str) -> dict:
+        """
+        Queue a message for delivery (drop-in for whatsapp_client.send_message)
+
+        Falls back to a direct send when the queue isn't running or the insert fails.
+
+        Args:
+            to: Recipient phone number
+            message: Message text
+
+        Returns:
+            {"queued": True, "id": ...} or the direct send response
+        """
+        if self.running:
+            try:
+                message_id = await db.fetchval("""
+                    INSERT INTO outbound_messages (recipient, body)
+                    VALUES ($1, $2)
+                    RETURNING id
+                """, to, message)
+                self._wakeup.set()
+                return {"queued": True, "id": message_id}
+            except Exception as e:
+                logger.error(f"❌ Error queueing message for {to}, sending inline: {e}")
+
+        return await whatsapp_client.send_message(to, message)
+
+    async def _worker(self, worker_id: int):
+        """Claim and deliver messages until stopped"""
+        while not self._stopping:
+            try:
+                row = await db.fetchrow(self.CLAIM_QUERY, self.worker_id, float(self.lease_seconds))
+            except Exception as e:
+                logger.error(f"❌ Outbound worker {worker_id} claim failed: {e}")
+                row = None
+
+            if row is None:
+                # Nothing due - sleep until a new message is queued or the poll interval passes
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._deliver(row)
+
+    async def _deliver(self, row):
+        """Send one claimed message and record the outcome"""
+        await self.rate_limiter.acquire()
+
+        try:
+            await whatsapp_client.send_message(row["recipient"], row["body"])
+        except Exception as e:
+            await self._record_failure(row, e)
+            return
+
+        self.sent += 1
+        try:
+            await db.execute(self.SENT_QUERY, row["id"], self.worker_id)
+        except Exception as e:
+            logger.error(f"❌ Error marking message {row['id']} as sent: {e}")
+
+    async def _record_failure(self, row, error: Exception):
+        """Schedule a retry with backoff, or give up on permanent errors"""
+        attempts = row["attempts"]
+        permanent = self._is_permanent(error)
+
+        if permanent or attempts >= self.max_attempts:
+            self.failed += 1
+            status = "failed"
+            delay = 0.0
+            logger.error(
+                f"❌ Giving up on message {row['id']} to {row['recipient']} "
+                f"after {attempts} attempt(s): {error}"
+            )
+        else:
+            self.retried += 1
+            status = "pending"
+            delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+            logger.warning(
+                f"⚠️ Send to {row['recipient']} failed (attempt {attempts}), retrying in {delay:.0f}s: {error}"
+            )
+
+        try:
+            await db.execute(self.FAILURE_QUERY, row["id"], status, str(error)[:1000], delay, self.worker_id)
+        except Exception as e:
+            logger.error(f"❌ Error recording send failure for message {row['id']}: {e}")
+
+    @staticmethod
+    def _is_permanent(error: Exception) -> bool:
+        """Twilio 4xx responses (except 429 rate limiting) won't succeed on retry"""
+        if isinstance(error, httpx.HTTPStatusError):
+            status_code = error.response.status_code
+            return 400 <= status_code < 500 and status_code != 429
+        return False
+
+    async def get_stats(self) -> Dict:
+        """Get queue depth by status plus this process's delivery counters"""
+        stats = {
+            "running": self.running,
+            "workers": len(self._workers),
+            "sent": self.sent,
+            "retried": self.retried,
+            "failed": self.failed
+        }
+
+        try:
+            rows = await db.fetch("""
+                SELECT status, COUNT(*) AS count
+                FROM outbound_messages
+                WHERE status IN ('pending', 'sending', 'failed')
+                GROUP BY status
+            """)
+            stats["queued"] = {row["status"]: row["count"] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting outbound queue stats: {e}")
+
+        return stats
+
+
+# Global outbound queue instance
+outbound_queue = OutboundMessageQueue()
@@ -9,6 +9,7 @@ import logging
 from src.config import settings
 from src.whatsapp.models import WhatsAppWebhook
 from src.whatsapp.handler import message_handler
+from src.whatsapp.inbound import inbound_queue
 
 logger = logging.getLogger(__name__)
 
@@ -56,11 +57,8 @@ async def receive_webhook(request: Request):
             logger.info(f"📬 Received Twilio webhook: From={from_number}, Body={message_text}")
             
             if from_number and message_text:
-                # Process message asynchronously
-                import asyncio
-                asyncio.create_task(
-                    message_handler.process_message(from_number, message_text)
-                )
+                # Process message asynchronously (bounded worker pool)
+                await inbound_queue.submit(from_number, message_text)
             
             return {"status": "received"}
             
@@ -85,11 +83,8 @@ async def receive_webhook(request: Request):
                                 from_number = message.from_
                                 message_text = message.text.body
 
-                                # Process message asynchronously
-                                import asyncio
-                                asyncio.create_task(
-                                    message_handler.process_message(from_number, message_text)
-                                )
+                                # Process message asynchronously (bounded worker pool)
+                                await inbound_queue.submit(from_number, message_text)
 
             return {"status": "ok"}
 
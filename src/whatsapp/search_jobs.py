@@ -0,0 +1,297 @@
+"""
+Persistent search jobs
+Paid searches are recorded in PostgreSQL before they run, so a deploy or crash
+mid-search re-runs the job instead of losing a search the user was charged for
+"""
+
+import asyncio
+import logging
+import os
+import socket
+from typing import Dict, List
+
+from src.config import settings
+from src.database import db
+
+logger = logging.getLogger(__name__)
+
+
+class SearchJobRunner:
+    """
+    Resumable search job runner (safe with several replicas)
+
+    Job states: pending -> running -> done (or failed after max attempts)
+
+    - Jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so each job runs once
+    - A running job holds a lease that its worker renews while the search runs;
+      if the worker dies (restart, crash) the lease expires and any replica picks
+      the job up again
+    - A user's jobs run one at a time, in the order they were sent: only the
+      oldest unfinished job of each user can be claimed. Workers therefore take
+      the next job of other users first, so one user queueing many searches
+      can't occupy every worker (the fairness the inbound queue gives messages)
+    - Jobs interrupted by a graceful shutdown are put back to pending immediately
+    """
+
+    CLAIM_QUERY = """
+        UPDATE search_jobs
+        SET status = 'running',
+            attempts = attempts + 1,
+            worker_id = $1,
+            started_at = NOW(),
+            lease_expires_at = NOW() + make_interval(secs => $2)
+        WHERE id = (
+            SELECT id FROM search_jobs job
+            WHERE (status = 'pending'
+                   OR (status = 'running' AND lease_expires_at < NOW()))
+            AND NOT EXISTS (
+                SELECT 1 FROM search_jobs earlier
+                WHERE earlier.user_id = job.user_id
+                AND earlier.id < job.id
+                AND earlier.status IN ('pending', 'running')
+            )
+            ORDER BY id
+            LIMIT 1
+            FOR UPDATE SKIP LOCKED
+        )
+        RETURNING id, user_id, doctor_name, attempts
+    """
+
+    RENEW_QUERY = """
+        UPDATE search_jobs
+        SET lease_expires_at = NOW() + make_interval(secs => $3)
+        WHERE id = $1 AND worker_id = $2 AND status = 'running'
+    """
+
+    FINISH_QUERY = """
+        UPDATE search_jobs
+        SET status = $2, error_message = $3, finished_at = NOW(), lease_expires_at = NULL
+        WHERE id = $1 AND worker_id = $4
+    """
+
+    RELEASE_QUERY = """
+        UPDATE search_jobs
+        SET status = 'pending', lease_expires_at = NULL
+        WHERE id = $1 AND status = 'running' AND worker_id = $2
+    """
+
+    def __init__(self):
+        self.enabled = settings.search_jobs_enabled
+        self.worker_count = settings.search_job_workers
+        self.max_attempts = settings.search_job_max_attempts
+        self.poll_interval = settings.search_job_poll_interval_seconds
+        # The lease is renewed every third of its length while the search runs; sizing it
+        # to the slowest expected search keeps a single missed renewal harmless
+        self.lease_seconds = settings.search_total_timeout_seconds + settings.search_job_lease_margin_seconds
+        self.heartbeat_interval = self.lease_seconds / 3
+        self.worker_id = f"{socket.gethostname()}:{os.getpid()}"
+
+        self.completed = 0
+        self.failed = 0
+        self.resumed = 0
+
+        self._workers: List[asyncio.Task] = []
+        self._wakeup = asyncio.Event()
+        self._stopping = False
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers) and not self._stopping
+
+    async def start(self):
+        """Start the workers (they pick up unfinished jobs from before a restart first)"""
+        if not self.enabled:
+            logger.info("⏸️ Persistent search jobs disabled (SEARCH_JOBS_ENABLED=false), searching inline")
+            return
+
+        try:
+            # Our own jobs from a previous process on this host can't still be running
+            await db.execute("""
+                UPDATE search_jobs
+                SET status = 'pending', lease_expires_at = NULL
+                WHERE status = 'running' AND worker_id = $1
+            """, self.worker_id)
+
+            unfinished = await db.fetchval("""
+                SELECT COUNT(*) FROM search_jobs
+                WHERE status = 'pending'
+                OR (status = 'running' AND lease_expires_at < NOW())
+            """)
+
+            await db.execute("""
+                DELETE FROM search_jobs
+                WHERE status IN ('done', 'failed')
+                AND finished_at < NOW() - make_interval(days => $1)
+            """, settings.search_job_retention_days)
+        except Exception as e:
+            logger.error(f"❌ Search job table unavailable, searching inline: {e}")
+            return
+
+        if unfinished:
+            logger.warning(f"♻️ Resuming {unfinished} unfinished search job(s)")
+
+        self._stopping = False
+        self._workers = [
+            asyncio.create_task(self._worker(i)) for i in range(self.worker_count)
+        ]
+        logger.info(f"✅ Search job runner started: {self.worker_count} workers ({self.worker_id})")
+
+    async def stop(self, timeout: float = None):
+        """Let running searches finish; anything still running at the timeout goes back to pending"""
+        if not self._workers:
+            return
+
+        self._stopping = True
+        self._wakeup.set()
+
+        done, pending = await asyncio.wait(
+            self._workers,
+            timeout=timeout if timeout is not None else settings.search_job_drain_timeout_seconds
+        )
+        for task in pending:
+            task.cancel()
+        await asyncio.gather(*pending, return_exceptions=True)
+
+        self._workers = []
+        logger.info("Search job runner stopped")
+
+    async def submit(self, user_id: str, doctor_name: str):
+        """
+        Record a search job (the user's quota has already been charged)
+
+        Falls back to searching inline when the runner isn't running or the insert fails.
+
+        Args:
+            user_id: User's phone number
+            doctor_name: Doctor's name
+        """
+        if self.running:
+            try:
+                job_id = await db.fetchval("""
+                    INSERT INTO search_jobs (user_id, doctor_name)
+                    VALUES ($1, $2)
+                    RETURNING id
+                """, user_id, doctor_name)
+                self._wakeup.set()
+                logger.info(f"📝 Search job {job_id} queued: {doctor_name}")
+                return
+            except Exception as e:
+                logger.error(f"❌ Error recording search job, searching inline: {e}")
+
+        from src.whatsapp.handler import message_handler
+        await message_handler._perform_search(user_id, doctor_name)
+
+    async def _worker(self, worker_index: int):
+        """Claim and run jobs until stopped"""
+        while not self._stopping:
+            try:
+                job = await db.fetchrow(self.CLAIM_QUERY, self.worker_id, float(self.lease_seconds))
+            except Exception as e:
+                logger.error(f"❌ Search job worker {worker_index} claim failed: {e}")
+                job = None
+
+            if job is None:
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=self.poll_interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            await self._run_job(job)
+
+    async def _run_job(self, job):
+        """Run one claimed job and record the outcome"""
+        from src.whatsapp.handler import message_handler
+
+        if job["attempts"] > self.max_attempts:
+            # The search kept dying with its worker - tell the user instead of going silent
+            await self._finish(job["id"], "failed", "Too many attempts")
+            self.failed += 1
+            await self._send_failure(job["user_id"])
+            return
+
+        if job["attempts"] > 1:
+            self.resumed += 1
+            logger.info(f"♻️ Resuming search job {job['id']} (attempt {job['attempts']}): {job['doctor_name']}")
+
+        heartbeat = asyncio.create_task(self._heartbeat(job["id"]))
+        try:
+            # _perform_search reports its own errors to the user
+            await message_handler._perform_search(job["user_id"], job["doctor_name"])
+        except asyncio.CancelledError:
+            # Shutdown interrupted the search - hand it to the next worker right away
+            await asyncio.shield(self._release(job["id"]))
+            raise
+        except Exception as e:
+            await self._finish(job["id"], "failed", str(e))
+            self.failed += 1
+            return
+        finally:
+            heartbeat.cancel()
+
+        await self._finish(job["id"], "done")
+        self.completed += 1
+
+    async def _heartbeat(self, job_id: int):
+        """Renew a running job's lease until cancelled"""
+        while True:
+            await asyncio.sleep(self.heartbeat_interval)
+            try:
+                result = await db.execute(self.RENEW_QUERY, job_id, self.worker_id, float(self.lease_seconds))
+                if result == "UPDATE 0":
+                    logger.warning(f"⚠️ Search job {job_id} lease lost (claimed by another worker)")
+                    return
+            except Exception as e:
+                logger.error(f"❌ Error renewing search job {job_id} lease: {e}")
+
+    async def _send_failure(self, user_id: str):
+        """Tell the user their search could not be completed"""
+        from src.whatsapp.outbound import outbound_queue
+        from src.whatsapp.formatter import format_error_message
+
+        try:
+            await outbound_queue.send_message(user_id, format_error_message("general"))
+        except Exception as e:
+            logger.error(f"❌ Error sending search failure to {user_id}: {e}")
+
+    async def _finish(self, job_id: int, status: str, error: str = None):
+        """Mark a job done or failed (unless another worker has taken it over)"""
+        try:
+            await db.execute(self.FINISH_QUERY, job_id, status, error[:1000] if error else None, self.worker_id)
+        except Exception as e:
+            logger.error(f"❌ Error marking search job {job_id} as {status}: {e}")
+
+    async def _release(self, job_id: int):
+        """Put an interrupted job back to pending"""
+        try:
+            await db.execute(self.RELEASE_QUERY, job_id, self.worker_id)
+        except Exception as e:
+            logger.error(f"❌ Error releasing search job {job_id}: {e}")
+
+    async def get_stats(self) -> Dict:
+        """Get job counts by state plus this process's counters"""
+        stats = {
+            "running": self.running,
+            "workers": len(self._workers),
+            "completed": self.completed,
+            "failed": self.failed,
+            "resumed": self.resumed
+        }
+
+        try:
+            rows = await db.fetch("""
+                SELECT status, COUNT(*) AS count
+                FROM search_jobs
+                WHERE status IN ('pending', 'running')
+                GROUP BY status
+            """)
+            stats["jobs"] = {row["status"]: row["count"] for row in rows}
+        except Exception as e:
+            logger.error(f"Error getting search job stats: {e}")
+
+        return stats
+
+
+# Global search job runner instance
+search_job_runner = SearchJobRunner()
@@ -5,6 +5,7 @@ Twilio WhatsApp API client for sending messages
 import httpx
 import logging
 from src.config import settings
+from src.utils.http_client import get_http_client
 from src.whatsapp.models import WhatsAppOutgoingMessage
 
 logger = logging.getLogger(__name__)
@@ -48,19 +49,21 @@ class TwilioWhatsAppClient:
                 "Body": message
             }
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    data=data,
-                    headers=headers
-                )
+            # Reuse the shared keep-alive pool (several sends per search)
+            client = get_http_client("api.twilio.com")
+            response = await client.post(
+                self.base_url,
+                data=data,
+                headers=headers,
+                timeout=30.0
+            )
 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
 
-                logger.info(f"✅ Twilio message sent to {to}")
-                logger.debug(f"Twilio response: {result}")
-                return result
+            logger.info(f"✅ Twilio message sent to {to}")
+            logger.debug(f"Twilio response: {result}")
+            return result
 
         except httpx.HTTPStatusError as e:
             logger.error(f"❌ Twilio API error: {e.response.status_code} - {e.response.text}")
@@ -100,18 +103,19 @@ class TwilioWhatsAppClient:
             if caption:
                 data["Body"] = caption
 
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.post(
-                    self.base_url,
-                    data=data,
-                    headers=headers
-                )
+            client = get_http_client("api.twilio.com")
+            response = await client.post(
+                self.base_url,
+                data=data,
+                headers=headers,
+                timeout=30.0
+            )
 
-                response.raise_for_status()
-                result = response.json()
+            response.raise_for_status()
+            result = response.json()
 
-                logger.info(f"✅ Twilio media message sent to {to}")
-                return result
+            logger.info(f"✅ Twilio media message sent to {to}")
+            return result
 
         except Exception as e:
             logger.error(f"❌ Failed to send Twilio media message: {e}")
@@ -0,0 +1,197 @@
+"""
+ChatGPT extraction benchmark
+Compares the single-call structured mode, the two-step (web_search + gpt-4o-mini parse) mode
+and the per-site mode (concurrent site-scoped searches) of ChatGPTSearchClient on latency,
+token use and reviews extracted
+
+Usage:
+    # Run both modes live and save every API response (needs OPENAI_API_KEY)
+    python tests/benchmark_chatgpt_extraction.py --record "Dr Nicholas Lim" "Dr Tan Wei Ming"
+
+    # Replay the saved responses through the real client code (no API calls)
+    python tests/benchmark_chatgpt_extraction.py
+
+Replays sleep for each call's recorded latency (scaled by --speed), so the
+wall time reflects the round trips of each mode (per-site calls overlap).
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from types import SimpleNamespace
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+RECORDINGS_PATH = os.path.join(os.path.dirname(__file__), "data", "chatgpt_recordings.json")
+MODES = {
+    "structured": {"structured_output": True},
+    "two_step": {"structured_output": False},
+    "per_site": {"structured_output": True, "per_site": True},
+}
+
+
+def to_namespace(value):
+    """Recorded JSON -> attribute access like the OpenAI SDK objects"""
+    if isinstance(value, dict):
+        return SimpleNamespace(**{key: to_namespace(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return [to_namespace(item) for item in value]
+    return value
+
+
+def call_usage(call: Dict) -> Dict:
+    """Normalize Responses / Chat Completions usage to input, output and reasoning tokens"""
+    usage = call["response"].get("usage") or {}
+    details = usage.get("output_tokens_details") or usage.get("completion_tokens_details") or {}
+    return {
+        "input": usage.get("input_tokens", usage.get("prompt_tokens", 0)) or 0,
+        "output": usage.get("output_tokens", usage.get("completion_tokens", 0)) or 0,
+        "reasoning": details.get("reasoning_tokens", 0) or 0
+    }
+
+
+class _Endpoint:
+    """Stands in for client.responses / client.chat.completions"""
+
+    def __init__(self, handler, kind: str):
+        self._handler = handler
+        self._kind = kind
+
+    async def create(self, **params):
+        return await self._handler(self._kind, params)
+
+
+class RecordingClient:
+    """Wraps AsyncOpenAI and records each call's response and latency"""
+
+    def __init__(self, client):
+        self._client = client
+        self.calls: List[Dict] = []
+        self.responses = _Endpoint(self._call, "responses")
+        self.chat = SimpleNamespace(completions=_Endpoint(self._call, "chat"))
+
+    async def _call(self, kind: str, params: Dict):
+        endpoint = self._client.responses if kind == "responses" else self._client.chat.completions
+        start = time.perf_counter()
+        response = await endpoint.create(**params)
+        self.calls.append({
+            "kind": kind,
+            "latency_ms": int((time.perf_counter() - start) * 1000),
+            "response": response.model_dump(mode="json")
+        })
+        return response
+
+
+class ReplayClient:
+    """Serves recorded responses in order, after their recorded latency"""
+
+    def __init__(self, calls: List[Dict], speed: float):
+        self._calls = list(calls)
+        self._speed = speed
+        self.responses = _Endpoint(self._call, "responses")
+        self.chat = SimpleNamespace(completions=_Endpoint(self._call, "chat"))
+
+    async def _call(self, kind: str, params: Dict):
+        if not self._calls:
+            raise RuntimeError(f"No recorded {kind} response left")
+        call = self._calls.pop(0)
+        if call["kind"] != kind:
+            raise RuntimeError(f"Recorded {call['kind']} call, client made a {kind} call")
+        await asyncio.sleep(call["latency_ms"] / 1000 * self._speed)
+        return to_namespace(call["response"])
+
+
+async def record(doctor_names: List[str], location: str):
+    """Run both modes live and save the responses"""
+    from src.search.chatgpt_search import ChatGPTSearchClient
+
+    recordings = []
+    for doctor_name in doctor_names:
+        for mode, options in MODES.items():
+            client = ChatGPTSearchClient(use_response_cache=False, **options)
+            if not client.enabled:
+                print("❌ OPENAI_API_KEY not set")
+                return
+
+            recorder = RecordingClient(client.client)
+            client.client = recorder
+            result = await client.search_facebook_and_forums(doctor_name, location)
+            print(f"🎙️ {doctor_name} [{mode}]: {len(recorder.calls)} calls, {result.get('total_count', 0)} reviews")
+
+            recordings.append({
+                "doctor_name": doctor_name,
+                "location": location,
+                "mode": mode,
+                "calls": recorder.calls
+            })
+
+    os.makedirs(os.path.dirname(RECORDINGS_PATH), exist_ok=True)
+    with open(RECORDINGS_PATH, "w", encoding="utf-8") as f:
+        json.dump(recordings, f, ensure_ascii=False, indent=2)
+    print(f"💾 Saved {len(recordings)} recordings to {RECORDINGS_PATH}")
+
+
+async def replay(speed: float):
+    """Replay the recordings through ChatGPTSearchClient and compare the modes"""
+    from src.search.chatgpt_search import ChatGPTSearchClient
+
+    if not os.path.exists(RECORDINGS_PATH):
+        print(f"No recordings at {RECORDINGS_PATH} - run with --record first")
+        return
+
+    with open(RECORDINGS_PATH, encoding="utf-8") as f:
+        recordings = json.load(f)
+
+    totals = {mode: {"runs": 0, "calls": 0, "wall_ms": 0, "input": 0, "output": 0, "reasoning": 0, "reviews": 0}
+              for mode in MODES}
+
+    for recording in recordings:
+        mode = recording["mode"]
+        client = ChatGPTSearchClient(api_key="replay", use_response_cache=False, **MODES[mode])
+        client.client = ReplayClient(recording["calls"], speed)
+
+        start = time.perf_counter()
+        result = await client.search_facebook_and_forums(recording["doctor_name"], recording["location"])
+        wall_ms = (time.perf_counter() - start) * 1000 / speed if speed else 0
+
+        total = totals[mode]
+        total["runs"] += 1
+        total["calls"] += len(recording["calls"])
+        total["wall_ms"] += wall_ms
+        total["reviews"] += result.get("total_count", 0)
+        for call in recording["calls"]:
+            for key, value in call_usage(call).items():
+                total[key] += value
+
+        print(f"  {recording['doctor_name']:<30} {mode:<10} {wall_ms:>8.0f} ms  {result.get('total_count', 0)} reviews")
+
+    print("\n📊 Per search (average)")
+    print(f"{'mode':<12}{'calls':>7}{'latency ms':>12}{'input tok':>11}{'output tok':>12}{'reasoning':>11}{'reviews':>9}")
+    for mode, total in totals.items():
+        runs = total["runs"] or 1
+        print(
+            f"{mode:<12}{total['calls'] / runs:>7.1f}{total['wall_ms'] / runs:>12.0f}"
+            f"{total['input'] / runs:>11.0f}{total['output'] / runs:>12.0f}"
+            f"{total['reasoning'] / runs:>11.0f}{total['reviews'] / runs:>9.1f}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--record", nargs="+", metavar="DOCTOR", help="Record live responses for these doctors")
+    parser.add_argument("--location", default="Malaysia")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay latency multiplier (0 = no delays)")
+    args = parser.parse_args()
+
+    if args.record:
+        asyncio.run(record(args.record, args.location))
+    else:
+        asyncio.run(replay(args.speed))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Sentiment engine benchmark
+Compares accuracy and latency of the local lexicon engine and the OpenAI path
+on the labelled samples in tests/data/sentiment_samples.json
+
+Usage:
+    python tests/benchmark_sentiment.py
+
+The OpenAI engine is only run when OPENAI_API_KEY is set to a real key
+(it makes one API call per 10 samples).
+"""
+
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "sentiment_samples.json")
+
+
+async def run_engine(engine, samples: List[Dict], repeat: int = 1) -> Dict:
+    """Classify the samples and measure accuracy and latency"""
+    texts = [sample["text"] for sample in samples]
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        labels = await engine.classify(texts)
+    elapsed = (time.perf_counter() - start) / repeat
+
+    by_language: Dict[str, List[int]] = {}
+    for sample, label in zip(samples, labels):
+        counts = by_language.setdefault(sample["lang"], [0, 0])
+        counts[0] += label == sample["sentiment"]
+        counts[1] += 1
+
+    correct = sum(counts[0] for counts in by_language.values())
+    return {
+        "engine": engine.name,
+        "accuracy": correct / len(samples),
+        "by_language": {lang: f"{c}/{t}" for lang, (c, t) in by_language.items()},
+        "failed": sum(1 for label in labels if label is None),
+        "batch_ms": elapsed * 1000,
+        "per_review_ms": elapsed * 1000 / len(samples)
+    }
+
+
+def print_result(result: Dict):
+    print(f"\n{result['engine']}")
+    print(f"  accuracy:      {result['accuracy']:.1%}  {result['by_language']}")
+    print(f"  failed:        {result['failed']}")
+    print(f"  batch:         {result['batch_ms']:.2f} ms")
+    print(f"  per review:    {result['per_review_ms']:.4f} ms")
+
+
+async def main():
+    from src.analysis.lexicon import LexiconSentimentEngine
+
+    with open(SAMPLES_PATH, encoding="utf-8") as f:
+        samples = json.load(f)
+
+    print(f"📊 Sentiment benchmark: {len(samples)} labelled reviews")
+
+    print_result(await run_engine(LexiconSentimentEngine(), samples, repeat=100))
+
+    api_key = os.getenv("OPENAI_API_KEY", "")
+    if not api_key or api_key.startswith("your_openai_api_key"):
+        print("\n⏭️  OPENAI_API_KEY not set, skipping OpenAI engine")
+        return
+
+    from src.analysis.sentiment import OpenAISentimentEngine
+
+    engine = OpenAISentimentEngine(
+        api_key=api_key,
+        model=os.getenv("OPENAI_MODEL", "gpt-4-turbo"),
+        concurrency=int(os.getenv("SENTIMENT_CONCURRENCY", "4"))
+    )
+    print_result(await run_engine(engine, samples))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,188 @@
+"""
+ChatGPT structured extraction tests (fake Responses API client, no network)
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+from openai import BadRequestError
+
+from src.search.chatgpt_search import ChatGPTSearchClient, SEARCH_SITES
+
+
+def message_response(text: str):
+    return SimpleNamespace(output=[
+        SimpleNamespace(type="web_search_call", action=SimpleNamespace(query="dr lim reviews")),
+        SimpleNamespace(type="message", content=[SimpleNamespace(text=text, annotations=[])])
+    ])
+
+
+class FakeOpenAI:
+    def __init__(self, web_search_text: str, parsed_reviews=None):
+        self.calls = []
+        self._web_search_text = web_search_text
+        self._parsed_reviews = parsed_reviews or []
+        self.responses = SimpleNamespace(create=self._responses_create)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self._chat_create))
+
+    async def _responses_create(self, **params):
+        self.calls.append(("responses", params))
+        return message_response(self._web_search_text)
+
+    async def _chat_create(self, **params):
+        self.calls.append(("chat", params))
+        content = json.dumps({"reviews": self._parsed_reviews})
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+
+def make_client(fake: FakeOpenAI, structured: bool) -> ChatGPTSearchClient:
+    client = ChatGPTSearchClient(api_key="test", structured_output=structured, use_response_cache=False)
+    client.client = fake
+    return client
+
+
+def test_structured_mode_uses_one_call():
+    payload = {
+        "summary": "Patients describe Dr Lim as patient and thorough.",
+        "reviews": [{
+            "author_name": "Mei", "review_date": "2024-05-01", "text": "Very patient with my son",
+            "rating": 5, "source": "Lowyat Forum", "url": "https://forum.lowyat.net/topic/1"
+        }]
+    }
+    fake = FakeOpenAI(json.dumps(payload))
+
+    result = asyncio.run(make_client(fake, structured=True).search_facebook_and_forums("Dr Lim"))
+
+    assert [kind for kind, _ in fake.calls] == ["responses"]
+    assert fake.calls[0][1]["text"]["format"]["type"] == "json_schema"
+    assert result["total_count"] == 1
+    assert result["reviews"][0]["url"] == "https://forum.lowyat.net/topic/1"
+    assert result["citations"] == [{"url": "https://forum.lowyat.net/topic/1", "title": "Lowyat Forum"}]
+
+
+def test_unparseable_structured_output_falls_back_to_parse_step():
+    prose = "Patients on Lowyat say Dr Lim is very patient and explains clearly. " * 3
+    parsed = [{"author_name": "Anonymous", "text": "Very patient", "url": "https://forum.lowyat.net/topic/1"}]
+    fake = FakeOpenAI(prose, parsed_reviews=parsed)
+
+    result = asyncio.run(make_client(fake, structured=True).search_facebook_and_forums("Dr Lim"))
+
+    # No second web search - the prose goes straight to the gpt-4o-mini parser
+    assert [kind for kind, _ in fake.calls] == ["responses", "chat"]
+    assert result["total_count"] == 1
+
+
+def test_two_step_mode_keeps_old_path():
+    prose = "Patients on Lowyat say Dr Lim is very patient and explains clearly. " * 3
+    fake = FakeOpenAI(prose, parsed_reviews=[{"text": "Very patient"}])
+
+    result = asyncio.run(make_client(fake, structured=False).search_facebook_and_forums("Dr Lim"))
+
+    assert [kind for kind, _ in fake.calls] == ["responses", "chat"]
+    assert "text" not in fake.calls[0][1]
+    assert result["summary"] == prose
+
+
+def test_per_site_search_runs_concurrently_and_dedupes():
+    shared = {"author_name": "Mei", "review_date": "", "text": "Very  patient with my son", "rating": 5,
+              "source": "Lowyat Forum", "url": "https://forum.lowyat.net/topic/1"}
+
+    class PerSiteOpenAI(FakeOpenAI):
+        def __init__(self):
+            super().__init__("")
+            self.in_flight = 0
+            self.max_in_flight = 0
+
+        async def _responses_create(self, **params):
+            self.calls.append(("responses", params))
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+            await asyncio.sleep(0.01)
+            self.in_flight -= 1
+
+            site = params["tools"][0]["filters"]["allowed_domains"][0]
+            if site == "babycenter.com":
+                raise TimeoutError()
+            reviews = [dict(shared, text="very patient with my SON")] if site != "forum.lowyat.net" else [
+                shared, dict(shared, text="Long queue but worth it")
+            ]
+            return message_response(json.dumps({"summary": f"{site} summary", "reviews": reviews}))
+
+    fake = PerSiteOpenAI()
+    client = ChatGPTSearchClient(api_key="test", structured_output=True, use_response_cache=False, per_site=True)
+    client.client = fake
+
+    result = asyncio.run(client.search_facebook_and_forums("Dr Lim"))
+
+    assert len(fake.calls) == len(SEARCH_SITES)
+    assert fake.max_in_flight == len(SEARCH_SITES)
+    assert all(params["max_tool_calls"] == client.site_max_searches for _, params in fake.calls)
+    # The same review found on three sites is kept once; the failed site is skipped
+    assert [review["text"] for review in result["reviews"]] == ["Very  patient with my son", "Long queue but worth it"]
+    assert result["citations"] == [{"url": "https://forum.lowyat.net/topic/1", "title": "Lowyat Forum"}]
+
+
+def bad_request(message: str, param: str = None) -> BadRequestError:
+    request = httpx.Request("POST", "https://api.openai.com/v1/responses")
+    return BadRequestError(message, response=httpx.Response(400, request=request),
+                           body={"message": message, "param": param})
+
+
+class RejectingOpenAI(FakeOpenAI):
+    """Rejects structured web_search requests with the given error"""
+
+    def __init__(self, error: BadRequestError):
+        prose = "Patients on Lowyat say Dr Lim is very patient and explains clearly. " * 3
+        super().__init__(prose, parsed_reviews=[{"text": "Very patient"}])
+        self.error = error
+
+    async def _responses_create(self, **params):
+        self.calls.append(("responses", params))
+        if "text" in params:
+            raise self.error
+        return message_response(self._web_search_text)
+
+
+def test_schema_rejection_disables_structured_output():
+    fake = RejectingOpenAI(bad_request("Invalid schema for response_format 'doctor_reviews'", "text.format.schema"))
+    client = make_client(fake, structured=True)
+
+    result = asyncio.run(client.search_facebook_and_forums("Dr Lim"))
+
+    assert result["total_count"] == 1
+    assert client.structured_output is False
+
+
+def test_other_bad_requests_only_fall_back_for_that_call():
+    fake = RejectingOpenAI(bad_request("Input too long", "input"))
+    client = make_client(fake, structured=True)
+
+    result = asyncio.run(client.search_facebook_and_forums("Dr Lim"))
+
+    assert [kind for kind, _ in fake.calls] == ["responses", "responses", "chat"]
+    assert result["total_count"] == 1
+    assert client.structured_output is True
+
+
+def test_per_site_fallback_drops_site_filters():
+    class NoFiltersOpenAI(FakeOpenAI):
+        async def _responses_create(self, **params):
+            self.calls.append(("responses", params))
+            if "max_tool_calls" in params or "filters" in params["tools"][0]:
+                raise bad_request("Unknown parameter: 'tools[0].filters'", "tools[0].filters")
+            return message_response(self._web_search_text)
+
+    prose = "Patients on Lowyat say Dr Lim is very patient and explains clearly. " * 3
+    fake = NoFiltersOpenAI(prose, parsed_reviews=[{"text": "Very patient"}])
+    client = ChatGPTSearchClient(api_key="test", structured_output=True, use_response_cache=False, per_site=True)
+    client.client = fake
+
+    result = asyncio.run(client.search_facebook_and_forums("Dr Lim"))
+
+    # The fallback is one combined two-step search without the per-site parameters
+    assert result["total_count"] == 1
+    fallback = [params for kind, params in fake.calls if kind == "responses"][-1]
+    assert "max_tool_calls" not in fallback and fallback["tools"] == [{"type": "web_search"}]
+    assert client.per_site is False and client.structured_output is True
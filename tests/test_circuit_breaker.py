@@ -0,0 +1,90 @@
+"""
+Tests for the per-source circuit breaker and adaptive timeouts
+"""
+
+from src.search import circuit_breaker
+from src.search.circuit_breaker import CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def _breaker(monkeypatch, **kwargs):
+    clock = FakeClock()
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", clock)
+    options = dict(max_timeout=60.0, min_requests=4, open_seconds=30.0, min_timeout=2.0)
+    options.update(kwargs)
+    return CircuitBreaker("Test", **options), clock
+
+
+def test_opens_after_failure_rate_and_skips_source(monkeypatch):
+    breaker, _ = _breaker(monkeypatch)
+
+    breaker.record_success(1.0)
+    breaker.record_success(1.0)
+    breaker.record_failure(1.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+
+    breaker.record_failure(1.0)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow_request() is False
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_half_open_probe_closes_or_reopens(monkeypatch):
+    breaker, clock = _breaker(monkeypatch)
+    for _ in range(4):
+        breaker.record_failure(1.0)
+
+    clock.now += 31
+    assert breaker.allow_request() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    # Only one probe at a time, with the full timeout
+    assert breaker.allow_request() is False
+    assert breaker.current_timeout() == 60.0
+
+    breaker.record_failure(1.0)
+    assert breaker.state == CircuitBreaker.OPEN
+
+    clock.now += 31
+    assert breaker.allow_request() is True
+    breaker.record_success(1.0)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow_request() is True
+
+
+def test_lost_probe_is_replaced_after_max_timeout(monkeypatch):
+    breaker, clock = _breaker(monkeypatch)
+    for _ in range(4):
+        breaker.record_failure(1.0)
+
+    clock.now += 31
+    assert breaker.allow_request() is True
+    # The probe was cancelled and never reported back
+    clock.now += 61
+    assert breaker.allow_request() is True
+
+
+def test_timeout_follows_p95_within_bounds(monkeypatch):
+    breaker, _ = _breaker(monkeypatch, timeout_multiplier=1.5)
+    assert breaker.current_timeout() == 60.0  # Not enough samples yet
+
+    for latency in [4.0, 5.0, 6.0, 8.0]:
+        breaker.record_success(latency)
+    assert breaker.p95_latency() == 8.0
+    assert breaker.current_timeout() == 12.0
+
+    fast, _ = _breaker(monkeypatch)
+    for _ in range(4):
+        fast.record_success(0.1)
+    assert fast.current_timeout() == 2.0
+
+    # Timeouts count as latency samples so the timeout can grow back
+    for _ in range(4):
+        breaker.record_failure(50.0, timed_out=True)
+    assert breaker.current_timeout() == 60.0
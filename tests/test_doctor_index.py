@@ -0,0 +1,125 @@
+"""
+Tests for fuzzy doctor name resolution
+"""
+
+import asyncio
+
+from src.cache.doctor_index import DoctorNameIndex, name_similarity, normalize_name
+
+
+def _index():
+    index = DoctorNameIndex(threshold=0.8)
+    for doctor_id, name in [
+        ("lim", "Nicholas Lim"),
+        ("lin", "Nicholas Lin"),
+        ("tan", "Tan Wei Ming"),
+        ("ali", "Dr. Mohd Ali bin Ahmad"),
+        ("li", "李明"),
+    ]:
+        index.add(doctor_id, name)
+    return index
+
+
+def test_normalize_name():
+    assert normalize_name("Dr. Mohd Ali bin Ahmad") == ["muhammad", "ali", "ahmad"]
+    assert normalize_name("Dato' Dr Tan  Wei-Ming") == ["tan", "wei", "ming"]
+
+
+def test_resolves_only_identical_normalized_names():
+    index = _index()
+
+    for query in ["nicholas lim", "Dr Nicholas Lim", "Lim Nicholas", "Dr. Nicholas  LIM"]:
+        assert index.resolve(query)["doctor_id"] == "lim", query
+
+    # Alias spellings normalize to the same tokens
+    assert index.resolve("Muhammad Ali Ahmad")["doctor_id"] == "ali"
+    assert index.resolve("Dr Mohamed Ali") is None  # missing token: not identical
+    assert index.resolve("李明")["doctor_id"] == "li"
+
+
+def test_fuzzy_variants_are_only_suggested():
+    index = _index()
+
+    for query in ["Dr. Nick Lim", "Nicholaas Lim"]:
+        assert index.resolve(query) is None, query
+        assert index.suggest(query)["doctor_id"] == "lim", query
+
+    # One trailing given name missing
+    assert index.resolve("Tan Wei") is None
+    assert index.suggest("Tan Wei")["doctor_id"] == "tan"
+
+
+def test_does_not_merge_different_doctors():
+    index = _index()
+
+    # Similar-sounding surnames and different given names stay separate
+    assert index.resolve("Nicholas Lin")["doctor_id"] == "lin"
+    assert index.resolve("Nicole Lim") is None
+    assert index.suggest("Nicole Lim") is None
+    # A surname alone is not enough
+    assert index.resolve("Dr Lim") is None
+    assert index.suggest("Dr Lim") is None
+
+
+def test_dropped_tokens_are_not_contained():
+    # Sharing two tokens with a longer name is not the same doctor unless the
+    # longer name only adds a trailing given name
+    for query, candidate in [
+        ("Wei Ming", "Nicholas Lim Wei Ming"),
+        ("Lee Wei", "Lee Chong Wei"),
+        ("Tan Ling", "Tan Mei Ling"),
+    ]:
+        assert name_similarity(normalize_name(query), normalize_name(candidate)) < 0.9, query
+
+        index = DoctorNameIndex(threshold=0.8)
+        index.add("known", candidate)
+        assert index.resolve(query) is None, query
+
+    assert name_similarity(["tan", "wei"], ["tan", "wei", "ming"]) >= 0.9
+    assert name_similarity(["wei", "ming"], ["nicholas", "lim", "wei", "ming"]) < 0.8
+
+
+def test_ambiguous_match_is_not_resolved():
+    index = DoctorNameIndex(threshold=0.8)
+    index.add("a", "Lim Wei Ming")
+    index.add("b", "Lim Wei Jie")
+
+    assert index.resolve("Lim Wei") is None
+    assert index.suggest("Lim Wei") is None
+
+    # Two doctors with the same name are not merged either
+    index.add("c", "Dr. Lim Wei Ming")
+    assert index.resolve("Lim Wei Ming") is None
+
+
+def test_incremental_updates():
+    index = _index()
+    index.add("lim", "Nicholas Lim")  # Re-adding is a no-op
+    assert len(index) == 5
+
+    index.remove("lim")
+    assert index.resolve("Nicholas Lim") is None
+    assert index.contains("lim") is False
+
+
+def test_cache_manager_uses_known_doctor_id():
+    from src.cache.manager import CacheManager
+
+    manager = CacheManager()
+    known_id = manager.generate_doctor_id("Nicholas Lim", location="Malaysia")
+    manager.doctor_index.add(known_id, "Nicholas Lim")
+    manager.doctor_index._last_refresh = float("inf")  # Skip the database refresh
+
+    async def run():
+        return (
+            await manager.resolve_doctor_id("Dr Lim Nicholas", location="Malaysia"),
+            await manager.resolve_doctor_id("Dr. Nick Lim", location="Malaysia"),
+            await manager.resolve_doctor_id("Someone Else", location="Malaysia"),
+        )
+
+    resolved, suggested, unknown = asyncio.run(run())
+
+    assert resolved == known_id
+    # A fuzzy match keeps its own cache entry
+    assert suggested == manager.generate_doctor_id("Dr. Nick Lim", location="Malaysia")
+    assert unknown == manager.generate_doctor_id("Someone Else", location="Malaysia")
@@ -0,0 +1,49 @@
+"""
+Doctor lookup tests (fake database, no pg_trgm)
+"""
+
+import asyncio
+
+from src.cache import doctor_lookup as doctor_lookup_module
+from src.cache.doctor_index import normalize_name, strip_titles, trigram_similarity
+from src.cache.doctor_lookup import DoctorLookup
+
+
+class FakeLookupDB:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = []
+
+    async def fetch(self, query, *args):
+        self.queries.append(args)
+        return self.rows
+
+
+def test_sql_search_keeps_the_stored_spelling(monkeypatch):
+    fake_db = FakeLookupDB([{
+        "doctor_id": "ali", "name": "Dr. Mohd Ali bin Ahmad", "specialty": None, "hospital_name": None,
+        "location": None, "total_reviews": 3, "score": 0.91234
+    }])
+    monkeypatch.setattr(doctor_lookup_module, "db", fake_db)
+
+    results = asyncio.run(DoctorLookup().search("Dr. Mohd Ali bin Ahmad", limit=5))
+
+    assert fake_db.queries == [("mohd ali bin ahmad", 5, None)]
+    assert results[0]["doctor_id"] == "ali" and results[0]["score"] == 0.912
+
+
+def test_stripped_query_matches_raw_names_better_than_normalized():
+    stored = "Dr. Mohd Ali bin Ahmad".lower()
+    query = "Dr Mohd Ali bin Ahmad"
+
+    # pg_trgm compares against doctors.name as stored, so the alias-rewritten form scores lower
+    assert trigram_similarity(strip_titles(query), stored) > trigram_similarity(" ".join(normalize_name(query)), stored)
+    assert trigram_similarity(strip_titles(query), stored) >= 0.8
+
+
+def test_title_only_query_returns_nothing(monkeypatch):
+    fake_db = FakeLookupDB([])
+    monkeypatch.setattr(doctor_lookup_module, "db", fake_db)
+
+    assert asyncio.run(DoctorLookup().search("Dr.")) == []
+    assert fake_db.queries == []
@@ -0,0 +1,47 @@
+"""
+Doctor statistics tests
+"""
+
+from decimal import Decimal
+
+from src.cache.doctor_stats import summarize, with_review_deltas
+from src.whatsapp.formatter import format_doctor_summary
+
+
+def test_deltas_wrap_change_in_one_statement():
+    added = with_review_deltas(
+        "INSERT INTO doctor_reviews (doctor_id) VALUES ($1) RETURNING doctor_id, sentiment, rating",
+        added=True,
+        select="SELECT COUNT(*) FROM changed"
+    )
+    removed = with_review_deltas(
+        "DELETE FROM doctor_reviews WHERE doctor_id = $1 RETURNING doctor_id, sentiment, rating",
+        added=False,
+        select="SELECT COUNT(*) FROM changed"
+    )
+
+    assert added.startswith("WITH changed AS (INSERT")
+    assert "COALESCE(d.total_reviews, 0) + c.total" in added
+    assert "COALESCE(d.total_reviews, 0) - c.total" in removed
+    assert removed.rstrip().endswith("SELECT COUNT(*) FROM changed")
+
+
+def test_summary_line():
+    summary = summarize({
+        "doctor_id": "abc", "name": "Dr Lim", "total_reviews": 23, "positive_reviews": 16,
+        "negative_reviews": 2, "neutral_reviews": 2, "average_rating": Decimal("4.6"), "rated_reviews": 10
+    })
+
+    assert summary["positive_pct"] == 80
+    assert format_doctor_summary(summary) == "⭐ 4.6 from 23 reviews · 80% positive"
+
+
+def test_summary_line_before_sentiment_and_ratings():
+    summary = summarize({
+        "doctor_id": "abc", "name": "Dr Lim", "total_reviews": 5, "positive_reviews": None,
+        "negative_reviews": 0, "neutral_reviews": 0, "average_rating": None, "rated_reviews": 0
+    })
+
+    assert summary["positive_pct"] is None
+    assert format_doctor_summary(summary) == "📊 5 reviews"
+    assert format_doctor_summary(summarize({"total_reviews": 0})) == ""
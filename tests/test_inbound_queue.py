@@ -0,0 +1,86 @@
+"""
+Inbound job queue tests (fake message handler, no Twilio or database)
+"""
+
+import asyncio
+
+from src.whatsapp.handler import message_handler
+from src.whatsapp.inbound import InboundJobQueue
+
+
+def make_queue(monkeypatch, workers=1, max_size=100, max_per_user=10):
+    """Queue with a fake handler; returns (queue, processed, per-user overlaps)"""
+    queue = InboundJobQueue()
+    queue.worker_count = workers
+    queue.max_size = max_size
+    queue.max_per_user = max_per_user
+
+    processed = []
+    running = {}
+    overlaps = []
+
+    async def process_message(from_number, message_text):
+        running[from_number] = running.get(from_number, 0) + 1
+        if running[from_number] > 1:
+            overlaps.append(from_number)
+        await asyncio.sleep(0.01)
+        processed.append((from_number, message_text))
+        running[from_number] -= 1
+
+    monkeypatch.setattr(message_handler, "process_message", process_message)
+    return queue, processed, overlaps
+
+
+def test_users_are_served_round_robin(monkeypatch):
+    queue, processed, _ = make_queue(monkeypatch, workers=1)
+
+    async def run():
+        # A chatty user queues first, then two others
+        for i in range(3):
+            await queue.submit("chatty", f"c{i}")
+        await queue.submit("bob", "b0")
+        await queue.submit("eve", "e0")
+        await queue.start()
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert processed == [("chatty", "c0"), ("bob", "b0"), ("eve", "e0"), ("chatty", "c1"), ("chatty", "c2")]
+
+
+def test_one_job_per_user_at_a_time_in_order(monkeypatch):
+    queue, processed, overlaps = make_queue(monkeypatch, workers=4)
+
+    async def run():
+        await queue.start()
+        for i in range(4):
+            await queue.submit("alice", f"a{i}")
+            await queue.submit("bob", f"b{i}")
+        await queue.stop()
+
+    asyncio.run(run())
+
+    assert overlaps == []
+    assert [text for user, text in processed if user == "alice"] == ["a0", "a1", "a2", "a3"]
+    assert [text for user, text in processed if user == "bob"] == ["b0", "b1", "b2", "b3"]
+
+
+def test_full_queue_rejects_with_busy_reply(monkeypatch, sent_messages):
+    queue, processed, _ = make_queue(monkeypatch, max_size=3, max_per_user=2)
+
+    async def run():
+        results = [
+            await queue.submit("alice", "a0"),
+            await queue.submit("alice", "a1"),
+            await queue.submit("alice", "a2"),  # Per-user limit
+            await queue.submit("bob", "b0"),
+            await queue.submit("eve", "e0"),  # Queue full
+        ]
+        await queue.start()
+        await queue.stop()
+        return results
+
+    assert asyncio.run(run()) == [True, True, False, True, False]
+    assert [to for to, _ in sent_messages] == ["alice", "eve"]
+    assert len(processed) == 3
+    assert queue.get_stats()["rejected"] == 2
@@ -0,0 +1,90 @@
+"""
+LLM response cache tests (in-memory stand-in for the llm_response_cache table)
+"""
+
+import asyncio
+import json
+
+from src.search import llm_cache as llm_cache_module
+from src.search.llm_cache import LLMResponseCache
+
+
+class FakeDB:
+    def __init__(self):
+        self.rows = {}
+
+    async def fetchval(self, query, *args):
+        if "RETURNING response" in query:
+            row = self.rows.get(args[0])
+            return row["response"] if row else None
+        return 0
+
+    async def execute(self, query, key, kind, model, payload, size, ttl):
+        self.rows[key] = {"response": payload, "size": size, "ttl": ttl}
+
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+
+    def model_dump(self, mode="json"):
+        return {"output": [{"type": "message", "content": [{"text": self.text}]}], "usage": {"input_tokens": 10}}
+
+
+def test_identical_requests_hit_cache(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(llm_cache_module, "db", fake_db)
+    cache = LLMResponseCache()
+    calls = []
+
+    async def create(**params):
+        calls.append(params)
+        return FakeResponse("hello")
+
+    params = {"model": "gpt-5-mini", "tools": [{"type": "web_search"}], "input": "Dr Lim"}
+    first = asyncio.run(cache.create("responses", create, **params))
+    second = asyncio.run(cache.create("responses", create, **dict(reversed(list(params.items())))))
+
+    assert len(calls) == 1
+    assert first.text == "hello"
+    assert second.from_cache is True
+    assert second.output[0].content[0].text == "hello"
+    assert cache.hits == 1 and cache.misses == 1
+    # web_search responses use the shorter TTL
+    assert list(fake_db.rows.values())[0]["ttl"] == cache.search_ttl_hours * 3600
+
+
+def test_key_depends_on_every_parameter():
+    base = {"model": "gpt-4o-mini", "messages": [{"role": "user", "content": "a"}]}
+
+    assert LLMResponseCache.make_key("chat", base) == LLMResponseCache.make_key("chat", json.loads(json.dumps(base)))
+    assert LLMResponseCache.make_key("chat", base) != LLMResponseCache.make_key("chat", {**base, "model": "gpt-4o"})
+    assert LLMResponseCache.make_key("chat", base) != LLMResponseCache.make_key("responses", base)
+
+
+def test_oversized_responses_are_not_stored(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(llm_cache_module, "db", fake_db)
+    cache = LLMResponseCache()
+    cache.max_entry_bytes = 10
+
+    async def create(**params):
+        return FakeResponse("x" * 100)
+
+    asyncio.run(cache.create("chat", create, model="gpt-4o-mini", messages=[]))
+
+    assert fake_db.rows == {}
+
+
+def test_size_is_recorded_in_utf8_bytes(monkeypatch):
+    fake_db = FakeDB()
+    monkeypatch.setattr(llm_cache_module, "db", fake_db)
+    cache = LLMResponseCache()
+
+    async def create(**params):
+        return FakeResponse("医生很有耐心")
+
+    asyncio.run(cache.create("chat", create, model="gpt-4o-mini", messages=[]))
+
+    (row,) = fake_db.rows.values()
+    assert row["size"] == len(row["response"].encode("utf-8")) > len(row["response"])
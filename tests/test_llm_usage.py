@@ -0,0 +1,81 @@
+"""
+OpenAI usage accounting tests
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from src.utils.llm_usage import estimate_cost_usd, record_llm_call, track_llm_usage
+
+
+def responses_api_response(input_tokens, output_tokens, reasoning_tokens, web_searches):
+    return SimpleNamespace(
+        output=[SimpleNamespace(type="web_search_call")] * web_searches + [SimpleNamespace(type="message")],
+        usage=SimpleNamespace(
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            output_tokens_details=SimpleNamespace(reasoning_tokens=reasoning_tokens)
+        )
+    )
+
+
+def chat_response(prompt_tokens, completion_tokens):
+    return SimpleNamespace(
+        choices=[],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens,
+                              completion_tokens_details=None)
+    )
+
+
+def test_usage_from_both_apis_is_summed_and_priced():
+    with track_llm_usage() as usage:
+        record_llm_call("gpt-5-mini", responses_api_response(10_000, 4_000, 3_000, 2), 40.0)
+        record_llm_call("gpt-4o-mini-2024-07-18", chat_response(2_000, 1_000), 2.5)
+
+    assert usage.calls == 2
+    assert usage.input_tokens == 12_000
+    assert usage.output_tokens == 5_000
+    assert usage.reasoning_tokens == 3_000
+    assert usage.web_search_calls == 2
+    assert usage.wall_ms == 42_500
+    expected = estimate_cost_usd("gpt-5-mini", 10_000, 4_000, 2) + estimate_cost_usd("gpt-4o-mini", 2_000, 1_000)
+    assert abs(usage.cost_usd - expected) < 1e-9
+    assert abs(expected - (0.0025 + 0.008 + 0.02 + 0.0003 + 0.0006)) < 1e-9
+
+
+def test_cached_and_failed_calls_cost_nothing():
+    cached = responses_api_response(10_000, 4_000, 0, 1)
+    cached.from_cache = True
+
+    with track_llm_usage() as usage:
+        record_llm_call("gpt-5-mini", cached, 0.01)
+        record_llm_call("gpt-5-mini", None, 3.0)
+
+    assert usage.calls == 0
+    assert usage.cached_calls == 1 and usage.failed_calls == 1
+    assert usage.cost_usd == 0.0
+
+
+def test_calls_in_tasks_started_inside_the_block_are_attributed():
+    async def search():
+        async def source():
+            record_llm_call("gpt-4o-mini", chat_response(100, 50), 0.1)
+
+        with track_llm_usage() as usage:
+            await asyncio.gather(source(), source())
+        record_llm_call("gpt-4o-mini", chat_response(100, 50), 0.1)
+        return usage
+
+    usage = asyncio.run(search())
+
+    assert usage.calls == 2
+
+
+def test_detached_tracker_does_not_report_to_the_enclosing_request():
+    with track_llm_usage() as request:
+        with track_llm_usage(detached=True) as refresh:
+            record_llm_call("gpt-4o-mini", chat_response(100, 50), 0.1)
+        record_llm_call("gpt-4o-mini", chat_response(100, 50), 0.1)
+
+    assert refresh.calls == 1
+    assert request.calls == 1
@@ -0,0 +1,62 @@
+"""
+Local lexicon sentiment engine tests
+"""
+
+import asyncio
+import json
+import os
+import time
+
+from src.analysis.lexicon import LexiconSentimentEngine, extract_features
+
+SAMPLES_PATH = os.path.join(os.path.dirname(__file__), "data", "sentiment_samples.json")
+
+
+def load_samples():
+    with open(SAMPLES_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def test_negation_flips_sentiment():
+    engine = LexiconSentimentEngine()
+
+    assert engine.classify_batch([
+        "very good doctor",
+        "not very good doctor",
+        "tidak mesra",
+        "不推荐",
+        "不错",
+    ]) == ["positive", "negative", "negative", "negative", "positive"]
+
+
+def test_skip_bigrams_and_cjk_ngrams():
+    features = extract_features("Not very good, 很耐心")
+
+    assert "not good" in features
+    assert "耐心" in features
+
+
+def test_sample_accuracy_per_language():
+    engine = LexiconSentimentEngine()
+    samples = load_samples()
+    labels = engine.classify_batch([sample["text"] for sample in samples])
+
+    by_language = {}
+    for sample, label in zip(samples, labels):
+        correct, total = by_language.get(sample["lang"], (0, 0))
+        by_language[sample["lang"]] = (correct + (label == sample["sentiment"]), total + 1)
+
+    for language, (correct, total) in by_language.items():
+        assert correct / total >= 0.8, f"{language}: {correct}/{total}"
+
+
+def test_batch_latency_under_one_millisecond_per_review():
+    engine = LexiconSentimentEngine()
+    texts = [sample["text"] for sample in load_samples()] * 50
+
+    start = time.perf_counter()
+    labels = asyncio.run(engine.classify(texts))
+    per_review = (time.perf_counter() - start) / len(texts)
+
+    assert len(labels) == len(texts)
+    assert per_review < 0.001
@@ -0,0 +1,51 @@
+"""
+Tests for the in-process L1 LRU cache
+"""
+
+import time
+
+from src.cache.lru import LRUCache
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = LRUCache(max_entries=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "b" is now the least recently used
+
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1 and cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["size"] == 2
+
+
+def test_entries_expire_after_ttl_or_hard_expiry(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(time, "time", lambda: now[0])
+    cache = LRUCache(max_entries=10, ttl_seconds=300)
+
+    cache.set("ttl", "x")
+    cache.set("hard", "y", expires_at=now[0] + 10)  # The database row expires first
+    cache.set("late", "z", expires_at=now[0] + 10_000)  # Never outlives the TTL
+
+    now[0] += 11
+    assert cache.get("hard") is None
+    assert cache.get("ttl") == "x"
+
+    now[0] += 300
+    assert cache.get("ttl") is None and cache.get("late") is None
+    assert cache.stats()["size"] == 0
+
+
+def test_disabled_and_invalidate():
+    disabled = LRUCache(max_entries=0)
+    disabled.set("a", 1)
+    assert disabled.get("a") is None
+
+    cache = LRUCache(max_entries=10)
+    cache.set("a", 1)
+    cache.invalidate("a")
+    assert cache.get("a") is None
+    assert cache.stats()["misses"] == 1 and cache.stats()["hits"] == 0
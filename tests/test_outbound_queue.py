@@ -0,0 +1,157 @@
+"""
+Outbound message queue tests (recorded statements, fake Twilio client, no database)
+"""
+
+import asyncio
+import time
+
+import httpx
+import pytest
+
+from src.whatsapp import outbound as outbound_module
+from src.whatsapp.outbound import OutboundMessageQueue, SendRateLimiter
+
+
+def twilio_error(status_code):
+    request = httpx.Request("POST", "https://api.twilio.com/2010-04-01/Messages.json")
+    return httpx.HTTPStatusError("Twilio error", request=request, response=httpx.Response(status_code, request=request))
+
+
+@pytest.fixture
+def queue(monkeypatch, recording_db):
+    monkeypatch.setattr(outbound_module, "db", recording_db)
+    queue = OutboundMessageQueue()
+    queue.rate_limiter = SendRateLimiter(0)
+    queue.retry_base_seconds = 2.0
+    queue.retry_max_seconds = 30.0
+    queue.max_attempts = 5
+    queue.poll_interval = 0.01
+    return queue
+
+
+def fake_twilio(monkeypatch, error=None):
+    delivered = []
+
+    async def send_message(to, message):
+        if error is not None:
+            raise error
+        delivered.append((to, message))
+
+    monkeypatch.setattr(outbound_module.whatsapp_client, "send_message", send_message)
+    return delivered
+
+
+def test_worker_claims_with_its_lease_and_delivers_in_claim_order(monkeypatch, recording_db, queue):
+    delivered = fake_twilio(monkeypatch)
+    rows = [
+        {"id": 1, "recipient": "+60123", "body": "Searching...", "attempts": 1},
+        {"id": 2, "recipient": "+60123", "body": "Results", "attempts": 1},
+    ]
+
+    def respond(method, query, args):
+        if query == OutboundMessageQueue.CLAIM_QUERY:
+            if not rows:
+                queue._stopping = True
+                return None
+            return rows.pop(0)
+        return "UPDATE 1"
+
+    recording_db.respond = respond
+    asyncio.run(queue._worker(0))
+
+    assert delivered == [("+60123", "Searching..."), ("+60123", "Results")]
+    assert set(recording_db.args_for(OutboundMessageQueue.CLAIM_QUERY)) == {(queue.worker_id, float(queue.lease_seconds))}
+    assert recording_db.args_for(OutboundMessageQueue.SENT_QUERY) == [(1, queue.worker_id), (2, queue.worker_id)]
+
+
+def test_claim_waits_for_earlier_messages_to_the_same_recipient():
+    query = " ".join(OutboundMessageQueue.CLAIM_QUERY.split())
+
+    # A message is only claimable once every earlier message to its recipient is done
+    assert ("NOT EXISTS ( SELECT 1 FROM outbound_messages earlier WHERE earlier.recipient = m.recipient "
+            "AND earlier.status IN ('pending', 'sending') AND earlier.id < m.id )") in query
+    assert "ORDER BY m.id" in query
+
+
+def test_start_only_recovers_this_workers_sends(monkeypatch, recording_db, queue):
+    queue.enabled = True
+    queue.worker_count = 0
+
+    asyncio.run(queue.start())
+
+    assert recording_db.args_for(OutboundMessageQueue.RECOVER_QUERY) == [(queue.worker_id,)]
+
+
+@pytest.mark.parametrize("attempts, delay", [(1, 2.0), (2, 4.0), (3, 8.0), (4, 16.0)])
+def test_retries_back_off_exponentially(monkeypatch, recording_db, queue, attempts, delay):
+    fake_twilio(monkeypatch, error=twilio_error(503))
+    row = {"id": 9, "recipient": "+60123", "body": "hi", "attempts": attempts}
+
+    asyncio.run(queue._deliver(row))
+
+    (args,) = recording_db.args_for(OutboundMessageQueue.FAILURE_QUERY)
+    assert args[:2] == (9, "pending")
+    assert args[3:] == (delay, queue.worker_id)
+    assert queue.retried == 1
+
+
+def test_backoff_is_capped(recording_db, queue):
+    queue.max_attempts = 20
+    row = {"id": 9, "recipient": "+60123", "body": "hi", "attempts": 10}
+
+    asyncio.run(queue._record_failure(row, twilio_error(429)))
+
+    assert recording_db.args_for(OutboundMessageQueue.FAILURE_QUERY)[0][3] == queue.retry_max_seconds
+
+
+def test_permanent_errors_and_exhausted_retries_fail(recording_db, queue):
+    asyncio.run(queue._record_failure({"id": 1, "recipient": "+60123", "attempts": 1}, twilio_error(400)))
+    asyncio.run(queue._record_failure({"id": 2, "recipient": "+60123", "attempts": 5}, twilio_error(503)))
+
+    statuses = [(args[0], args[1], args[3]) for args in recording_db.args_for(OutboundMessageQueue.FAILURE_QUERY)]
+    assert statuses == [(1, "failed", 0.0), (2, "failed", 0.0)]
+    assert queue.failed == 2 and queue.retried == 0
+
+
+@pytest.mark.parametrize("error, permanent", [
+    (twilio_error(400), True),
+    (twilio_error(404), True),
+    (twilio_error(429), False),
+    (twilio_error(500), False),
+    (httpx.ConnectTimeout("timed out"), False),
+    (RuntimeError("boom"), False),
+])
+def test_is_permanent(error, permanent):
+    assert OutboundMessageQueue._is_permanent(error) is permanent
+
+
+def test_rate_limiter_spaces_sends_across_workers():
+    limiter = SendRateLimiter(50.0)  # One send every 20ms
+    slots = []
+
+    async def worker():
+        for _ in range(2):
+            await limiter.acquire()
+            slots.append(time.monotonic())
+
+    async def run():
+        await asyncio.gather(*(worker() for _ in range(3)))
+
+    asyncio.run(run())
+
+    gaps = [later - earlier for earlier, later in zip(slots, slots[1:])]
+    assert len(slots) == 6
+    assert min(gaps) >= 0.015
+    assert slots[-1] - slots[0] >= 5 * 0.02 * 0.9
+
+
+def test_rate_limiter_disabled_with_zero_rate():
+    limiter = SendRateLimiter(0)
+    start = time.monotonic()
+
+    async def run():
+        await asyncio.gather(*(limiter.acquire() for _ in range(100)))
+
+    asyncio.run(run())
+
+    assert time.monotonic() - start < 0.5
@@ -0,0 +1,191 @@
+"""
+Tests for the Redis shared cache tier
+Runs against an in-memory fake Redis, no server required
+"""
+
+import asyncio
+import time
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+
+from src.cache.redis_cache import RedisCache
+
+
+class FakeRedis:
+    """Minimal in-memory stand-in for redis.asyncio.Redis"""
+
+    def __init__(self):
+        self.store = {}
+
+    def _alive(self, key):
+        entry = self.store.get(key)
+        if entry is None:
+            return None
+        value, expires_at = entry
+        if expires_at is not None and expires_at <= time.time():
+            del self.store[key]
+            return None
+        return value
+
+    async def ping(self):
+        return True
+
+    async def get(self, key):
+        return self._alive(key)
+
+    async def set(self, key, value, ex=None, nx=False):
+        if nx and self._alive(key) is not None:
+            return None
+        self.store[key] = (value, time.time() + ex if ex else None)
+        return True
+
+    async def delete(self, key):
+        return 1 if self.store.pop(key, None) is not None else 0
+
+    async def eval(self, script, numkeys, *keys_and_args):
+        # Only RedisCache.RELEASE_SCRIPT (compare-and-delete) is used
+        assert script == RedisCache.RELEASE_SCRIPT
+        key, token = keys_and_args
+        if self._alive(key) == token:
+            return await self.delete(key)
+        return 0
+
+    async def aclose(self):
+        pass
+
+
+def _review(snippet="Great doctor"):
+    return {
+        "snippet": snippet,
+        "rating": Decimal("4.5"),
+        "review_date": date(2024, 1, 15),
+        "valid_until": datetime.now() + timedelta(days=7),
+        "source": "google_maps",
+    }
+
+
+def test_reviews_round_trip():
+    cache = RedisCache(client=FakeRedis())
+    expires_at = time.time() + 600
+    review = dict(_review(), author_name=None)
+
+    async def run():
+        await cache.set_reviews("doc1", [review], expires_at=expires_at)
+        return await cache.get_reviews("doc1")
+
+    shared = asyncio.run(run())
+
+    # Same values and types as the asyncpg row that was cached
+    assert shared["expires_at"] == expires_at
+    assert shared["reviews"] == [review]
+    assert [type(value) for value in shared["reviews"][0].values()] == [type(value) for value in review.values()]
+    assert cache.stats()["hits"] == 1
+
+
+def test_ttl_never_outlives_expiry():
+    fake = FakeRedis()
+    cache = RedisCache(client=fake, ttl_seconds=3600)
+
+    async def run():
+        await cache.set_reviews("soon", [_review()], expires_at=time.time() + 30)
+        await cache.set_reviews("expired", [_review()], expires_at=time.time() - 1)
+
+    asyncio.run(run())
+
+    _, stored_expiry = fake.store["doctor_reviews:soon"]
+    assert stored_expiry <= time.time() + 30
+    assert "doctor_reviews:expired" not in fake.store
+
+
+def test_invalidate():
+    cache = RedisCache(client=FakeRedis())
+
+    async def run():
+        await cache.set_reviews("doc1", [_review()], expires_at=time.time() + 600)
+        await cache.invalidate("doc1")
+        return await cache.get_reviews("doc1")
+
+    assert asyncio.run(run()) is None
+    assert cache.stats()["misses"] == 1
+
+
+def test_in_flight_marker():
+    cache = RedisCache(client=FakeRedis())
+
+    async def run():
+        first = await cache.mark_in_flight("doc1")
+        second = await cache.mark_in_flight("doc1")
+        in_flight = await cache.is_in_flight("doc1")
+        await cache.clear_in_flight("doc1", first)
+        after_clear = await cache.mark_in_flight("doc1")
+        return first, second, in_flight, after_clear
+
+    first, second, in_flight, after_clear = asyncio.run(run())
+    assert first and second is None and in_flight and after_clear
+
+
+def test_in_flight_marker_is_only_released_by_its_owner():
+    fake = FakeRedis()
+    cache = RedisCache(client=fake, in_flight_ttl_seconds=60)
+
+    async def run():
+        stale_token = await cache.mark_in_flight("doc1")
+        # Our marker expired mid-search and another replica claimed the doctor
+        fake.store.clear()
+        other_token = await cache.mark_in_flight("doc1")
+        await cache.clear_in_flight("doc1", stale_token)
+        await cache.clear_in_flight("doc1", None)  # A caller that never got the claim
+        still_held = await cache.is_in_flight("doc1")
+        await cache.clear_in_flight("doc1", other_token)
+        return other_token, still_held, await cache.is_in_flight("doc1")
+
+    other_token, still_held, after_owner_release = asyncio.run(run())
+    assert other_token and still_held is True and after_owner_release is False
+
+
+def test_disabled_without_url():
+    cache = RedisCache(redis_url=None)
+
+    async def run():
+        await cache.connect()
+        await cache.set_reviews("doc1", [_review()], expires_at=time.time() + 600)
+        return await cache.get_reviews("doc1"), await cache.mark_in_flight("doc1")
+
+    reviews, token = asyncio.run(run())
+    assert reviews is None and token
+    assert cache.enabled is False
+
+
+def test_cache_manager_shares_results_between_replicas():
+    from src.cache.manager import CacheManager
+    from src.database import db
+
+    fake = FakeRedis()
+    replica_a = CacheManager()
+    replica_b = CacheManager()
+    replica_a.redis = RedisCache(client=fake)
+    replica_b.redis = RedisCache(client=fake)
+
+    db_calls = []
+
+    async def fake_fetch(query, *args):
+        db_calls.append(args)
+        return [_review()]
+
+    original_fetch = db.fetch
+    db.fetch = fake_fetch
+    try:
+        async def run():
+            from_db = await replica_a.get_cached_reviews("doc1")
+            from_redis = await replica_b.get_cached_reviews("doc1")
+            return from_db, from_redis
+
+        from_db, from_redis = asyncio.run(run())
+    finally:
+        db.fetch = original_fetch
+
+    # Replica B is served by the shared tier without touching PostgreSQL, with the same row types
+    assert len(db_calls) == 1
+    assert from_redis == from_db
+    assert isinstance(from_redis[0]["rating"], Decimal) and type(from_redis[0]["review_date"]) is date
+    assert replica_b.get_redis_stats()["hits"] == 1
@@ -0,0 +1,100 @@
+"""
+CacheManager.save_reviews tests (recording fake connection, no database)
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.cache import manager as manager_module
+from src.cache.manager import CacheManager
+
+
+class RecordingDB:
+    """Records which connection / transaction every statement runs in"""
+
+    def __init__(self, fail_insert=False):
+        self.fail_insert = fail_insert
+        self.acquired = 0
+        self.transactions = []
+        self.statements = []
+        self._in_transaction = False
+
+    @asynccontextmanager
+    async def acquire(self):
+        self.acquired += 1
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self):
+        self._in_transaction = True
+        try:
+            yield
+            self.transactions.append("commit")
+        except Exception:
+            self.transactions.append("rollback")
+            raise
+        finally:
+            self._in_transaction = False
+
+    def _record(self, query, args):
+        self.statements.append((self._in_transaction, args))
+
+    async def execute(self, query, *args):
+        self._record(query, args)
+        return "OK"
+
+    async def fetch(self, query, *args):
+        self._record(query, args)
+        if self.fail_insert:
+            raise RuntimeError("connection lost")
+        hashes = args[-1]
+        return [{"hash": h} for h in hashes]
+
+
+def reviews():
+    return [
+        {"text": f"Review {i}", "url": "https://maps.google.com/place/1", "source": "google_maps",
+         "rating": 5, "review_date": "2024-05-01", "author_name": f"Patient {i}"}
+        for i in range(20)
+    ]
+
+
+def save(monkeypatch, fake_db, batch, replace=False):
+    monkeypatch.setattr(manager_module, "db", fake_db)
+    return asyncio.run(CacheManager().save_reviews("dr_lim", "Dr Lim", batch, ttl_days=7, replace=replace))
+
+
+def test_batch_is_one_insert_in_one_transaction(monkeypatch):
+    fake_db = RecordingDB()
+    batch = reviews()
+
+    saved = save(monkeypatch, fake_db, batch + [dict(batch[0])])  # In-batch duplicate dropped
+
+    assert saved == 20
+    assert fake_db.acquired == 1
+    assert fake_db.transactions == ["commit"]
+    # Doctor row + one multi-row insert, all inside the transaction
+    assert len(fake_db.statements) == 2
+    assert all(in_transaction for in_transaction, _ in fake_db.statements)
+    insert_args = fake_db.statements[-1][1]
+    assert len(insert_args[-1]) == 20  # One hash per unique review
+
+
+def test_replace_deletes_in_the_same_transaction(monkeypatch):
+    fake_db = RecordingDB()
+
+    save(monkeypatch, fake_db, reviews(), replace=True)
+
+    assert fake_db.acquired == 1
+    assert fake_db.transactions == ["commit"]
+    assert len(fake_db.statements) == 3
+    assert all(in_transaction for in_transaction, _ in fake_db.statements)
+
+
+def test_failed_insert_rolls_back_everything(monkeypatch):
+    fake_db = RecordingDB(fail_insert=True)
+
+    saved = save(monkeypatch, fake_db, reviews(), replace=True)
+
+    assert saved == 0
+    assert fake_db.transactions == ["rollback"]
@@ -0,0 +1,77 @@
+"""
+Persistent search job runner tests (recorded statements, no database)
+"""
+
+import asyncio
+
+from src.config import settings
+from src.whatsapp import search_jobs as search_jobs_module
+from src.whatsapp.handler import message_handler
+from src.whatsapp.search_jobs import SearchJobRunner
+
+JOB = {"id": 7, "user_id": "+60123", "doctor_name": "Dr Lim", "attempts": 1}
+
+
+def make_runner(monkeypatch, recording_db, search):
+    monkeypatch.setattr(search_jobs_module, "db", recording_db)
+    monkeypatch.setattr(message_handler, "_perform_search", search)
+    runner = SearchJobRunner()
+    runner.heartbeat_interval = 0.01
+    return runner
+
+
+def test_lease_is_renewed_while_the_search_runs(monkeypatch, recording_db):
+    async def slow_search(user_id, doctor_name):
+        await asyncio.sleep(0.1)
+
+    runner = make_runner(monkeypatch, recording_db, slow_search)
+    asyncio.run(runner._run_job(JOB))
+
+    renewals = recording_db.args_for(SearchJobRunner.RENEW_QUERY)
+    assert len(renewals) >= 3
+    assert set(renewals) == {(7, runner.worker_id, float(runner.lease_seconds))}
+    assert recording_db.args_for(SearchJobRunner.FINISH_QUERY) == [(7, "done", None, runner.worker_id)]
+
+
+def test_heartbeat_stops_once_the_lease_is_lost(monkeypatch, recording_db):
+    async def slow_search(user_id, doctor_name):
+        await asyncio.sleep(0.1)
+
+    recording_db.respond = lambda method, query, args: (
+        "UPDATE 0" if query == SearchJobRunner.RENEW_QUERY else "UPDATE 1"
+    )
+    runner = make_runner(monkeypatch, recording_db, slow_search)
+    asyncio.run(runner._run_job(JOB))
+
+    assert len(recording_db.args_for(SearchJobRunner.RENEW_QUERY)) == 1
+
+
+def test_user_is_told_when_a_job_runs_out_of_attempts(monkeypatch, recording_db, sent_messages):
+    async def search(user_id, doctor_name):
+        raise AssertionError("should not search again")
+
+    runner = make_runner(monkeypatch, recording_db, search)
+    asyncio.run(runner._run_job(dict(JOB, attempts=settings.search_job_max_attempts + 1)))
+
+    assert recording_db.args_for(SearchJobRunner.FINISH_QUERY) == [(7, "failed", "Too many attempts", runner.worker_id)]
+    assert runner.failed == 1
+    assert [to for to, _ in sent_messages] == ["+60123"]
+
+
+def test_stop_releases_searches_still_running_after_the_drain_timeout(monkeypatch, recording_db):
+    monkeypatch.setattr(settings, "search_job_drain_timeout_seconds", 0.05)
+
+    async def endless_search(user_id, doctor_name):
+        await asyncio.sleep(60)
+
+    runner = make_runner(monkeypatch, recording_db, endless_search)
+
+    async def run():
+        runner._workers = [asyncio.create_task(runner._run_job(JOB))]
+        await asyncio.sleep(0)
+        await runner.stop()
+
+    asyncio.run(run())
+
+    assert recording_db.args_for(SearchJobRunner.RELEASE_QUERY) == [(7, runner.worker_id)]
+    assert recording_db.args_for(SearchJobRunner.FINISH_QUERY) == []
@@ -0,0 +1,225 @@
+"""
+Background sentiment worker tests (in-memory doctor_reviews table, no database)
+"""
+
+import asyncio
+from contextlib import asynccontextmanager
+
+from src.analysis import worker as worker_module
+from src.analysis.lexicon import LexiconSentimentEngine
+from src.analysis.sentiment import sentiment_analyzer
+from src.analysis.worker import SentimentWorker
+from src.cache import manager as manager_module
+from src.cache.manager import CacheManager
+
+
+class FakeReviewsDB:
+    """doctor_reviews rows plus the claim / write-back / insert statements the code runs"""
+
+    def __init__(self):
+        self.rows = []
+        self.clock = 0.0
+
+    @asynccontextmanager
+    async def acquire(self):
+        yield self
+
+    @asynccontextmanager
+    async def transaction(self):
+        yield
+
+    async def execute(self, query, *args):
+        return "INSERT 0 1"
+
+    async def fetch(self, query, *args):
+        if query == SentimentWorker.CLAIM_QUERY:
+            return self._claim(*args)
+        if query == SentimentWorker.WRITE_BACK_QUERY:
+            return self._write_back(*args)
+        if "INSERT INTO doctor_reviews" in query:
+            return self._insert(*args)
+        raise AssertionError(f"Unexpected query: {query}")
+
+    def _insert(self, doctor_id, doctor_name, valid_until, *columns):
+        names = ["doctor_specialty", "hospital_name", "location", "source", "url", "snippet",
+                 "sentiment", "rating", "review_date", "author_name", "hash"]
+        inserted = []
+        for values in zip(*columns):
+            row = dict(zip(names, values), id=len(self.rows) + 1, doctor_id=doctor_id,
+                       sentiment_attempts=0, sentiment_claimed_at=None, sentiment_claimed_by=None)
+            assert row["snippet"] is not None  # snippet is NOT NULL in the schema
+            self.rows.append(row)
+            inserted.append({"hash": row["hash"]})
+        return inserted
+
+    def _claim(self, limit, worker_id, max_attempts, lease_seconds):
+        claimed = []
+        for row in self.rows:
+            if len(claimed) == limit:
+                break
+            lease_free = row["sentiment_claimed_at"] is None or row["sentiment_claimed_at"] < self.clock - lease_seconds
+            if row["sentiment"] is None and row["sentiment_attempts"] < max_attempts and lease_free:
+                row.update(sentiment_claimed_at=self.clock, sentiment_claimed_by=worker_id,
+                           sentiment_attempts=row["sentiment_attempts"] + 1)
+                claimed.append({"id": row["id"], "url": row["url"], "snippet": row["snippet"]})
+        return claimed
+
+    def _write_back(self, ids, sentiments, worker_id):
+        counts = {}
+        by_id = {row["id"]: row for row in self.rows}
+        for review_id, sentiment in zip(ids, sentiments):
+            row = by_id[review_id]
+            if row["sentiment"] is None and row["sentiment_claimed_by"] == worker_id:
+                row.update(sentiment=sentiment, sentiment_claimed_at=None, sentiment_claimed_by=None)
+                counts[row["doctor_id"]] = counts.get(row["doctor_id"], 0) + 1
+        return [{"doctor_id": doctor_id, "count": count} for doctor_id, count in counts.items()]
+
+
+class FailingEngine(LexiconSentimentEngine):
+    async def classify(self, texts):
+        raise RuntimeError("model unavailable")
+
+
+def search_client_reviews():
+    """Reviews as OutscraperClient / ChatGPTSearchClient emit them (body under "text")"""
+    return [
+        {"text": "Dr Lim is very patient and explained everything clearly", "rating": 5,
+         "author_name": "Mei", "review_date": "2024-05-01", "url": "https://maps.google.com/place/1",
+         "source": "google_maps", "place_name": "Clinic"},
+        {"text": "Rude staff and we waited three hours, very disappointed", "rating": 1,
+         "author_name": "Ali", "review_date": "", "url": "https://maps.google.com/place/1",
+         "source": "google_maps", "place_name": "Clinic"},
+    ]
+
+
+def setup(monkeypatch, engine):
+    fake_db = FakeReviewsDB()
+    monkeypatch.setattr(manager_module, "db", fake_db)
+    monkeypatch.setattr(worker_module, "db", fake_db)
+    monkeypatch.setattr(sentiment_analyzer, "engine", engine)
+    monkeypatch.setattr(manager_module, "cache_manager", CacheManager())
+    return fake_db, manager_module.cache_manager
+
+
+def test_saved_client_reviews_get_their_own_sentiment(monkeypatch):
+    fake_db, cache_manager = setup(monkeypatch, LexiconSentimentEngine())
+    worker = SentimentWorker()
+
+    async def run():
+        saved = await cache_manager.save_reviews("dr_lim", "Dr Lim", search_client_reviews(), ttl_days=7)
+        more = await worker.process_batch()
+        return saved, more
+
+    saved, _ = asyncio.run(run())
+
+    # Same place URL, different text: both rows are kept, each with its own body
+    assert saved == 2
+    assert [row["snippet"] for row in fake_db.rows] == [review["text"] for review in search_client_reviews()]
+    assert [row["sentiment"] for row in fake_db.rows] == ["positive", "negative"]
+    assert all(row["sentiment_claimed_by"] is None for row in fake_db.rows)
+
+
+def test_failing_rows_do_not_block_the_queue(monkeypatch):
+    fake_db, cache_manager = setup(monkeypatch, FailingEngine())
+    worker = SentimentWorker()
+    worker.batch_size = 1
+
+    async def run():
+        await cache_manager.save_reviews("dr_lim", "Dr Lim", search_client_reviews(), ttl_days=7)
+        await worker.process_batch()
+        # The failed head row keeps its lease, so the next round moves on
+        monkeypatch.setattr(sentiment_analyzer, "engine", LexiconSentimentEngine())
+        await worker.process_batch()
+
+    asyncio.run(run())
+
+    assert [row["sentiment"] for row in fake_db.rows] == [None, "negative"]
+    assert fake_db.rows[0]["sentiment_attempts"] == 1
+
+
+def test_rows_are_given_up_after_max_attempts(monkeypatch):
+    fake_db, cache_manager = setup(monkeypatch, FailingEngine())
+    worker = SentimentWorker()
+    worker.lease_seconds = 0
+
+    async def run():
+        await cache_manager.save_reviews("dr_lim", "Dr Lim", search_client_reviews(), ttl_days=7)
+        for _ in range(worker.max_attempts + 2):
+            fake_db.clock += 1
+            await worker.process_batch()
+        return await worker.process_batch()
+
+    assert asyncio.run(run()) is False
+    assert all(row["sentiment_attempts"] == worker.max_attempts for row in fake_db.rows)
+
+
+class CachingEngine(LexiconSentimentEngine):
+    """API-style engine: results go through the sentiment cache"""
+    cache_results = True
+
+    def __init__(self):
+        super().__init__()
+        self.classified = []
+
+    async def classify(self, texts):
+        self.classified.extend(texts)
+        return await super().classify(texts)
+
+
+class FakeSentimentCacheDB:
+    def __init__(self):
+        self.cache = {}
+
+    async def fetch(self, query, hashes):
+        return [{"hash": h, "sentiment": self.cache[h]} for h in hashes if h in self.cache]
+
+    async def execute(self, query, hashes, sentiments, model):
+        for hash_value, sentiment in zip(hashes, sentiments):
+            self.cache.setdefault(hash_value, sentiment)
+
+
+def test_sentiment_cache_is_keyed_by_review_text(monkeypatch):
+    from src.analysis import sentiment as sentiment_module
+
+    engine = CachingEngine()
+    monkeypatch.setattr(sentiment_analyzer, "engine", engine)
+    monkeypatch.setattr(sentiment_module, "db", FakeSentimentCacheDB())
+
+    first, second = search_client_reviews()
+
+    async def run():
+        await sentiment_analyzer.analyze_reviews([dict(first), dict(second)])
+        # Same text under another URL reuses the cached sentiment; empty text is never classified
+        return await sentiment_analyzer.analyze_reviews([
+            dict(first, url="https://forum.lowyat.net/topic/9"),
+            {"text": "", "url": "https://maps.google.com/place/2"},
+        ])
+
+    results = asyncio.run(run())
+
+    assert engine.classified == [first["text"], second["text"]]
+    assert [review["sentiment"] for review in results] == ["positive", "neutral"]
+
+
+def test_missing_or_invalid_labels_are_not_cached(monkeypatch):
+    from types import SimpleNamespace
+
+    from src.analysis import sentiment as sentiment_module
+    from src.analysis.sentiment import OpenAISentimentEngine
+
+    async def create(**params):
+        content = '{"sentiments": [{"id": 1, "sentiment": "positive"}, {"id": 2, "sentiment": "great"}]}'
+        return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=content))])
+
+    engine = OpenAISentimentEngine(api_key="test", model="gpt-4o-mini")
+    engine.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    fake_cache = FakeSentimentCacheDB()
+    monkeypatch.setattr(sentiment_analyzer, "engine", engine)
+    monkeypatch.setattr(sentiment_module, "db", fake_cache)
+
+    reviews = [{"text": "Very patient"}, {"text": "Explained well"}, {"text": "Long wait"}]
+    results = asyncio.run(sentiment_analyzer.analyze_reviews(reviews, fallback=None))
+
+    # Only the valid label is stored; the other two are left unset and retried next time
+    assert [review["sentiment"] for review in results] == ["positive", None, None]
+    assert list(fake_cache.cache.values()) == ["positive"]
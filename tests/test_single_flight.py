@@ -0,0 +1,167 @@
+"""
+Single-flight search coalescing tests (fake providers and cache, no network or database)
+"""
+
+import asyncio
+
+from src.config import settings
+from src.search import aggregator as aggregator_module
+from src.search.aggregator import SearchAggregator
+from src.search.providers import SourceProvider, SourceRegistry
+
+
+class SlowProvider(SourceProvider):
+    name = "slow"
+    label = "Slow"
+    count_key = "slow_count"
+
+    def __init__(self):
+        self.calls = 0
+
+    async def search(self, doctor_name, location):
+        self.calls += 1
+        await asyncio.sleep(0.05)
+        return {"reviews": [{"text": "Very patient", "source": "slow"}], "total_count": 1}
+
+
+def setup(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "parallel")
+    monkeypatch.setattr(settings, "search_early_exit_reviews", 0)
+    monkeypatch.setattr(settings, "search_disabled_sources", "")
+    cache_manager = aggregator_module.cache_manager
+
+    async def resolve_doctor_id(doctor_name, specialty="", location="Malaysia"):
+        return "dr_lim"
+
+    async def nothing(*args, **kwargs):
+        return None
+
+    async def miss(doctor_id):
+        return None, None
+
+    async def mark(doctor_id):
+        return "token"
+
+    async def save_reviews(*args, **kwargs):
+        return 0
+
+    monkeypatch.setattr(cache_manager, "resolve_doctor_id", resolve_doctor_id)
+    monkeypatch.setattr(cache_manager, "lookup_cached_reviews", miss)
+    monkeypatch.setattr(cache_manager, "get_stale_reviews", nothing)
+    monkeypatch.setattr(cache_manager, "mark_search_in_flight", mark)
+    monkeypatch.setattr(cache_manager, "clear_search_in_flight", nothing)
+    monkeypatch.setattr(cache_manager, "save_reviews", save_reviews)
+
+    provider = SlowProvider()
+    registry = SourceRegistry()
+    registry.register(provider)
+    return SearchAggregator(registry=registry), provider
+
+
+def test_concurrent_searches_for_one_doctor_share_one_search(monkeypatch):
+    aggregator, provider = setup(monkeypatch)
+
+    async def run():
+        first, second = await asyncio.gather(
+            aggregator.search_doctor_reviews("Dr Lim"),
+            aggregator.search_doctor_reviews("Dr. Lim"),
+        )
+        # The flight is gone once finished, so a later search runs again
+        third = await aggregator.search_doctor_reviews("Dr Lim")
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+
+    assert provider.calls == 2
+    assert aggregator.coalesced_searches == 1
+    assert first == second and first["total_count"] == 1
+    assert third["total_count"] == 1
+    assert aggregator._in_flight == {}
+
+
+def test_late_subscriber_replays_every_event(monkeypatch):
+    aggregator, provider = setup(monkeypatch)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def slow_save(*args, **kwargs):
+            await release.wait()
+            return 0
+
+        monkeypatch.setattr(aggregator_module.cache_manager, "save_reviews", slow_save)
+
+        async def collect():
+            return [event["type"] async for event in aggregator.stream_doctor_reviews("Dr Lim")]
+
+        first = asyncio.create_task(collect())
+        # Join once the source event has been published, while the results are being saved
+        while not (aggregator._in_flight and aggregator._in_flight["dr_lim"].events):
+            await asyncio.sleep(0.01)
+        second = asyncio.create_task(collect())
+        await asyncio.sleep(0)
+        release.set()
+        return await first, await second
+
+    first, second = asyncio.run(run())
+
+    assert first == second == ["source", "done"]
+    assert provider.calls == 1
+
+
+def test_search_error_reaches_every_caller(monkeypatch):
+    aggregator, provider = setup(monkeypatch)
+    runs = []
+
+    async def failing_sources(doctor_name, location):
+        runs.append(doctor_name)
+        await asyncio.sleep(0.01)
+        raise RuntimeError("database down")
+        yield  # pragma: no cover - makes this an async generator
+
+    monkeypatch.setattr(aggregator, "_iter_sources", failing_sources)
+
+    async def run():
+        return await asyncio.gather(
+            aggregator.search_doctor_reviews("Dr Lim"),
+            aggregator.search_doctor_reviews("Dr Lim"),
+        )
+
+    first, second = asyncio.run(run())
+
+    assert len(runs) == 1
+    assert first["error"] == second["error"] == "database down"
+    assert first["total_count"] == 0
+
+
+def test_cache_hits_report_the_tier_that_served_them(monkeypatch):
+    aggregator, provider = setup(monkeypatch)
+    cache_manager = aggregator_module.cache_manager
+    cached = [{"snippet": "Very patient", "source": "slow"}]
+
+    async def redis_hit(doctor_id):
+        return cached, "redis"
+
+    async def summary(doctor_id):
+        return None
+
+    monkeypatch.setattr(cache_manager, "lookup_cached_reviews", redis_hit)
+    monkeypatch.setattr(cache_manager, "get_doctor_summary", summary)
+
+    async def run():
+        return [event async for event in aggregator.stream_doctor_reviews("Dr Lim")]
+
+    cache_event, done = asyncio.run(run())
+
+    assert cache_event["type"] == "cache" and cache_event["cache_tier"] == "redis"
+    assert done["result"]["cache_tier"] == "redis" and done["result"]["reviews"] == cached
+    assert provider.calls == 0
+
+
+def test_searched_results_have_no_cache_tier(monkeypatch):
+    aggregator, provider = setup(monkeypatch)
+
+    result = asyncio.run(aggregator.search_doctor_reviews("Dr Lim"))
+
+    assert provider.calls == 1
+    assert result.get("cache_tier") is None
@@ -0,0 +1,188 @@
+"""
+Source provider registry and scheduling tests (fake providers, no network)
+"""
+
+import asyncio
+import logging
+from types import SimpleNamespace
+
+import pytest
+
+from src.config import settings
+from src.search.aggregator import SearchAggregator
+from src.search.providers import SourceProvider, SourceRegistry
+from src.utils.llm_usage import record_llm_call, track_llm_usage
+
+
+class FakeProvider(SourceProvider):
+    def __init__(self, name, cost_usd, reviews=0, delay=0.0, configured=True):
+        self.name = name
+        self.label = name
+        self.count_key = f"{name}_count"
+        self.cost_usd = cost_usd
+        self.delay = delay
+        self.reviews = [{"text": f"{name} review {i}", "source": name} for i in range(reviews)]
+        self._configured = configured
+        self.calls = 0
+        self.cancelled = False
+
+    @property
+    def configured(self):
+        return self._configured
+
+    async def search(self, doctor_name, location):
+        self.calls += 1
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        return {"reviews": self.reviews, "total_count": len(self.reviews)}
+
+
+def make_aggregator(*providers):
+    registry = SourceRegistry()
+    for provider in providers:
+        registry.register(provider)
+    return SearchAggregator(registry=registry)
+
+
+async def collect(aggregator):
+    return [name async for name, _ in aggregator._iter_sources("Dr Lim", "Malaysia")]
+
+
+def test_cheapest_first_stops_once_reviews_are_found(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "cheapest_first")
+    monkeypatch.setattr(settings, "search_cheapest_first_min_reviews", 2)
+    cheap_empty = FakeProvider("cheap", 0.001)
+    mid = FakeProvider("mid", 0.01, reviews=2)
+    expensive = FakeProvider("expensive", 0.05, reviews=5)
+    unconfigured = FakeProvider("free", 0.0, reviews=9, configured=False)
+    aggregator = make_aggregator(expensive, mid, cheap_empty, unconfigured)
+
+    assert asyncio.run(collect(aggregator)) == ["cheap", "mid"]
+    assert expensive.calls == 0 and unconfigured.calls == 0
+
+
+def test_cheapest_first_keeps_searching_below_the_minimum(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "cheapest_first")
+    monkeypatch.setattr(settings, "search_cheapest_first_min_reviews", 5)
+    maps = FakeProvider("maps", 0.005, reviews=1)
+    forums = FakeProvider("forums", 0.03, reviews=2)
+
+    # One Google Maps review is not enough to skip the forum search
+    assert asyncio.run(collect(make_aggregator(forums, maps))) == ["maps", "forums"]
+
+
+def test_provider_must_implement_search():
+    class Incomplete(SourceProvider):
+        name = "incomplete"
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+
+def test_parallel_early_exit_cancels_slow_sources(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "parallel")
+    monkeypatch.setattr(settings, "search_early_exit_reviews", 3)
+    fast = FakeProvider("fast", 0.05, reviews=3, delay=0.01)
+    slow = FakeProvider("slow", 0.001, reviews=3, delay=5.0)
+    aggregator = make_aggregator(fast, slow)
+
+    async def run():
+        names = await collect(aggregator)
+        await asyncio.sleep(0)
+        return names
+
+    assert asyncio.run(run()) == ["fast"]
+    assert slow.calls == 1 and slow.cancelled
+
+
+def test_disabled_sources_and_merge_counts(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "parallel")
+    monkeypatch.setattr(settings, "search_early_exit_reviews", 0)
+    monkeypatch.setattr(settings, "search_disabled_sources", "b")
+    a = FakeProvider("a", 0.01, reviews=2)
+    b = FakeProvider("b", 0.01, reviews=1)
+    aggregator = make_aggregator(a, b)
+
+    async def no_save(*args, **kwargs):
+        return 0
+
+    from src.search import aggregator as aggregator_module
+    monkeypatch.setattr(aggregator_module.cache_manager, "save_reviews", no_save)
+
+    async def run():
+        results = {name: result async for name, result in aggregator._iter_sources("Dr Lim", "Malaysia")}
+        return await aggregator._merge_results("Dr Lim", "dr_lim", results)
+
+    result = asyncio.run(run())
+
+    assert b.calls == 0
+    assert result["sources"] == ["a"]
+    assert result["a_count"] == 2 and result["b_count"] == 0
+    assert result["source_counts"] == {"a": 2}
+    assert aggregator.get_breaker_stats()["b"]["enabled"] is False
+
+
+class FailingProvider(FakeProvider):
+    async def search(self, doctor_name, location):
+        self.calls += 1
+        raise RuntimeError("quota exceeded")
+
+
+def _refresh(monkeypatch, aggregator):
+    from src.search import aggregator as aggregator_module
+    saves = []
+
+    async def save_reviews(doctor_id, doctor_name, reviews, replace=False):
+        saves.append((len(reviews), replace))
+        return 0
+
+    async def mark(doctor_id):
+        return "token"
+
+    async def clear(doctor_id, token):
+        pass
+
+    monkeypatch.setattr(aggregator_module.cache_manager, "save_reviews", save_reviews)
+    monkeypatch.setattr(aggregator_module.cache_manager, "mark_search_in_flight", mark)
+    monkeypatch.setattr(aggregator_module.cache_manager, "clear_search_in_flight", clear)
+    asyncio.run(aggregator._refresh_reviews("Dr Lim", "dr_lim", "Malaysia"))
+    return saves
+
+
+def test_partial_refresh_keeps_existing_reviews(monkeypatch):
+    monkeypatch.setattr(settings, "search_source_strategy", "parallel")
+    monkeypatch.setattr(settings, "search_early_exit_reviews", 0)
+    monkeypatch.setattr(settings, "search_disabled_sources", "")
+
+    # One source failing must not wipe the reviews it returned last time
+    saves = _refresh(monkeypatch, make_aggregator(FakeProvider("a", 0.01, reviews=2), FailingProvider("b", 0.01)))
+    assert saves == [(2, False)]
+
+    # Only a complete refresh replaces the doctor's review set
+    saves = _refresh(monkeypatch, make_aggregator(FakeProvider("a", 0.01, reviews=2), FakeProvider("b", 0.01, reviews=1)))
+    assert saves == [(3, True)]
+
+
+class BilledProvider(FakeProvider):
+    async def search(self, doctor_name, location):
+        record_llm_call("gpt-4o-mini", SimpleNamespace(
+            usage=SimpleNamespace(prompt_tokens=100, completion_tokens=50, completion_tokens_details=None)
+        ), 0.1)
+        return await super().search(doctor_name, location)
+
+
+def test_refresh_usage_is_logged_on_its_own_tracker(monkeypatch, caplog):
+    monkeypatch.setattr(settings, "search_source_strategy", "parallel")
+    monkeypatch.setattr(settings, "search_early_exit_reviews", 0)
+    monkeypatch.setattr(settings, "search_disabled_sources", "")
+    caplog.set_level(logging.INFO, logger="src.search.aggregator")
+
+    # The user's search has already been logged when its stale-while-revalidate refresh runs
+    with track_llm_usage() as search_usage:
+        _refresh(monkeypatch, make_aggregator(BilledProvider("a", 0.01, reviews=1)))
+
+    assert search_usage.calls == 0
+    assert "api_calls=1" in caplog.text